@@ -0,0 +1,116 @@
+"""
+Compares the array-backed Heap against the recursive, node-based heap
+it replaced, on the operations BranchBoundOptimizer.optimize uses.
+
+Run as
+    python -m globaloptimize.benchmarks.benchmark_heap
+"""
+import random
+import timeit
+
+from globaloptimize.util.heap import Heap
+from globaloptimize.util.util import ObjectValuePair
+
+
+class RecursiveHeap(object):
+    """The node-based heap, kept here as a reference implementation."""
+
+    def __init__(self, value=None):
+        self.value = value
+        self.num_in_heap = 0 if value is None else 1
+        self.left_child = None
+        self.right_child = None
+
+    @classmethod
+    def create_from_iterable(cls, iterable):
+        as_iterable = iter(iterable)
+        heap = cls(next(as_iterable))
+        for i in as_iterable:
+            heap.add_to_heap(i)
+        return heap
+
+    def add_to_heap(self, value):
+        if self.value is None:
+            self.value = value
+        elif value < self.value:
+            self._bubble_down(self.value)
+            self.value = value
+        else:
+            self._bubble_down(value)
+        self.num_in_heap += 1
+
+    def pop_min(self):
+        out = self.value
+        self.num_in_heap -= 1
+        self.value = self._bubble_up()
+        return out
+
+    def _bubble_down(self, value):
+        if self.left_child is None:
+            self.left_child = self.__class__(value)
+        elif self.right_child is None:
+            self.right_child = self.__class__(value)
+        elif self.left_child.num_in_heap < self.right_child.num_in_heap:
+            self.left_child.add_to_heap(value)
+        else:
+            self.right_child.add_to_heap(value)
+
+    def _bubble_up(self):
+        if self.left_child is None and self.right_child is None:
+            return None
+        if self.left_child is None:
+            return self._bubble_up_right()
+        if self.right_child is None:
+            return self._bubble_up_left()
+        if self.left_child.value < self.right_child.value:
+            return self._bubble_up_left()
+        return self._bubble_up_right()
+
+    def _bubble_up_left(self):
+        out = self.left_child.pop_min()
+        if len(self.left_child) == 0:
+            self.left_child = None
+        return out
+
+    def _bubble_up_right(self):
+        out = self.right_child.pop_min()
+        if len(self.right_child) == 0:
+            self.right_child = None
+        return out
+
+    def __len__(self):
+        return self.num_in_heap
+
+
+def make_entries(size, seed=1452):
+    random.seed(seed)
+    return [ObjectValuePair(i, random.random()) for i in range(size)]
+
+
+def branch_and_bound_workload(heap_class, entries, iterations):
+    """Pop one entry and push two, as BranchBoundOptimizer does."""
+    heap = heap_class.create_from_iterable(entries)
+    for i in range(iterations):
+        candidate = heap.pop_min()
+        for offset in (0.1, 0.2):
+            heap.add_to_heap(ObjectValuePair(i, candidate.value + offset))
+    return heap
+
+
+def benchmark(size=20000, iterations=20000, repeat=3):
+    entries = make_entries(size)
+    results = dict()
+    for heap_class in [RecursiveHeap, Heap]:
+        name = heap_class.__name__
+        results[name, 'create'] = min(timeit.repeat(
+            lambda: heap_class.create_from_iterable(entries),
+            number=1, repeat=repeat))
+        results[name, 'branch_and_bound'] = min(timeit.repeat(
+            lambda: branch_and_bound_workload(heap_class, entries, iterations),
+            number=1, repeat=repeat))
+    return results
+
+
+if __name__ == '__main__':
+    for (name, task), seconds in sorted(benchmark().items()):
+        print("{:<16}{:<20}{:.4f} s".format(name, task, seconds))
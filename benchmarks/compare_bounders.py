@@ -0,0 +1,102 @@
+"""
+Compares the number of function evaluations each simplex bounder needs
+to certify the global minimum of the standard test functions.
+
+Run as
+    python -m globaloptimize.benchmarks.compare_bounders
+"""
+from globaloptimize.optimize import BranchBoundOptimizer
+from globaloptimize.minimize import _DEFAULT_BRANCHING_STRATEGIES
+from globaloptimize.bound import bound
+from globaloptimize.geometry.triangulate import (
+    triangulate_function_on_hyperrectangle)
+from globaloptimize.benchmarks import functions
+
+
+BOUNDERS = {
+    'max_point': bound.MaxPointSimplexBoundCalculator,
+    'circumsphere': bound.CircumsphereSimplexBoundCalculator,
+    'centroid': bound.CentroidSimplexBoundCalculator,
+    }
+
+TEST_FUNCTIONS = [
+    functions.make_sphere(2),
+    functions.make_sphere(3),
+    functions.make_branin(),
+    functions.make_styblinski_tang(2),
+    functions.make_rastrigin(2),
+    ]
+
+
+class FunctionCallCounter(object):
+    def __init__(self, function):
+        self.function = function
+        self.counter = 0
+
+    def __call__(self, *args, **kwargs):
+        self.counter += 1
+        return self.function(*args, **kwargs)
+
+
+def count_evaluations(test_function, bounder_class, ftol=1e-2,
+                      max_function_evaluations=20000,
+                      branching_strategy=None):
+    """
+    Parameters
+    ----------
+    branching_strategy : BranchingStrategy or None, optional
+        Default is the one minimize_branch_bound uses for the bounder.
+
+    Returns
+    -------
+    nfev : int
+        The number of evaluations, including the initial corners.
+    converged : bool
+        Whether the minimum was certified to within `ftol` before
+        `max_function_evaluations` was reached.
+    error : float
+        The distance of the best value found above the true minimum.
+    """
+    objective_function = FunctionCallCounter(test_function.function)
+    initial_simplices = triangulate_function_on_hyperrectangle(
+        objective_function, test_function.bounds)
+    point_bounder = bound.OrdinaryPointBoundCalculator(
+        test_function.f_lipshitz_constant,
+        test_function.df1_dx1_lipshitz_constant)
+    if branching_strategy is None:
+        branching_strategy = _default_branching_strategy(bounder_class)
+    optimizer = BranchBoundOptimizer(
+        objective_function, initial_simplices, bounder_class(point_bounder),
+        branching_strategy=branching_strategy)
+    result = optimizer.optimize(
+        max_function_evaluations=max_function_evaluations, ftol=ftol)
+    error = result.fun - test_function.minimum
+    return objective_function.counter, result.success, error
+
+
+def _default_branching_strategy(bounder_class):
+    for name, strategy_class in _DEFAULT_BRANCHING_STRATEGIES.items():
+        if BOUNDERS.get(name) is bounder_class:
+            return strategy_class()
+    return None
+
+
+def benchmark(test_functions=TEST_FUNCTIONS, bounders=BOUNDERS, **kwargs):
+    results = dict()
+    for test_function in test_functions:
+        dimension = len(test_function.bounds)
+        for bounder_name, bounder_class in bounders.items():
+            key = (test_function.name, dimension, bounder_name)
+            results[key] = count_evaluations(
+                test_function, bounder_class, **kwargs)
+    return results
+
+
+if __name__ == '__main__':
+    row = "{:<18}{:<5}{:<14}{:>8}{:>11}{:>12}"
+    print(row.format('function', 'd', 'bounder', 'nfev', 'converged', 'error'))
+    for (name, dimension, bounder), result in benchmark().items():
+        nfev, converged, error = result
+        print(row.format(
+            name, dimension, bounder, nfev, str(converged),
+            '{:.2e}'.format(error)))
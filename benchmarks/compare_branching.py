@@ -0,0 +1,47 @@
+"""
+Compares the number of function evaluations each pair of branching
+strategy and simplex bounder needs to certify the global minimum of
+the standard test functions to within ftol.
+
+Run as
+    python -m globaloptimize.benchmarks.compare_branching
+"""
+from globaloptimize.branch import branch
+from globaloptimize.benchmarks.compare_bounders import (
+    BOUNDERS, TEST_FUNCTIONS, count_evaluations)
+
+
+STRATEGIES = {
+    'max_vertex': branch.MaxVertexEdgeBranchingStrategy,
+    'min_vertex': branch.MinVertexEdgeBranchingStrategy,
+    'longest_edge': branch.LongestEdgeBranchingStrategy,
+    'longest_edge_3way': lambda: branch.MultiwayBranchingStrategy(
+        branch.LongestEdgeBranchingStrategy(), num_pieces=3),
+    }
+
+
+def benchmark(test_functions=TEST_FUNCTIONS, strategies=STRATEGIES,
+              bounders=BOUNDERS, **kwargs):
+    results = dict()
+    for test_function in test_functions:
+        dimension = len(test_function.bounds)
+        for strategy_name, make_strategy in strategies.items():
+            for bounder_name, bounder_class in bounders.items():
+                key = (
+                    test_function.name, dimension, strategy_name,
+                    bounder_name)
+                results[key] = count_evaluations(
+                    test_function, bounder_class,
+                    branching_strategy=make_strategy(), **kwargs)
+    return results
+
+
+if __name__ == '__main__':
+    row = "{:<18}{:<5}{:<19}{:<14}{:>8}{:>11}{:>12}"
+    print(row.format(
+        'function', 'd', 'strategy', 'bounder', 'nfev', 'converged',
+        'error'))
+    for key, result in benchmark().items():
+        nfev, converged, error = result
+        print(row.format(
+            *key, nfev, str(converged), '{:.2e}'.format(error)))
@@ -0,0 +1,150 @@
+"""
+Standard global-optimization test functions, with the Lipschitz
+constants on f and on its gradient which the bounders need.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+
+TestFunction = namedtuple(
+    'TestFunction',
+    ['name', 'function', 'bounds', 'minimum',
+     'f_lipshitz_constant', 'df1_dx1_lipshitz_constant'])
+
+
+def sphere(x):
+    return np.sum(np.square(x))
+
+
+def styblinski_tang(x):
+    x = np.asarray(x)
+    return 0.5 * np.sum(x**4 - 16 * x**2 + 5 * x)
+
+
+def rastrigin(x):
+    x = np.asarray(x)
+    return 10 * x.size + np.sum(x**2 - 10 * np.cos(2 * np.pi * x))
+
+
+def branin(x):
+    x1, x2 = x
+    b = 5.1 / (4 * np.pi**2)
+    c = 5 / np.pi
+    t = 1 / (8 * np.pi)
+    return (x2 - b * x1**2 + c * x1 - 6)**2 + 10 * (1 - t) * np.cos(x1) + 10
+
+
+def six_hump_camel(x):
+    x1, x2 = x
+    return ((4 - 2.1 * x1**2 + x1**4 / 3) * x1**2 + x1 * x2 +
+            (4 * x2**2 - 4) * x2**2)
+
+
+_HARTMANN_ALPHA = np.array([1.0, 1.2, 3.0, 3.2])
+
+_HARTMANN_A = {
+    3: np.array([
+        [3.0, 10, 30],
+        [0.1, 10, 35],
+        [3.0, 10, 30],
+        [0.1, 10, 35]]),
+    6: np.array([
+        [10, 3, 17, 3.5, 1.7, 8],
+        [0.05, 10, 17, 0.1, 8, 14],
+        [3, 3.5, 1.7, 10, 17, 8],
+        [17, 8, 0.05, 10, 0.1, 14]]),
+    }
+
+_HARTMANN_P = {
+    3: 1e-4 * np.array([
+        [3689, 1170, 2673],
+        [4699, 4387, 7470],
+        [1091, 8732, 5547],
+        [381, 5743, 8828]]),
+    6: 1e-4 * np.array([
+        [1312, 1696, 5569, 124, 8283, 5886],
+        [2329, 4135, 8307, 3736, 1004, 9991],
+        [2348, 1451, 3522, 2883, 3047, 6650],
+        [4047, 8828, 8732, 5743, 1091, 381]]),
+    }
+
+_HARTMANN_MINIMUM = {3: -3.86278214782076, 6: -3.32236801141551}
+
+
+def hartmann(x):
+    x = np.asarray(x)
+    a = _HARTMANN_A[x.size]
+    p = _HARTMANN_P[x.size]
+    return -np.sum(_HARTMANN_ALPHA * np.exp(-np.sum(a * (x - p)**2, axis=1)))
+
+
+def make_sphere(dimension):
+    # Off-center bounds, so the minimum is not at the center of the box.
+    bounds = [[-1.0, 2.0]] * dimension
+    return TestFunction(
+        'sphere', sphere, bounds, 0.0,
+        f_lipshitz_constant=4 * np.sqrt(dimension),
+        df1_dx1_lipshitz_constant=2.0)
+
+
+def make_styblinski_tang(dimension):
+    # |f''| <= 0.5 * (12 * 5**2 - 32) per coordinate, and the gradient
+    # per coordinate is largest at the boundary.
+    bounds = [[-5.0, 5.0]] * dimension
+    return TestFunction(
+        'styblinski_tang', styblinski_tang, bounds, -39.16616570 * dimension,
+        f_lipshitz_constant=172.5 * np.sqrt(dimension),
+        df1_dx1_lipshitz_constant=134.0)
+
+
+def make_rastrigin(dimension):
+    bounds = [[-5.12, 5.12]] * dimension
+    return TestFunction(
+        'rastrigin', rastrigin, bounds, 0.0,
+        f_lipshitz_constant=(2 * 5.12 + 20 * np.pi) * np.sqrt(dimension),
+        df1_dx1_lipshitz_constant=2 + 40 * np.pi**2)
+
+
+def make_branin(dimension=2):
+    # The constants are the maxima of |grad f| and of the Frobenius norm
+    # of the Hessian on a fine grid, rounded up.
+    if dimension != 2:
+        raise ValueError("branin is only defined in 2 dimensions")
+    bounds = [[-5.0, 10.0], [0.0, 15.0]]
+    return TestFunction(
+        'branin', branin, bounds, 0.397887357729739,
+        f_lipshitz_constant=120.0,
+        df1_dx1_lipshitz_constant=32.0)
+
+
+def make_six_hump_camel(dimension=2):
+    # The constants are the maxima of |grad f| and of the Frobenius norm
+    # of the Hessian on a fine grid, rounded up.
+    if dimension != 2:
+        raise ValueError("six_hump_camel is only defined in 2 dimensions")
+    bounds = [[-3.0, 3.0], [-2.0, 2.0]]
+    return TestFunction(
+        'six_hump_camel', six_hump_camel, bounds, -1.031628453489877,
+        f_lipshitz_constant=310.0,
+        df1_dx1_lipshitz_constant=620.0)
+
+
+def make_hartmann(dimension):
+    # Each term alpha * exp(-q), with q = sum(a * (x - p)**2), has
+    # |grad| <= alpha * max(2 r exp(-r**2)) * sqrt(max(a)), and the
+    # Frobenius norm of its Hessian is at most
+    # alpha * (max(4 r**2 exp(-r**2)) * max(a) + 2 * |a|).
+    if dimension not in _HARTMANN_A:
+        raise ValueError("hartmann is only defined in 3 and 6 dimensions")
+    a = _HARTMANN_A[dimension]
+    largest = a.max(axis=1)
+    f_lipshitz_constant = np.sum(
+        _HARTMANN_ALPHA * np.sqrt(2 * largest / np.e))
+    df1_dx1_lipshitz_constant = np.sum(
+        _HARTMANN_ALPHA * (4 * largest / np.e + 2 * np.linalg.norm(a, axis=1)))
+    bounds = [[0.0, 1.0]] * dimension
+    return TestFunction(
+        'hartmann', hartmann, bounds, _HARTMANN_MINIMUM[dimension],
+        f_lipshitz_constant=f_lipshitz_constant,
+        df1_dx1_lipshitz_constant=df1_dx1_lipshitz_constant)
@@ -0,0 +1,320 @@
+"""
+A reproducible benchmark suite for BranchBoundOptimizer, on the standard
+test functions in 2 to 8 dimensions, for each simplex bounder and
+branching strategy.
+
+Each run records the function evaluations, iterations, wall time and
+throughput, the peak memory traced by tracemalloc, the final heap size,
+lower bound and gap, and the seconds spent in each phase. The results
+are written as JSON, with the versions they were made with, so that two
+versions of the optimizer can be compared.
+
+Run as
+    python -m globaloptimize.benchmarks.suite --output new.json
+    python -m globaloptimize.benchmarks.suite --compare old.json new.json
+"""
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import datetime
+import subprocess
+import tracemalloc
+
+import numpy as np
+import scipy
+
+from globaloptimize.optimize import BranchBoundOptimizer
+from globaloptimize.bound import bound
+from globaloptimize.benchmarks import functions
+from globaloptimize.benchmarks.compare_bounders import (
+    BOUNDERS, FunctionCallCounter)
+from globaloptimize.benchmarks.compare_branching import STRATEGIES
+
+
+TEST_FUNCTIONS = [
+    functions.make_sphere(2),
+    functions.make_branin(),
+    functions.make_six_hump_camel(),
+    functions.make_styblinski_tang(2),
+    functions.make_rastrigin(2),
+    functions.make_hartmann(3),
+    functions.make_sphere(4),
+    functions.make_styblinski_tang(4),
+    functions.make_hartmann(6),
+    functions.make_sphere(8),
+    ]
+
+DEFAULT_STRATEGIES = ['max_vertex', 'longest_edge']
+
+# Above this dimension, the d! simplices of the triangulation are made
+# lazily; see BranchBoundOptimizer.from_hyperrectangle.
+MAX_EAGER_DIMENSION = 4
+
+# The measurements which `compare` checks, for all of which more is
+# worse:
+_COMPARED = ['nfev', 'seconds_per_evaluation', 'peak_memory']
+
+_ROW = "{:<16}{:<4}{:<14}{:<14}{:>7}{:>11}{:>10}{:>10}{:>12}"
+
+
+def run_case(test_function, bounder_name, strategy_name, ftol=1e-2,
+             max_function_evaluations=5000, measure_memory=True):
+    """
+    Minimize one test function with one bounder and branching strategy.
+
+    Parameters
+    ----------
+    test_function : functions.TestFunction
+    bounder_name : str
+        A key of BOUNDERS.
+    strategy_name : str
+        A key of STRATEGIES.
+    ftol : float, optional
+    max_function_evaluations : int, optional
+        Including the evaluations at the corners.
+    measure_memory : bool, optional
+        Whether to repeat the run under tracemalloc, which slows it
+        down, to measure its peak memory. The optimizer is
+        deterministic, so the repeat does the same work.
+
+    Returns
+    -------
+    dict
+        With the case and the measurements, all JSON-serializable.
+    """
+    dimension = len(test_function.bounds)
+    case = {
+        'function': test_function.name,
+        'dimension': dimension,
+        'bounder': bounder_name,
+        'strategy': strategy_name,
+        'lazy': dimension > MAX_EAGER_DIMENSION,
+        }
+    start = time.perf_counter()
+    result, nfev = _minimize(
+        test_function, bounder_name, strategy_name, ftol,
+        max_function_evaluations)
+    wall_time = time.perf_counter() - start
+    peak_memory = None
+    if measure_memory:
+        tracemalloc.start()
+        try:
+            _minimize(
+                test_function, bounder_name, strategy_name, ftol,
+                max_function_evaluations)
+            peak_memory = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    case.update(
+        nfev=nfev,
+        nit=int(result.nit),
+        success=bool(result.success),
+        fun=float(result.fun),
+        error=float(result.fun - test_function.minimum),
+        lower_bound=float(result.lower_bound),
+        gap=float(result.gap),
+        heap_size=int(result.heap_size),
+        wall_time=wall_time,
+        seconds_per_evaluation=wall_time / nfev,
+        peak_memory=peak_memory,
+        timings=result.timings)
+    return case
+
+
+def run_suite(test_functions=TEST_FUNCTIONS, bounders=None,
+              strategies=DEFAULT_STRATEGIES, progress=None, **kwargs):
+    """
+    Run every combination of test function, bounder and strategy.
+
+    Parameters
+    ----------
+    test_functions : list of functions.TestFunction, optional
+    bounders, strategies : list of str, optional
+        Keys of BOUNDERS and STRATEGIES. Default is every bounder, and
+        the default and longest-edge strategies.
+    progress : callable or None, optional
+        progress(case), called with the result of each run.
+    **kwargs
+        Passed to `run_case`, e.g. `max_function_evaluations`.
+
+    Returns
+    -------
+    dict
+        With 'metadata', the versions and machine, 'settings', and
+        'results', a list of the dicts returned by `run_case`.
+    """
+    if bounders is None:
+        bounders = sorted(BOUNDERS)
+    results = []
+    for test_function in test_functions:
+        for strategy_name in strategies:
+            for bounder_name in bounders:
+                case = run_case(
+                    test_function, bounder_name, strategy_name, **kwargs)
+                if progress is not None:
+                    progress(case)
+                results.append(case)
+    return {
+        'metadata': _metadata(),
+        'settings': kwargs,
+        'results': results,
+        }
+
+
+def write_results(suite_results, path):
+    with open(path, 'w') as f:
+        json.dump(suite_results, f, indent=1, sort_keys=True)
+
+
+def read_results(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(baseline, current, rtol=0.2):
+    """
+    Find the measurements of `current` which are worse than those of
+    the same case in `baseline` by more than a factor of `1 + rtol`,
+    e.g. a drop in throughput, and the cases which no longer converge.
+
+    Parameters
+    ----------
+    baseline, current : dict
+        As returned by `run_suite` or `read_results`.
+    rtol : float, optional
+
+    Returns
+    -------
+    list of str
+        A description of each regression.
+    """
+    old_cases = {_key(case): case for case in baseline['results']}
+    regressions = []
+    for case in current['results']:
+        old = old_cases.get(_key(case))
+        if old is None:
+            continue
+        name = '{function} {dimension}d {bounder} {strategy}'.format(**case)
+        if old['success'] and not case['success']:
+            regressions.append('{}: no longer converges'.format(name))
+        for measurement in _COMPARED:
+            before = old.get(measurement)
+            after = case.get(measurement)
+            if before is None or after is None:
+                continue
+            if after > (1 + rtol) * before:
+                regressions.append('{}: {} went from {:.4g} to {:.4g}'.format(
+                    name, measurement, before, after))
+    return regressions
+
+
+def _minimize(test_function, bounder_name, strategy_name, ftol,
+              max_function_evaluations):
+    objective_function = FunctionCallCounter(test_function.function)
+    point_bounder = bound.OrdinaryPointBoundCalculator(
+        test_function.f_lipshitz_constant,
+        test_function.df1_dx1_lipshitz_constant)
+    dimension = len(test_function.bounds)
+    optimizer = BranchBoundOptimizer.from_hyperrectangle(
+        objective_function, test_function.bounds,
+        BOUNDERS[bounder_name](point_bounder),
+        lazy=dimension > MAX_EAGER_DIMENSION,
+        branching_strategy=STRATEGIES[strategy_name]())
+    result = optimizer.optimize(
+        max_function_evaluations=max(
+            max_function_evaluations - objective_function.counter, 0),
+        ftol=ftol)
+    return result, objective_function.counter
+
+
+def _key(case):
+    return (case['function'], case['dimension'], case['bounder'],
+            case['strategy'])
+
+
+def _metadata():
+    return {
+        'time': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'scipy': scipy.__version__,
+        'platform': platform.platform(),
+        'processor': platform.processor(),
+        }
+
+
+def _git_commit():
+    try:
+        output = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)), check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output.stdout.strip()
+
+
+def _print_case(case):
+    memory = case['peak_memory']
+    print(_ROW.format(
+        case['function'], case['dimension'], case['strategy'],
+        case['bounder'], case['nfev'], str(case['success']),
+        '{:.2e}'.format(case['gap']),
+        '{:.2f}s'.format(case['wall_time']),
+        '-' if memory is None else '{:.1f}MB'.format(memory / 2**20)))
+    sys.stdout.flush()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--output', help="write the results to this file")
+    parser.add_argument(
+        '--compare', nargs=2, metavar=('OLD', 'NEW'),
+        help="compare two results files, instead of running the suite")
+    parser.add_argument('--ftol', type=float, default=1e-2)
+    parser.add_argument('--max-function-evaluations', type=int, default=5000)
+    parser.add_argument(
+        '--max-dimension', type=int, default=8,
+        help="skip the test functions in more dimensions")
+    parser.add_argument('--bounders', nargs='+', choices=sorted(BOUNDERS))
+    parser.add_argument(
+        '--strategies', nargs='+', choices=sorted(STRATEGIES),
+        default=DEFAULT_STRATEGIES)
+    parser.add_argument(
+        '--no-memory', action='store_true',
+        help="skip the repeat runs which measure peak memory")
+    parser.add_argument(
+        '--rtol', type=float, default=0.2,
+        help="the relative change which --compare reports")
+    args = parser.parse_args(argv)
+
+    if args.compare is not None:
+        regressions = compare(
+            *[read_results(path) for path in args.compare], rtol=args.rtol)
+        for regression in regressions:
+            print(regression)
+        return 1 if regressions else 0
+
+    print(_ROW.format(
+        'function', 'd', 'strategy', 'bounder', 'nfev', 'converged', 'gap',
+        'time', 'memory'))
+    suite_results = run_suite(
+        test_functions=[
+            test_function for test_function in TEST_FUNCTIONS
+            if len(test_function.bounds) <= args.max_dimension],
+        bounders=args.bounders,
+        strategies=args.strategies,
+        progress=_print_case,
+        ftol=args.ftol,
+        max_function_evaluations=args.max_function_evaluations,
+        measure_memory=not args.no_memory)
+    if args.output is not None:
+        write_results(suite_results, args.output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,97 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from globaloptimize.benchmarks import functions, suite
+
+
+class TestTestFunctions(unittest.TestCase):
+    def test_minima(self):
+        minimizers = [
+            (functions.make_hartmann(3), [0.114614, 0.555649, 0.852547]),
+            (functions.make_hartmann(6),
+             [0.20169, 0.150011, 0.476874, 0.275332, 0.311652, 0.6573]),
+            (functions.make_six_hump_camel(), [0.0898, -0.7126]),
+            (functions.make_branin(), [np.pi, 2.275]),
+            ]
+        for test_function, minimizer in minimizers:
+            value = test_function.function(np.array(minimizer))
+            self.assertAlmostEqual(value, test_function.minimum, places=4)
+
+    def test_lipshitz_constants_bound_random_slopes(self):
+        np.random.seed(1229)
+        test_functions = [
+            functions.make_hartmann(3),
+            functions.make_hartmann(6),
+            functions.make_six_hump_camel(),
+            ]
+        for test_function in test_functions:
+            lower, upper = np.transpose(test_function.bounds)
+            x = lower + (upper - lower) * np.random.rand(500, lower.size)
+            y = lower + (upper - lower) * np.random.rand(500, lower.size)
+            fx = np.array([test_function.function(p) for p in x])
+            fy = np.array([test_function.function(p) for p in y])
+            slopes = np.abs(fx - fy) / np.linalg.norm(x - y, axis=1)
+            self.assertLess(slopes.max(), test_function.f_lipshitz_constant)
+
+    def test_raises_error_in_unsupported_dimensions(self):
+        self.assertRaises(ValueError, functions.make_hartmann, 4)
+        self.assertRaises(ValueError, functions.make_six_hump_camel, 3)
+
+
+class TestSuite(unittest.TestCase):
+    def test_run_case_records_measurements(self):
+        case = suite.run_case(
+            functions.make_sphere(2), 'max_point', 'max_vertex',
+            max_function_evaluations=100)
+        self.assertTrue(case['success'])
+        self.assertLessEqual(case['nfev'], 100)
+        self.assertGreater(case['peak_memory'], 0)
+        self.assertLessEqual(case['gap'], 1e-2)
+        for key in ['wall_time', 'heap_size', 'timings', 'error']:
+            self.assertIn(key, case)
+
+    def test_budget_includes_corners(self):
+        case = suite.run_case(
+            functions.make_sphere(3), 'max_point', 'max_vertex', ftol=0,
+            max_function_evaluations=20, measure_memory=False)
+        self.assertEqual(case['nfev'], 20)
+        self.assertFalse(case['success'])
+        self.assertIsNone(case['peak_memory'])
+
+    def test_results_round_trip_through_json(self):
+        results = suite.run_suite(
+            test_functions=[functions.make_sphere(2)],
+            bounders=['max_point', 'centroid'],
+            strategies=['longest_edge'],
+            max_function_evaluations=50,
+            measure_memory=False)
+        self.assertEqual(len(results['results']), 2)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'results.json')
+            suite.write_results(results, path)
+            loaded = suite.read_results(path)
+        self.assertEqual(loaded['results'], results['results'])
+        self.assertIn('numpy', loaded['metadata'])
+
+    def test_compare_finds_regressions(self):
+        case = {
+            'function': 'sphere', 'dimension': 2, 'bounder': 'max_point',
+            'strategy': 'max_vertex', 'success': True, 'nfev': 100,
+            'seconds_per_evaluation': 1e-4, 'peak_memory': None,
+            }
+        slower = dict(case, seconds_per_evaluation=2e-4)
+        failed = dict(case, success=False)
+        baseline = {'results': [case]}
+        self.assertEqual(suite.compare(baseline, baseline), [])
+        for worse in [slower, failed]:
+            regressions = suite.compare(baseline, {'results': [worse]})
+            self.assertEqual(len(regressions), 1)
+        self.assertEqual(
+            suite.compare({'results': [slower]}, baseline), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
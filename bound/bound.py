@@ -1,3 +1,5 @@
+import math
+
 import numpy as np
 
 from globaloptimize.geometry.simplex import Simplex
@@ -10,6 +12,9 @@ local minimum, and we have Lipshitz contraints on:
     - d^2 f / dx^2      (i.3. 3rd derivative is bounded)
     - d^3 f / dx^3      (i.e. 4th derivative is bounded)
     - d^4 f / dx^4      (i.e. 5th derivative is bounded)
+These are LocalMinimumPointBoundCalculator, which the
+LocalMinimumSimplexBoundCalculator uses for simplices with a vertex
+flagged as a local minimum.
 """
 
 
@@ -23,9 +28,72 @@ class SimplexBoundCalculator(object):
             raise ValueError("simplex must be a Simplex instance")
         return self._bound(simplex)
 
+    def bound_vertices(self, points, values, is_local_minimum=None):
+        """
+        Parameters
+        ----------
+        points : (d + 1, d) numpy.ndarray
+            The vertices of the simplex, e.g. a row of a SimplexStore.
+        values : (d + 1,) numpy.ndarray
+            The function values at the vertices.
+        is_local_minimum : (d + 1,) numpy.ndarray of bools, optional
+            Which vertices are known local minima. Only bounders which
+            are tighter near local minima use this.
+        """
+        return self._bound_vertices(points, values)
+
+    def bound_many(self, points, values, is_local_minimum=None):
+        """
+        Parameters
+        ----------
+        points : (n, d + 1, d) numpy.ndarray
+            The stacked vertices of n simplices, e.g. as returned by
+            SimplexStore.simplex_points.
+        values : (n, d + 1) numpy.ndarray
+            The function values at the vertices.
+        is_local_minimum : (n, d + 1) numpy.ndarray of bools, optional
+            Which vertices are known local minima. Only bounders which
+            are tighter near local minima use this.
+
+        Returns
+        -------
+        (n,) numpy.ndarray
+        """
+        points, values = _check_many(points, values)
+        return self._bound_many(points, values)
+
+    def bound_polytope(self, points, values, is_local_minimum=None):
+        """
+        Like bound_vertices, but for a convex polytope with any number
+        of vertices, e.g. a region of a KuhnCover.
+
+        Parameters
+        ----------
+        points : (m, d) numpy.ndarray
+        values : (m,) numpy.ndarray
+        is_local_minimum : (m,) numpy.ndarray of bools, optional
+        """
+        return self._bound_polytope(
+            np.asarray(points, dtype='float'),
+            np.asarray(values, dtype='float'))
+
     def _bound(self, simplex):
+        return self._bound_vertices(simplex.points, simplex.values)
+
+    def _bound_vertices(self, points, values):
         raise NotImplementedError("Implement in subclass")
 
+    def _bound_polytope(self, points, values):
+        # Correct for bounds which only use distances between vertices
+        # and points which are convex combinations of them.
+        return self._bound_vertices(points, values)
+
+    def _bound_many(self, points, values):
+        # Subclasses should override this with a vectorized version.
+        return np.array([
+            self._bound_vertices(p, v) for p, v in zip(points, values)],
+            dtype='float')
+
 
 class MaxPointSimplexBoundCalculator(SimplexBoundCalculator):
     """Bound as max(f) - h(max distance from argmax(f))"""
@@ -34,20 +102,190 @@ class MaxPointSimplexBoundCalculator(SimplexBoundCalculator):
         self.point_bound_calculator = point_bound_calculator
 
     def _bound(self, simplex):
-        max_vertex = simplex.vertex_with_max_value
-        point = max_vertex.point
-        max_distance = max([
-            np.linalg.norm(point - fp.point)
-            for fp in simplex.function_points])
+        # Uses the simplex's cached argmax and edge lengths.
+        index = simplex.index_of_max_value
+        max_distance = simplex.edge_lengths[index].max()
         max_difference = self.point_bound_calculator.bound(max_distance)
-        return max_vertex.value - max_difference
+        return simplex.values[index] - max_difference
+
+    def _bound_vertices(self, points, values):
+        index = np.argmax(values)
+        max_distance = np.linalg.norm(points - points[index], axis=1).max()
+        max_difference = self.point_bound_calculator.bound(max_distance)
+        return values[index] - max_difference
+
+    def _bound_many(self, points, values):
+        index = np.argmax(values, axis=1)
+        max_points = np.take_along_axis(
+            points, index.reshape(-1, 1, 1), axis=1)
+        max_values = np.take_along_axis(values, index.reshape(-1, 1), axis=1)
+        max_distance = np.linalg.norm(points - max_points, axis=2).max(axis=1)
+        max_difference = self.point_bound_calculator.bound(max_distance)
+        return max_values[:, 0] - max_difference
+
+
+class MinPointSimplexBoundCalculator(SimplexBoundCalculator):
+    """
+    Base class for bounds of the form min(f) - h(r), where every point
+    of the simplex is within a distance r of some vertex.
+
+    The radius r comes from the identity, for any point p and any
+    x = sum_i l_i v_i in the simplex (l_i >= 0, sum_i l_i = 1),
+        sum_i l_i |x - v_i|^2 = sum_i l_i |v_i - p|^2 - |x - p|^2,
+    so that the nearest vertex to x is within max_i |v_i - p| of it.
+    """
+
+    def __init__(self, point_bound_calculator):
+        self.point_bound_calculator = point_bound_calculator
+
+    def _bound_vertices(self, points, values):
+        return self._bound_many(points[None], values[None])[0]
+
+    def _bound_many(self, points, values):
+        radii = self._radii(points)
+        return values.min(axis=1) - self.point_bound_calculator.bound(radii)
+
+    def _radii(self, points):
+        raise NotImplementedError("Implement in subclass")
+
+
+class CircumsphereSimplexBoundCalculator(MinPointSimplexBoundCalculator):
+    """Bound as min(f) - h(radius of circumscribing sphere)
+
+    The tightest of the bounds for well-shaped simplices, but loose for
+    flat ones, whose circumcenters are far outside of them."""
+
+    def _radii(self, points):
+        return _circumradii(points)
+
+    def _bound_polytope(self, points, values):
+        # Only simplices have a circumsphere through all their vertices,
+        # so polytopes fall back to the centroid radius.
+        centroid = points.mean(axis=0)
+        radius = np.linalg.norm(points - centroid, axis=1).max()
+        return values.min() - self.point_bound_calculator.bound(radius)
+
+
+class CentroidSimplexBoundCalculator(MinPointSimplexBoundCalculator):
+    """Bound as min(f) - h(max distance from the centroid to a vertex)"""
+
+    def _radii(self, points):
+        centroids = points.mean(axis=1, keepdims=True)
+        return np.linalg.norm(points - centroids, axis=2).max(axis=1)
+
+
+class LocalMinimumSimplexBoundCalculator(SimplexBoundCalculator):
+    """
+    Bound as the larger of another simplex bound and, for each vertex
+    flagged as a local minimum, f - h(max distance from the vertex),
+    where h is a LocalMinimumPointBoundCalculator.
+
+    Simplices without a flagged vertex get the other bound unchanged.
+    """
+
+    def __init__(self, simplex_bound_calculator, point_bound_calculator):
+        """
+        Parameters
+        ----------
+        simplex_bound_calculator : SimplexBoundCalculator
+            The bound used for all simplices.
+        point_bound_calculator : LocalMinimumPointBoundCalculator
+            The bound used around vertices which are local minima.
+        """
+        self.simplex_bound_calculator = simplex_bound_calculator
+        self.point_bound_calculator = point_bound_calculator
+
+    def bound_vertices(self, points, values, is_local_minimum=None):
+        if is_local_minimum is not None:
+            is_local_minimum = np.asarray(is_local_minimum)[None]
+        return self.bound_many(
+            np.asarray(points)[None], np.asarray(values)[None],
+            is_local_minimum)[0]
+
+    def bound_many(self, points, values, is_local_minimum=None):
+        points, values = _check_many(points, values)
+        bounds = np.asarray(
+            self.simplex_bound_calculator.bound_many(points, values),
+            dtype='float')
+        if is_local_minimum is None:
+            return bounds
+        is_local_minimum = np.asarray(is_local_minimum, dtype='bool')
+        if is_local_minimum.shape != values.shape:
+            msg = "is_local_minimum must be the same shape as values"
+            raise ValueError(msg)
+        rows = np.flatnonzero(is_local_minimum.any(axis=1))
+        if rows.size > 0:
+            bounds[rows] = np.maximum(bounds[rows], self._bound_near_minima(
+                points[rows], values[rows], is_local_minimum[rows]))
+        return bounds
+
+    def bound_polytope(self, points, values, is_local_minimum=None):
+        points = np.asarray(points, dtype='float')
+        values = np.asarray(values, dtype='float')
+        bound = self.simplex_bound_calculator.bound_polytope(points, values)
+        if is_local_minimum is None or not np.any(is_local_minimum):
+            return bound
+        minima = np.flatnonzero(is_local_minimum)
+        max_distance = np.linalg.norm(
+            points[None, :, :] - points[minima, None, :], axis=2).max(axis=1)
+        near_minima = values[minima] - self.point_bound_calculator.bound(
+            max_distance)
+        return max(bound, near_minima.max())
+
+    def _bound(self, simplex):
+        if simplex.store is not None:
+            vertex_indices = simplex.store.simplices[simplex.index]
+            is_local_minimum = simplex.store.is_local_minimum[vertex_indices]
+        else:
+            is_local_minimum = [
+                fp.is_local_minimum for fp in simplex.function_points]
+        return self.bound_vertices(
+            simplex.points, simplex.values, is_local_minimum)
+
+    def _bound_near_minima(self, points, values, is_local_minimum):
+        differences = points[:, :, None, :] - points[:, None, :, :]
+        max_distance = np.linalg.norm(differences, axis=3).max(axis=2)
+        bounds = values - self.point_bound_calculator.bound(max_distance)
+        bounds[~is_local_minimum] = -np.inf
+        return bounds.max(axis=1)
 
 
-# TODO other bounding options:
-# 1. min(f) - h(radius of circumscribing sphere)
-# 2. min(f) - h(max (dist from simplex center to all vertices))
-# The first one should be the tightest bound, but it will take a little
-# longer to compute when there are many variables.
+def _check_many(points, values):
+    points = np.asarray(points, dtype='float')
+    values = np.asarray(values, dtype='float')
+    if points.ndim != 3 or values.shape != points.shape[:2]:
+        msg = "points must be (n, d+1, d) and values must be (n, d+1)"
+        raise ValueError(msg)
+    return points, values
+
+
+def _circumradii(points):
+    """
+    The circumradii of a stack of (n, d + 1, d) simplices, found in one
+    batched solve. Degenerate simplices have an infinite circumradius,
+    as do slivers so flat that the solve overflows.
+
+    Relative to vertex 0, the circumcenter u satisfies
+        2 (v_i - v_0) . u = |v_i - v_0|^2    for i = 1, ..., d.
+    """
+    with np.errstate(over='ignore', invalid='ignore'):
+        edges = points[:, 1:, :] - points[:, :1, :]
+        matrices = 2 * edges
+        targets = (edges**2).sum(axis=2)
+        try:
+            centers = np.linalg.solve(matrices, targets[..., None])[..., 0]
+            radii = np.linalg.norm(centers, axis=1)
+        except np.linalg.LinAlgError:
+            radii = np.full(points.shape[0], np.inf)
+            for index, (matrix, target) in enumerate(zip(matrices, targets)):
+                try:
+                    radii[index] = np.linalg.norm(
+                        np.linalg.solve(matrix, target))
+                except np.linalg.LinAlgError:
+                    pass
+    radii[~np.isfinite(radii)] = np.inf
+    return radii
+
 
 # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 #                 Bounds for distances from a point
@@ -72,9 +310,208 @@ class OrdinaryPointBoundCalculator(PointBoundCalculator):
             0.5 * self.f_lipshitz_constant**2 / df1_dx1_lipshitz_constant)
 
     def bound(self, distance):
-        if distance < self._cutoff_dist:
-            bound = 0.5 * self.df1_dx1_lipshitz_constant * distance**2
-        else:
-            bound = self.f_lipshitz_constant * distance - self._offset
+        """
+        Parameters
+        ----------
+        distance : float or numpy.ndarray
+            For an array of distances, an array of bounds is returned.
+        """
+        # An infinite distance, e.g. the circumradius of a flat simplex,
+        # has an infinite bound; the long-distance form would give NaN
+        # when the f Lipshitz constant is infinite too.
+        if np.ndim(distance) == 0:
+            if distance < self._cutoff_dist or distance == np.inf:
+                return self._bound_short(distance)
+            return self._bound_long(distance)
+        distance = np.asarray(distance, dtype='float')
+        bound = np.empty_like(distance)
+        short = (distance < self._cutoff_dist) | (distance == np.inf)
+        bound[short] = self._bound_short(distance[short])
+        bound[~short] = self._bound_long(distance[~short])
         return bound
 
+    def _bound_short(self, distance):
+        return 0.5 * self.df1_dx1_lipshitz_constant * distance**2
+
+    def _bound_long(self, distance):
+        return self.f_lipshitz_constant * distance - self._offset
+
+
+class AdaptiveLipschitzPointBoundCalculator(OrdinaryPointBoundCalculator):
+    """
+    An OrdinaryPointBoundCalculator whose Lipshitz constants are
+    estimated from the function values seen so far, as in LIPO or
+    adaptive DIRECT, instead of given up front.
+
+    The f constant is estimated as the largest slope |f(x) - f(y)| /
+    |x - y| observed, and the df/dx constant as the largest second
+    divided difference along a line, e.g. an edge which was bisected.
+    Both are lower bounds on the true constants, so the constants in
+    use are `safety_factor` times the estimates, capped at any known
+    upper bounds. Until a positive estimate is observed, a constant is
+    the cap, which is infinite by default: e.g. the df/dx constant
+    until an edge is split, so that only the f constant bounds f, or
+    both when every initial point has the same value, so that the
+    bounds are -inf.
+
+    The constants in use only change when an observation exceeds them,
+    and each change multiplies them by at least `safety_factor`, so the
+    bounds of a BranchBoundOptimizer with a `lipschitz_estimator` are
+    re-calculated rarely. The bounds are no longer certified: they are
+    only as good as the estimates.
+    """
+
+    def __init__(self, safety_factor=2.0, max_f_lipshitz_constant=np.inf,
+                 max_df1_dx1_lipshitz_constant=np.inf):
+        """
+        Parameters
+        ----------
+        safety_factor : float, optional
+            At least 1.
+        max_f_lipshitz_constant : float, optional
+        max_df1_dx1_lipshitz_constant : float, optional
+            Known upper bounds on the constants, if any.
+        """
+        if safety_factor < 1:
+            raise ValueError("safety_factor must be at least 1")
+        self.safety_factor = safety_factor
+        self.max_f_lipshitz_constant = max_f_lipshitz_constant
+        self.max_df1_dx1_lipshitz_constant = max_df1_dx1_lipshitz_constant
+        self.f_lipshitz_estimate = 0.0
+        self.df1_dx1_lipshitz_estimate = 0.0
+        # Whether each constant is still its cap, without an estimate:
+        self._f_is_cap = True
+        self._df1_dx1_is_cap = True
+        self._set_constants(
+            max_f_lipshitz_constant, max_df1_dx1_lipshitz_constant)
+
+    def observe(self, points, values):
+        """
+        Update the estimates with function values along line segments.
+
+        Parameters
+        ----------
+        points : (n, k, d) numpy.ndarray
+            n segments, each of k >= 2 points in order along a line,
+            e.g. the vertices of an edge and the points which split it.
+        values : (n, k) numpy.ndarray
+            The function values at the points.
+
+        Returns
+        -------
+        bool
+            Whether the constants in use changed, so that bounds
+            calculated before are invalid.
+        """
+        points = np.asarray(points, dtype='float')
+        values = np.asarray(values, dtype='float')
+        steps = np.linalg.norm(np.diff(points, axis=1), axis=2)
+        valid = steps > 0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            slopes = np.diff(values, axis=1) / steps
+            curvatures = 2 * np.diff(slopes, axis=1) / (
+                steps[:, 1:] + steps[:, :-1])
+        slopes = np.abs(slopes[valid])
+        curvatures = np.abs(curvatures[valid[:, 1:] & valid[:, :-1]])
+        if slopes.size > 0:
+            self.f_lipshitz_estimate = max(
+                self.f_lipshitz_estimate, slopes.max())
+        if curvatures.size > 0:
+            self.df1_dx1_lipshitz_estimate = max(
+                self.df1_dx1_lipshitz_estimate, curvatures.max())
+
+        f_constant = self._updated_constant(
+            self.f_lipshitz_constant, self.f_lipshitz_estimate,
+            self._f_is_cap, self.max_f_lipshitz_constant)
+        df1_dx1_constant = self._updated_constant(
+            self.df1_dx1_lipshitz_constant, self.df1_dx1_lipshitz_estimate,
+            self._df1_dx1_is_cap, self.max_df1_dx1_lipshitz_constant)
+        changed = (f_constant != self.f_lipshitz_constant or
+                   df1_dx1_constant != self.df1_dx1_lipshitz_constant)
+        if changed:
+            self._set_constants(f_constant, df1_dx1_constant)
+        self._f_is_cap &= self.f_lipshitz_estimate == 0
+        self._df1_dx1_is_cap &= self.df1_dx1_lipshitz_estimate == 0
+        return changed
+
+    def _updated_constant(self, constant, estimate, is_cap, cap):
+        # A zero estimate, e.g. from points with equal values, is no
+        # better than none, since the bound would be 0.
+        if estimate > 0 and (is_cap or estimate > constant):
+            return min(self.safety_factor * estimate, cap)
+        return constant
+
+    def _set_constants(self, f_constant, df1_dx1_constant):
+        self.f_lipshitz_constant = float(f_constant)
+        self.df1_dx1_lipshitz_constant = float(df1_dx1_constant)
+        # As in OrdinaryPointBoundCalculator, without dividing zero or
+        # infinity by itself: with only one finite constant, only that
+        # one bounds f.
+        if np.isinf(f_constant):
+            self._cutoff_dist = np.inf
+            self._offset = np.inf
+        elif np.isinf(df1_dx1_constant):
+            self._cutoff_dist = 0.0
+            self._offset = 0.0
+        else:
+            self._cutoff_dist = f_constant / df1_dx1_constant
+            self._offset = 0.5 * f_constant**2 / df1_dx1_constant
+
+
+class LocalMinimumPointBoundCalculator(PointBoundCalculator):
+    """Calculate bounds on f for distances from a point which is known
+    to be a local minimum.
+
+    At a local minimum x0 the gradient vanishes and the Hessian is
+    positive semidefinite, so a Taylor expansion to order n - 1 with
+    |d^n f| <= L gives, at distance r,
+        f(x) >= f(x0) - sum_{k=3}^{n-1} M_k r^k / k! - L r^n / n!,
+    where M_k bounds the k-th derivative at x0. Unlike the ordinary
+    bound there is no term linear in r.
+    """
+
+    def __init__(self, derivative_order, lipshitz_constant,
+                 derivative_bounds_at_minimum=()):
+        """
+        Parameters
+        ----------
+        derivative_order : {2, 3, 4, 5}
+            The order n of the derivative which `lipshitz_constant`
+            bounds, i.e. d^(n-1) f / dx^(n-1) is Lipshitz.
+        lipshitz_constant : float
+            The bound L on the n-th derivative everywhere.
+        derivative_bounds_at_minimum : list-like of floats, optional
+            Bounds M_3, ..., M_(n-1) on the 3rd to (n-1)-th derivatives
+            at the local minimum; needed only for n >= 4.
+        """
+        if derivative_order not in (2, 3, 4, 5):
+            raise ValueError("derivative_order must be 2, 3, 4, or 5")
+        derivative_bounds_at_minimum = tuple(derivative_bounds_at_minimum)
+        if len(derivative_bounds_at_minimum) != max(derivative_order - 3, 0):
+            msg = "derivative_bounds_at_minimum needs one bound for each "
+            msg += "derivative from the 3rd to the (derivative_order - 1)th"
+            raise ValueError(msg)
+        self.derivative_order = derivative_order
+        self.lipshitz_constant = lipshitz_constant
+        self.derivative_bounds_at_minimum = derivative_bounds_at_minimum
+
+        orders = range(3, derivative_order + 1)
+        constants = derivative_bounds_at_minimum + (lipshitz_constant,)
+        self._terms = [
+            (order, constant / math.factorial(order))
+            for order, constant in zip(orders, constants)]
+        if derivative_order == 2:
+            self._terms = [(2, 0.5 * lipshitz_constant)]
+
+    def bound(self, distance):
+        """
+        Parameters
+        ----------
+        distance : float or numpy.ndarray
+            For an array of distances, an array of bounds is returned.
+        """
+        if np.ndim(distance) != 0:
+            distance = np.asarray(distance, dtype='float')
+        return sum(
+            coefficient * distance**order
+            for order, coefficient in self._terms)
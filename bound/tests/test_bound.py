@@ -1,9 +1,11 @@
 import unittest
+import warnings
 
 import numpy as np
 
 from globaloptimize.bound import bound
-from globaloptimize.geometry.simplex import Simplex
+from globaloptimize.geometry.simplex import Simplex, FunctionPoint
+from globaloptimize.geometry.store import SimplexStore
 from globaloptimize.util.util import ObjectValuePair
 from globaloptimize.geometry.tests.test_simplex import make_simplex
 
@@ -20,6 +22,12 @@ class TestBoundCalculator(unittest.TestCase):
         function_point = simplex.function_points[0]
         self.assertRaises(ValueError, bounder.bound, function_point)
 
+    def test_bound_many_checks_shapes(self):
+        bounder = bound.SimplexBoundCalculator()
+        points = np.zeros((5, 4, 3))
+        values = np.zeros((5, 3))
+        self.assertRaises(ValueError, bounder.bound_many, points, values)
+
 
 class MaxPointSimplexBoundCalculator(unittest.TestCase):
     def test_bounds_correctly(self):
@@ -39,6 +47,191 @@ class MaxPointSimplexBoundCalculator(unittest.TestCase):
         correct = vertex_max_f - point_bounder.bound(max_dist_from_vertex)
         self.assertAlmostEqual(result, correct, places=13)
 
+    def test_bound_vertices_matches_bound(self):
+        np.random.seed(1503)
+        point_bounder = bound.OrdinaryPointBoundCalculator(1.0, 2.0)
+        simplex_bounder = bound.MaxPointSimplexBoundCalculator(point_bounder)
+        simplex = make_simplex(dimension=6)
+
+        from_simplex = simplex_bounder.bound(simplex)
+        from_vertices = simplex_bounder.bound_vertices(
+            simplex.points, simplex.values)
+        self.assertEqual(from_simplex, from_vertices)
+
+    def test_bound_many_matches_bound(self):
+        np.random.seed(1511)
+        point_bounder = bound.OrdinaryPointBoundCalculator(1.0, 2.0)
+        simplex_bounder = bound.MaxPointSimplexBoundCalculator(point_bounder)
+        simplices = [make_simplex(dimension=4) for _ in range(30)]
+        points = np.array([s.points for s in simplices])
+        values = np.array([s.values for s in simplices])
+
+        bounds = simplex_bounder.bound_many(points, values)
+        for simplex, this_bound in zip(simplices, bounds):
+            self.assertAlmostEqual(
+                simplex_bounder.bound(simplex), this_bound, places=13)
+
+
+class TestBoundPolytope(unittest.TestCase):
+    def test_matches_bound_vertices_for_simplices(self):
+        np.random.seed(1521)
+        point_bounder = bound.OrdinaryPointBoundCalculator(1.0, 2.0)
+        simplex = make_simplex(dimension=3)
+        for simplex_bounder in [
+                bound.MaxPointSimplexBoundCalculator(point_bounder),
+                bound.CentroidSimplexBoundCalculator(point_bounder)]:
+            self.assertEqual(
+                simplex_bounder.bound_polytope(simplex.points, simplex.values),
+                simplex_bounder.bound_vertices(simplex.points, simplex.values))
+
+    def test_bounds_every_point_of_polytope(self):
+        np.random.seed(1525)
+        point_bounder = bound.OrdinaryPointBoundCalculator(np.inf, 2.0)
+        # A square, whose points are convex combinations of 4 vertices:
+        points = np.array([[0, 0], [0, 1], [1, 0], [1, 1]], dtype='float')
+        f = lambda x: np.sum((x - 0.3)**2, axis=-1)
+        values = f(points)
+        interior = np.random.rand(1000, 2)
+        for simplex_bounder in [
+                bound.MaxPointSimplexBoundCalculator(point_bounder),
+                bound.CentroidSimplexBoundCalculator(point_bounder),
+                bound.CircumsphereSimplexBoundCalculator(point_bounder)]:
+            this_bound = simplex_bounder.bound_polytope(points, values)
+            self.assertTrue(np.all(f(interior) >= this_bound))
+
+    def test_local_minimum_bounder_uses_flagged_vertex(self):
+        points = np.array([[0, 0], [0, 1], [1, 0], [1, 1]], dtype='float')
+        values = np.array([0.0, 0.5, 0.5, 1.0])
+        bounder = bound.LocalMinimumSimplexBoundCalculator(
+            bound.MaxPointSimplexBoundCalculator(
+                bound.OrdinaryPointBoundCalculator(1.0, 2.0)),
+            bound.LocalMinimumPointBoundCalculator(2, 0.1))
+        flags = np.array([True, False, False, False])
+        unflagged = bounder.bound_polytope(points, values)
+        flagged = bounder.bound_polytope(points, values, flags)
+        self.assertAlmostEqual(flagged, -0.5 * 0.1 * 2)
+        self.assertGreater(flagged, unflagged)
+
+
+class TestCircumsphereSimplexBoundCalculator(unittest.TestCase):
+    def test_circumradius_is_distance_to_all_vertices(self):
+        np.random.seed(1601)
+        simplex = make_simplex(dimension=5)
+        radius = bound._circumradii(simplex.points[None])[0]
+        # the circumcenter is equidistant from all the vertices:
+        edges = simplex.points[1:] - simplex.points[0]
+        center = np.linalg.solve(2 * edges, (edges**2).sum(axis=1))
+        center += simplex.points[0]
+        distances = np.linalg.norm(simplex.points - center, axis=1)
+        self.assertTrue(np.allclose(distances, radius))
+
+    def test_circumradius_of_degenerate_simplex_is_inf(self):
+        points = np.array([[[0, 0], [1, 1], [2, 2]], [[0, 0], [1, 0], [0, 1]]])
+        radii = bound._circumradii(points.astype('float'))
+        self.assertEqual(radii[0], np.inf)
+        self.assertAlmostEqual(radii[1], np.sqrt(0.5), places=13)
+
+    def test_circumradius_of_sliver_is_inf_without_warning(self):
+        points = np.array([[[0, 0], [1, 1e-300], [2, 0]]], dtype='float')
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            radii = bound._circumradii(points)
+        self.assertEqual(radii[0], np.inf)
+
+    def test_degenerate_simplex_has_bound_of_minus_inf(self):
+        point_bounder = bound.OrdinaryPointBoundCalculator(np.inf, 2.0)
+        simplex_bounder = bound.CircumsphereSimplexBoundCalculator(
+            point_bounder)
+        points = np.array([[[0, 0], [1, 1], [2, 2]]], dtype='float')
+        values = np.zeros((1, 3))
+        bounds = simplex_bounder.bound_many(points, values)
+        self.assertEqual(bounds[0], -np.inf)
+
+    def test_bounds_correctly(self):
+        np.random.seed(1609)
+        point_bounder = bound.OrdinaryPointBoundCalculator(1.0, 2.0)
+        simplex_bounder = bound.CircumsphereSimplexBoundCalculator(
+            point_bounder)
+        simplex = make_simplex(dimension=4)
+        radius = bound._circumradii(simplex.points[None])[0]
+        correct = simplex.values.min() - point_bounder.bound(radius)
+        self.assertAlmostEqual(
+            simplex_bounder.bound(simplex), correct, places=13)
+
+
+class TestCentroidSimplexBoundCalculator(unittest.TestCase):
+    def test_bounds_correctly(self):
+        np.random.seed(1613)
+        point_bounder = bound.OrdinaryPointBoundCalculator(1.0, 2.0)
+        simplex_bounder = bound.CentroidSimplexBoundCalculator(point_bounder)
+        simplex = make_simplex(dimension=4)
+        centroid = simplex.points.mean(axis=0)
+        radius = np.linalg.norm(simplex.points - centroid, axis=1).max()
+        correct = simplex.values.min() - point_bounder.bound(radius)
+        self.assertAlmostEqual(
+            simplex_bounder.bound(simplex), correct, places=13)
+
+    def test_every_point_is_within_radius_of_a_vertex(self):
+        np.random.seed(1617)
+        dimension = 4
+        bounders = [
+            bound.CentroidSimplexBoundCalculator(None),
+            bound.CircumsphereSimplexBoundCalculator(None),
+            ]
+        for _ in range(20):
+            simplex = make_simplex(dimension=dimension)
+            weights = np.random.dirichlet(np.ones(dimension + 1), size=100)
+            interior = weights.dot(simplex.points)
+            nearest = np.min(np.linalg.norm(
+                interior[:, None] - simplex.points[None], axis=2), axis=1)
+            for bounder in bounders:
+                radius = bounder._radii(simplex.points[None])[0]
+                self.assertTrue(np.all(nearest <= radius + 1e-12))
+
+
+class TestLocalMinimumSimplexBoundCalculator(unittest.TestCase):
+    def make_bounder(self):
+        ordinary = bound.OrdinaryPointBoundCalculator(1.0, 2.0)
+        near_minimum = bound.LocalMinimumPointBoundCalculator(3, 2.0)
+        return bound.LocalMinimumSimplexBoundCalculator(
+            bound.MaxPointSimplexBoundCalculator(ordinary), near_minimum)
+
+    def test_matches_base_bound_without_flags(self):
+        np.random.seed(1701)
+        bounder = self.make_bounder()
+        simplex = make_simplex(dimension=3)
+        self.assertEqual(
+            bounder.bound(simplex),
+            bounder.simplex_bound_calculator.bound(simplex))
+
+    def test_bound_uses_flagged_vertex(self):
+        points = np.array([[0, 0], [1, 0], [0, 1]], dtype='float')
+        values = np.array([0.0, 0.5, 0.5])
+        simplex = Simplex([
+            FunctionPoint(p, v, i == 0)
+            for i, (p, v) in enumerate(zip(points, values))])
+        bounder = self.make_bounder()
+
+        base = bounder.simplex_bound_calculator.bound(simplex)
+        near_minimum = -bounder.point_bound_calculator.bound(1.0)
+        self.assertGreater(near_minimum, base)
+        self.assertEqual(bounder.bound(simplex), near_minimum)
+
+    def test_bound_many_matches_bound(self):
+        np.random.seed(1711)
+        bounder = self.make_bounder()
+        simplices = [make_simplex(dimension=3) for _ in range(20)]
+        store, indices = SimplexStore.from_simplices(simplices)
+        store.is_local_minimum[::3] = True
+
+        bounds = bounder.bound_many(
+            store.simplex_points(indices),
+            store.simplex_values(indices),
+            store.simplex_is_local_minimum(indices))
+        for index, this_bound in zip(indices, bounds):
+            self.assertAlmostEqual(
+                bounder.bound(store.simplex(index)), this_bound, places=13)
+
 
 class TestPointBoundCalculator(unittest.TestCase):
     def test_bound_raises_notimplementederror(self):
@@ -116,6 +309,35 @@ class TestOrdinaryPointBoundCalculatorBound(unittest.TestCase):
                     bounder_hi.bound(long_distance))
         self.assertAlmostEqual(2 * slope_low, slope_hi, places=13)
 
+    def test_bound_on_array_matches_bound_on_scalars(self):
+        bounder = bound.OrdinaryPointBoundCalculator(
+            f_lipshitz_constant=1.0,
+            df1_dx1_lipshitz_constant=2.0,
+            )
+        distances = np.linspace(0, 3, 31)
+        bounds = bounder.bound(distances)
+        for distance, this_bound in zip(distances, bounds):
+            self.assertEqual(bounder.bound(distance), this_bound)
+
+    def test_bound_on_array_does_not_warn_when_f_constant_is_inf(self):
+        bounder = bound.OrdinaryPointBoundCalculator(
+            f_lipshitz_constant=np.inf,
+            df1_dx1_lipshitz_constant=1.0,
+            )
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            bounds = bounder.bound(np.array([0.5, 1.0, 2.0]))
+        self.assertTrue(np.all(np.isfinite(bounds)))
+
+    def test_bound_is_inf_at_infinite_distance(self):
+        for f_lipshitz_constant in [1.0, np.inf]:
+            for df1_dx1_lipshitz_constant in [1.0, np.inf]:
+                bounder = bound.OrdinaryPointBoundCalculator(
+                    f_lipshitz_constant, df1_dx1_lipshitz_constant)
+                self.assertEqual(bounder.bound(np.inf), np.inf)
+                self.assertEqual(
+                    bounder.bound(np.array([1.0, np.inf]))[1], np.inf)
+
     def test_valid_bounds_when_df1_dx1_constant_is_inf(self):
         f_lipshitz_constant = 1.0
         bounder = bound.OrdinaryPointBoundCalculator(
@@ -139,5 +361,122 @@ class TestOrdinaryPointBoundCalculatorBound(unittest.TestCase):
         self.assertAlmostEqual(bounds, correct, places=13)
 
 
+class TestAdaptiveLipschitzPointBoundCalculator(unittest.TestCase):
+    def test_bound_is_infinite_before_observations(self):
+        bounder = bound.AdaptiveLipschitzPointBoundCalculator()
+        self.assertEqual(bounder.bound(0.5), np.inf)
+
+    def test_estimates_f_constant_from_slopes(self):
+        bounder = bound.AdaptiveLipschitzPointBoundCalculator(1.5)
+        points = np.array([[[0.0, 0.0], [3.0, 4.0]]])
+        changed = bounder.observe(points, np.array([[1.0, -9.0]]))
+        self.assertTrue(changed)
+        self.assertEqual(bounder.f_lipshitz_estimate, 2.0)
+        self.assertEqual(bounder.f_lipshitz_constant, 3.0)
+        # with no curvature yet, only the f constant bounds f:
+        self.assertEqual(bounder.bound(2.0), 6.0)
+
+    def test_estimates_df1_dx1_constant_along_line(self):
+        bounder = bound.AdaptiveLipschitzPointBoundCalculator(2.0)
+        t = np.array([0.0, 0.25, 1.0])
+        direction = np.array([0.6, 0.8])
+        points = t[:, None] * direction
+        values = 3 * t**2 + t
+        bounder.observe(points[None], values[None])
+        self.assertAlmostEqual(bounder.df1_dx1_lipshitz_estimate, 6.0)
+        self.assertAlmostEqual(bounder.df1_dx1_lipshitz_constant, 12.0)
+
+    def test_matches_ordinary_bound_with_same_constants(self):
+        np.random.seed(2101)
+        bounder = bound.AdaptiveLipschitzPointBoundCalculator()
+        points = np.random.randn(10, 3, 2)
+        values = np.random.randn(10, 3)
+        bounder.observe(points, values)
+        ordinary = bound.OrdinaryPointBoundCalculator(
+            bounder.f_lipshitz_constant, bounder.df1_dx1_lipshitz_constant)
+        distances = np.linspace(0, 10, 50)
+        self.assertTrue(np.allclose(
+            bounder.bound(distances), ordinary.bound(distances)))
+
+    def test_only_changes_when_observation_exceeds_constant(self):
+        bounder = bound.AdaptiveLipschitzPointBoundCalculator(2.0)
+        points = np.array([[[0.0], [1.0]]])
+        self.assertTrue(bounder.observe(points, np.array([[0.0, 1.0]])))
+        self.assertFalse(bounder.observe(points, np.array([[0.0, 1.9]])))
+        self.assertEqual(bounder.f_lipshitz_constant, 2.0)
+        self.assertTrue(bounder.observe(points, np.array([[0.0, 2.5]])))
+        self.assertEqual(bounder.f_lipshitz_constant, 5.0)
+
+    def test_equal_values_leave_constants_at_cap(self):
+        bounder = bound.AdaptiveLipschitzPointBoundCalculator(
+            max_f_lipshitz_constant=7.0)
+        points = np.array([[[0.0], [1.0], [2.0]]])
+        changed = bounder.observe(points, np.ones((1, 3)))
+        self.assertFalse(changed)
+        self.assertEqual(bounder.f_lipshitz_constant, 7.0)
+        self.assertEqual(bounder.df1_dx1_lipshitz_constant, np.inf)
+
+    def test_constants_are_capped(self):
+        bounder = bound.AdaptiveLipschitzPointBoundCalculator(
+            10.0, max_f_lipshitz_constant=4.0)
+        bounder.observe(np.array([[[0.0], [1.0]]]), np.array([[0.0, 1.0]]))
+        self.assertEqual(bounder.f_lipshitz_constant, 4.0)
+
+    def test_ignores_repeated_points(self):
+        bounder = bound.AdaptiveLipschitzPointBoundCalculator()
+        points = np.zeros((1, 3, 2))
+        changed = bounder.observe(points, np.array([[0.0, 1.0, 2.0]]))
+        self.assertFalse(changed)
+        self.assertEqual(bounder.f_lipshitz_estimate, 0)
+
+    def test_raises_error_if_safety_factor_less_than_1(self):
+        self.assertRaises(
+            ValueError, bound.AdaptiveLipschitzPointBoundCalculator, 0.5)
+
+
+class TestLocalMinimumPointBoundCalculator(unittest.TestCase):
+    def test_second_order_bound_is_quadratic(self):
+        bounder = bound.LocalMinimumPointBoundCalculator(2, 3.0)
+        self.assertEqual(bounder.bound(2.0), 0.5 * 3.0 * 2.0**2)
+
+    def test_fifth_order_bound_sums_taylor_terms(self):
+        bounder = bound.LocalMinimumPointBoundCalculator(
+            5, 120.0, derivative_bounds_at_minimum=[6.0, 24.0])
+        distance = 2.0
+        correct = distance**3 + distance**4 + distance**5
+        self.assertAlmostEqual(bounder.bound(distance), correct, places=12)
+
+    def test_bound_on_array_matches_bound_on_scalars(self):
+        bounder = bound.LocalMinimumPointBoundCalculator(
+            4, 1.0, derivative_bounds_at_minimum=[2.0])
+        distances = np.linspace(0, 3, 31)
+        bounds = bounder.bound(distances)
+        for distance, this_bound in zip(distances, bounds):
+            self.assertEqual(bounder.bound(distance), this_bound)
+
+    def test_bound_is_valid_near_a_minimum(self):
+        # f = x^2 - x^3 / 2 has a 3rd derivative of -3 and a local
+        # minimum at 0.
+        bounder = bound.LocalMinimumPointBoundCalculator(3, 3.0)
+        x = np.linspace(-1, 1, 101)
+        f = x**2 - 0.5 * x**3
+        self.assertTrue(np.all(f >= -bounder.bound(np.abs(x))))
+
+    def test_is_tighter_than_ordinary_bound_at_short_distances(self):
+        ordinary = bound.OrdinaryPointBoundCalculator(1.0, 1.0)
+        near_minimum = bound.LocalMinimumPointBoundCalculator(3, 1.0)
+        distance = 0.1
+        self.assertLess(
+            near_minimum.bound(distance), ordinary.bound(distance))
+
+    def test_raises_error_on_invalid_order(self):
+        self.assertRaises(
+            ValueError, bound.LocalMinimumPointBoundCalculator, 6, 1.0)
+
+    def test_raises_error_on_missing_derivative_bounds(self):
+        self.assertRaises(
+            ValueError, bound.LocalMinimumPointBoundCalculator, 4, 1.0)
+
+
 if __name__ == '__main__':
     pass
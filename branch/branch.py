@@ -0,0 +1,129 @@
+import numpy as np
+
+from globaloptimize.geometry.simplex import summarize
+
+
+class BranchingStrategy(object):
+    """
+    Chooses how BranchBoundOptimizer splits a simplex.
+
+    A simplex is split along one of its edges, (i, j), into
+    `num_pieces` equal pieces, which takes `num_pieces - 1` new points
+    on the edge. Each child keeps all the vertices which are not on the
+    edge, so the children tile the simplex.
+    """
+    num_pieces = 2
+
+    def choose_edge(self, points, values, summary=None):
+        """
+        Parameters
+        ----------
+        points : (d + 1, d) numpy.ndarray
+            The vertices of the simplex.
+        values : (d + 1,) numpy.ndarray
+            The function values at the vertices.
+        summary : SimplexSummary or None, optional
+            The simplex's argmax, argmin and edge lengths, e.g. as
+            cached by a SimplexStore; computed if not given.
+
+        Returns
+        -------
+        i, j : int
+            The vertices at the ends of the edge to split. The children
+            are ordered from the one which keeps vertex i to the one
+            which keeps vertex j.
+        """
+        raise NotImplementedError("Implement in subclass")
+
+    def new_points(self, points, i, j):
+        """The (num_pieces - 1, d) points which split the edge (i, j)."""
+        fractions = np.arange(1, self.num_pieces).reshape(-1, 1)
+        fractions = fractions / self.num_pieces
+        return (1 - fractions) * points[i] + fractions * points[j]
+
+
+class MaxVertexEdgeBranchingStrategy(BranchingStrategy):
+    """Bisect the longest edge from the vertex with the max value.
+
+    Suits MaxPointSimplexBoundCalculator, whose bound is set by the
+    distance from that vertex."""
+
+    def choose_edge(self, points, values, summary=None):
+        if summary is None:
+            summary = summarize(points, values)
+        i = summary.index_of_max_value
+        return i, int(np.argmax(summary.edge_lengths[i]))
+
+
+class MinVertexEdgeBranchingStrategy(BranchingStrategy):
+    """Bisect the longest edge from the vertex with the min value.
+
+    Suits bounds which start from min(f), e.g. the circumsphere and
+    centroid bounds.
+
+    Edges away from the min vertex are never split this way, and the
+    simplices turn into slivers whose bounds do not converge. So if the
+    longest edge of the simplex is more than `max_edge_ratio` times the
+    longest edge from the min vertex, it is split instead."""
+
+    def __init__(self, max_edge_ratio=1.2):
+        """
+        Parameters
+        ----------
+        max_edge_ratio : float, optional
+            At least 1. Larger ratios split closer to the min vertex,
+            but let the simplices get flatter; at 2 or more, the
+            simplices do not shrink in general.
+        """
+        self.max_edge_ratio = max_edge_ratio
+
+    def choose_edge(self, points, values, summary=None):
+        if summary is None:
+            summary = summarize(points, values)
+        return self._choose(
+            summary.index_of_min_value, summary.edge_lengths)
+
+    def _choose(self, i, edge_lengths):
+        j = int(np.argmax(edge_lengths[i]))
+        longest = _longest_edge(edge_lengths)
+        if edge_lengths[longest] > self.max_edge_ratio * edge_lengths[i, j]:
+            return longest
+        return int(i), j
+
+
+class LongestEdgeBranchingStrategy(BranchingStrategy):
+    """Bisect the longest edge of the simplex.
+
+    This keeps the children well-shaped, so radius-based bounds such
+    as the circumsphere bound shrink steadily."""
+
+    def choose_edge(self, points, values, summary=None):
+        if summary is None:
+            summary = summarize(points, values)
+        return _longest_edge(summary.edge_lengths)
+
+
+class MultiwayBranchingStrategy(BranchingStrategy):
+    """Split the edge chosen by another strategy into `num_pieces`."""
+
+    def __init__(self, edge_strategy, num_pieces=3):
+        """
+        Parameters
+        ----------
+        edge_strategy : BranchingStrategy
+            Chooses the edge to split.
+        num_pieces : int, optional
+            The number of children per split; at least 2.
+        """
+        if num_pieces < 2:
+            raise ValueError("num_pieces must be at least 2")
+        self.edge_strategy = edge_strategy
+        self.num_pieces = int(num_pieces)
+
+    def choose_edge(self, points, values, summary=None):
+        return self.edge_strategy.choose_edge(points, values, summary)
+
+
+def _longest_edge(edge_lengths):
+    i, j = np.unravel_index(np.argmax(edge_lengths), edge_lengths.shape)
+    return int(i), int(j)
@@ -0,0 +1,105 @@
+import unittest
+
+import numpy as np
+
+from globaloptimize.branch import branch
+from globaloptimize.geometry.simplex import SimplexSummary
+from globaloptimize.geometry.tests.test_simplex import make_simplex
+
+
+class TestBranchingStrategy(unittest.TestCase):
+    def test_choose_edge_raises_notimplementederror(self):
+        strategy = branch.BranchingStrategy()
+        simplex = make_simplex()
+        self.assertRaises(
+            NotImplementedError,
+            strategy.choose_edge, simplex.points, simplex.values)
+
+    def test_new_points_bisect_edge(self):
+        strategy = branch.BranchingStrategy()
+        points = np.array([[0, 0], [2, 0], [0, 4]], dtype='float')
+        new_points = strategy.new_points(points, 1, 2)
+        self.assertTrue(np.all(new_points == [[1, 2]]))
+
+
+class TestMaxVertexEdgeBranchingStrategy(unittest.TestCase):
+    def test_chooses_longest_edge_from_max_vertex(self):
+        points = np.array([[0, 0], [1, 0], [0, 3]], dtype='float')
+        values = np.array([0.0, 2.0, 1.0])
+        strategy = branch.MaxVertexEdgeBranchingStrategy()
+        self.assertEqual(strategy.choose_edge(points, values), (1, 2))
+
+    def test_uses_given_summary(self):
+        points = np.array([[0, 0], [1, 0], [0, 3]], dtype='float')
+        values = np.array([0.0, 2.0, 1.0])
+        edge_lengths = np.array([[0, 1, 2], [1, 0, 1], [2, 1, 0]])
+        summary = SimplexSummary(0, 1, edge_lengths)
+        strategy = branch.MaxVertexEdgeBranchingStrategy()
+        self.assertEqual(
+            strategy.choose_edge(points, values, summary), (0, 2))
+
+
+class TestMinVertexEdgeBranchingStrategy(unittest.TestCase):
+    def test_chooses_longest_edge_from_min_vertex(self):
+        points = np.array([[0, 0], [1, 0], [0, 3]], dtype='float')
+        values = np.array([0.0, 2.0, 1.0])
+        strategy = branch.MinVertexEdgeBranchingStrategy()
+        self.assertEqual(strategy.choose_edge(points, values), (0, 2))
+
+    def test_uses_given_summary(self):
+        points = np.array([[0, 0], [1, 0], [0, 3]], dtype='float')
+        values = np.array([0.0, 2.0, 1.0])
+        edge_lengths = np.array([[0, 1, 1], [1, 0, 1.1], [1, 1.1, 0]])
+        summary = SimplexSummary(0, 1, edge_lengths)
+        strategy = branch.MinVertexEdgeBranchingStrategy()
+        self.assertEqual(
+            strategy.choose_edge(points, values, summary), (1, 2))
+
+    def test_splits_longest_edge_when_much_longer(self):
+        points = np.array([[0.5, 0.1], [0, 0], [1, 0]], dtype='float')
+        values = np.array([0.0, 2.0, 1.0])
+        strategy = branch.MinVertexEdgeBranchingStrategy()
+        self.assertEqual(
+            sorted(strategy.choose_edge(points, values)), [1, 2])
+
+
+class TestLongestEdgeBranchingStrategy(unittest.TestCase):
+    def test_chooses_longest_edge(self):
+        points = np.array([[0, 0], [1, 0], [0, 3]], dtype='float')
+        values = np.array([0.0, 2.0, 1.0])
+        strategy = branch.LongestEdgeBranchingStrategy()
+        self.assertEqual(
+            sorted(strategy.choose_edge(points, values)), [1, 2])
+
+    def test_uses_given_summary(self):
+        points = np.array([[0, 0], [1, 0], [0, 3]], dtype='float')
+        values = np.array([0.0, 2.0, 1.0])
+        edge_lengths = np.array([[0, 5, 1], [5, 0, 1], [1, 1, 0]])
+        summary = SimplexSummary(1, 0, edge_lengths)
+        strategy = branch.MultiwayBranchingStrategy(
+            branch.LongestEdgeBranchingStrategy())
+        self.assertEqual(
+            sorted(strategy.choose_edge(points, values, summary)), [0, 1])
+
+
+class TestMultiwayBranchingStrategy(unittest.TestCase):
+    def test_new_points_divide_edge_evenly(self):
+        points = np.array([[0, 0], [4, 0], [0, 1]], dtype='float')
+        values = np.zeros(3)
+        strategy = branch.MultiwayBranchingStrategy(
+            branch.LongestEdgeBranchingStrategy(), num_pieces=4)
+        i, j = strategy.choose_edge(points, values)
+        new_points = strategy.new_points(points, i, j)
+        self.assertEqual(new_points.shape, (3, 2))
+        self.assertTrue(np.allclose(
+            sorted(new_points[:, 0]), [1, 2, 3]))
+
+    def test_raises_error_on_fewer_than_2_pieces(self):
+        self.assertRaises(
+            ValueError,
+            branch.MultiwayBranchingStrategy,
+            branch.LongestEdgeBranchingStrategy(), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
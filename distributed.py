@@ -0,0 +1,365 @@
+"""
+Branch and bound on a hyperrectangle with several worker processes.
+
+The initial simplices of the Kuhn triangulation are dealt out to the
+workers, each of which runs a BranchBoundOptimizer on its own simplices
+with its own heap. The workers share, through shared memory:
+
+    * the incumbent, i.e. the best point any worker has found, which
+      every worker prunes against, so the pruning stays global;
+    * the budget of function evaluations;
+    * a queue of packets of simplices, which busy workers give away
+      whenever some worker is idle, i.e. has no simplex which can
+      contain a point below the incumbent. A packet moves the simplices
+      with their vertices, so the whole subtree under each of them moves
+      to the worker which takes it.
+
+The optimization is certified once every worker is idle with no packet
+in the queue.
+"""
+import queue
+import traceback
+import multiprocessing
+
+import numpy as np
+from scipy.optimize import OptimizeResult
+
+from globaloptimize.optimize import BranchBoundOptimizer, _STATUS_MESSAGES
+from globaloptimize.geometry.simplex import FunctionPoint
+from globaloptimize.geometry.store import SimplexStore
+from globaloptimize.geometry.triangulate import (
+    triangulate_function_on_hyperrectangle_into_store)
+
+
+# How long an idle worker waits for a packet before checking whether
+# the optimization has finished, in seconds:
+_IDLE_POLL_INTERVAL = 0.01
+# How long the parent waits for a result before checking that the
+# workers are still alive, in seconds:
+_RESULT_POLL_INTERVAL = 1.0
+
+
+def optimize_distributed(objective_function, bounds, simplex_bounder,
+                         num_workers=None, max_function_evaluations=1000,
+                         ftol=1e-5, rtol=0.0, batch_size=1, steal_size=4,
+                         **optimizer_kwargs):
+    """
+    Minimize a function on a hyperrectangle by branch and bound, with
+    the bounding, branching and heap work, as well as the evaluations,
+    spread over `num_workers` processes.
+
+    Parameters
+    ----------
+    objective_function : callable
+        f(point) -> float, or f(points) -> array if `vectorized` is
+        passed. It, `simplex_bounder` and `optimizer_kwargs` must be
+        picklable to start the workers with the 'spawn' method.
+    bounds : (d, 2) list-like of bounds for each parameter
+    simplex_bounder : SimplexBoundCalculator
+        Each worker bounds with its own copy.
+    num_workers : int or None, optional
+        The number of worker processes. Default is one per CPU.
+    max_function_evaluations : int, optional
+        The budget shared by all of the workers, not counting the 2^d
+        evaluations at the corners, which the calling process makes.
+    ftol, rtol : float, optional
+        As in BranchBoundOptimizer.optimize, relative to the shared
+        incumbent.
+    batch_size : int, optional
+        The number of candidates each worker branches on per iteration.
+    steal_size : int, optional
+        The most simplices a busy worker gives away in one packet.
+        A worker only gives away half of the candidates it pops, so it
+        keeps work of the same quality for itself.
+    **optimizer_kwargs
+        Passed to each worker's BranchBoundOptimizer, e.g.
+        `branching_strategy` or `vectorized`. Local searches, `hooks`
+        and an `executor` are not supported.
+
+    Returns
+    -------
+    scipy.optimize.OptimizeResult
+        As returned by BranchBoundOptimizer.optimize, for all workers
+        together, except that `nlocal` is always 0 and `timings` sums
+        the seconds of the workers in each phase. It also has `nsteal`,
+        the number of packets of simplices moved between workers.
+    """
+    if num_workers is None:
+        num_workers = multiprocessing.cpu_count()
+    if num_workers < 1:
+        raise ValueError("num_workers must be at least 1")
+    if steal_size < 1:
+        raise ValueError("steal_size must be at least 1")
+    for unsupported in ['local_minimizer', 'executor', 'hooks']:
+        if optimizer_kwargs.get(unsupported) is not None:
+            msg = "{} is not supported by optimize_distributed"
+            raise ValueError(msg.format(unsupported))
+
+    store = triangulate_function_on_hyperrectangle_into_store(
+        objective_function, bounds,
+        vectorized=optimizer_kwargs.get('vectorized', False))
+    best = np.argmin(store.values)
+    context = multiprocessing.get_context()
+    shared = _SharedState(
+        context, num_workers, max_function_evaluations,
+        store.points[best], store.values[best])
+    settings = {
+        'ftol': ftol,
+        'rtol': rtol,
+        'batch_size': batch_size,
+        'steal_size': steal_size,
+        }
+    # The simplices are dealt out round-robin, and bounded by the
+    # workers, in parallel.
+    simplex_indices = np.arange(store.num_simplices)
+    processes = [
+        context.Process(
+            target=_run_worker,
+            args=(objective_function, simplex_bounder,
+                  _worker_arrays(store, simplex_indices[k::num_workers]),
+                  shared, settings, optimizer_kwargs))
+        for k in range(num_workers)]
+    for process in processes:
+        process.start()
+    try:
+        results = _collect_results(shared, processes)
+        # The queue must be empty for the workers which filled it to exit.
+        leftover = [
+            shared.packets.get() for _ in range(shared.num_outstanding.value)]
+    except BaseException:
+        for process in processes:
+            process.terminate()
+        raise
+    finally:
+        for process in processes:
+            process.join()
+    return _combine_results(shared, results, leftover)
+
+
+class _SharedState(object):
+    """The state which the workers share, and its lock."""
+
+    def __init__(self, context, num_workers, max_function_evaluations,
+                 point, value):
+        self.num_workers = num_workers
+        self.lock = context.Lock()
+        self.stop = context.Event()
+        self.status = context.RawValue('i', 1)
+        self.best_value = context.RawValue('d', value)
+        self.best_point = context.RawArray('d', np.asarray(point).tolist())
+        self.remaining = context.RawValue('q', max_function_evaluations)
+        self.num_idle = context.RawValue('i', 0)
+        self.num_outstanding = context.RawValue('i', 0)
+        self.num_steals = context.RawValue('i', 0)
+        self.packets = context.Queue()
+        self.results = context.Queue()
+
+
+def _worker_arrays(store, simplex_indices):
+    # Every worker gets all of the corners, which are few next to the
+    # d! simplices.
+    return (
+        store.points.copy(),
+        store.values.copy(),
+        store.is_local_minimum.copy(),
+        store.simplices[simplex_indices].copy())
+
+
+def _run_worker(objective_function, simplex_bounder, arrays, shared,
+                settings, optimizer_kwargs):
+    try:
+        points, values, is_local_minimum, simplices = arrays
+        store = SimplexStore.from_arrays(
+            points, values, simplices, is_local_minimum)
+        optimizer = BranchBoundOptimizer(
+            objective_function, store, simplex_bounder, **optimizer_kwargs)
+        result = _Worker(optimizer, shared, **settings).run()
+    except Exception:
+        shared.stop.set()
+        shared.results.put(('error', traceback.format_exc()))
+    else:
+        shared.results.put(('ok', result))
+
+
+class _Worker(object):
+    """The loop of one worker process around its optimizer."""
+
+    def __init__(self, optimizer, shared, ftol, rtol, batch_size,
+                 steal_size):
+        self.optimizer = optimizer
+        self.shared = shared
+        self.ftol = ftol
+        self.rtol = rtol
+        self.batch_size = batch_size
+        self.steal_size = steal_size
+        self.nfev = 0
+        self.nit = 0
+
+    def run(self):
+        points_per_split = self.optimizer._points_per_split
+        while not self.shared.stop.is_set():
+            self._sync_incumbent()
+            reserved = self._reserve(self.batch_size * points_per_split)
+            number = reserved // points_per_split
+            if number == 0:
+                self._refund(reserved)
+                self._finish(status=1)
+                break
+            candidates = self.optimizer._pop_candidates(
+                number, self.ftol, self.rtol)
+            self._refund(reserved - len(candidates) * points_per_split)
+            if len(candidates) == 0:
+                if not self._wait_for_work():
+                    break
+                continue
+            self.nfev += self.optimizer.process_candidates(candidates)
+            self.nit += 1
+            self._sync_incumbent()
+            if self._someone_is_waiting():
+                self._give_away_work()
+        optimizer = self.optimizer
+        return {
+            'nfev': self.nfev,
+            'nit': self.nit,
+            'lower_bound': optimizer.lower_bound,
+            'heap_size': len(optimizer._heap),
+            'timings': optimizer._timer.summary(),
+            }
+
+    def _sync_incumbent(self):
+        # Reading the shared value without the lock is only a hint;
+        # both directions re-check under the lock.
+        shared = self.shared
+        local = self.optimizer.current_min_function_point
+        if local.value < shared.best_value.value:
+            with shared.lock:
+                if local.value < shared.best_value.value:
+                    shared.best_value.value = local.value
+                    shared.best_point[:] = local.point.tolist()
+        elif shared.best_value.value < local.value:
+            with shared.lock:
+                self.optimizer.current_min_function_point = FunctionPoint(
+                    np.array(shared.best_point[:]), shared.best_value.value)
+
+    def _reserve(self, number):
+        with self.shared.lock:
+            number = max(min(number, self.shared.remaining.value), 0)
+            self.shared.remaining.value -= number
+        return number
+
+    def _refund(self, number):
+        if number > 0:
+            with self.shared.lock:
+                self.shared.remaining.value += number
+
+    def _finish(self, status):
+        with self.shared.lock:
+            if not self.shared.stop.is_set():
+                self.shared.status.value = status
+                self.shared.stop.set()
+
+    def _someone_is_waiting(self):
+        # Unlocked reads: a missed or extra packet is harmless.
+        shared = self.shared
+        return shared.num_idle.value > shared.num_outstanding.value
+
+    def _give_away_work(self):
+        candidates = self.optimizer._pop_candidates(
+            2 * self.steal_size, self.ftol, self.rtol)
+        # Alternate, so both workers keep candidates of the same quality.
+        self.optimizer._push_back(candidates[::2])
+        given = [c.object for c in candidates[1::2]]
+        if len(given) == 0:
+            return
+        store = self.optimizer._store
+        packet = (
+            store.simplex_points(given),
+            store.simplex_values(given),
+            store.simplex_is_local_minimum(given),
+            np.array([c.value for c in candidates[1::2]]))
+        self.optimizer._remove_simplices(given)
+        with self.shared.lock:
+            self.shared.num_outstanding.value += 1
+            self.shared.num_steals.value += 1
+        self.shared.packets.put(packet)
+
+    def _wait_for_work(self):
+        """
+        Block until a packet arrives and take its simplices, returning
+        True, or until the optimization is finished, returning False.
+        """
+        shared = self.shared
+        with shared.lock:
+            shared.num_idle.value += 1
+        while True:
+            try:
+                packet = shared.packets.get(timeout=_IDLE_POLL_INTERVAL)
+            except queue.Empty:
+                with shared.lock:
+                    finished = (
+                        shared.num_idle.value == shared.num_workers and
+                        shared.num_outstanding.value == 0)
+                if finished:
+                    # Nobody can make any more work:
+                    self._finish(status=0)
+                if shared.stop.is_set():
+                    return False
+                continue
+            with shared.lock:
+                shared.num_idle.value -= 1
+                shared.num_outstanding.value -= 1
+            self._take_packet(packet)
+            return True
+
+    def _take_packet(self, packet):
+        points, values, is_local_minimum, _ = packet
+        num_simplices, num_vertices, dimension = points.shape
+        store = self.optimizer._store
+        point_indices = store.add_points(
+            points.reshape(-1, dimension),
+            values.ravel(),
+            is_local_minimum.ravel())
+        simplex_indices = store.add_simplices(
+            point_indices.reshape(num_simplices, num_vertices))
+        self.optimizer._push_indices(simplex_indices.tolist())
+
+
+def _collect_results(shared, processes):
+    results = []
+    while len(results) < len(processes):
+        try:
+            kind, result = shared.results.get(timeout=_RESULT_POLL_INTERVAL)
+        except queue.Empty:
+            if any(p.exitcode not in (None, 0) for p in processes):
+                raise RuntimeError("A worker process died")
+            continue
+        if kind == 'error':
+            raise RuntimeError("A worker process failed:\n" + result)
+        results.append(result)
+    return results
+
+
+def _combine_results(shared, results, leftover):
+    value = shared.best_value.value
+    lower_bound = min([value] + [r['lower_bound'] for r in results] +
+                      [bound for packet in leftover for bound in packet[3]])
+    status = shared.status.value
+    timings = dict()
+    for result in results:
+        for phase, seconds in result['timings'].items():
+            timings[phase] = timings.get(phase, 0.0) + seconds
+    return OptimizeResult(
+        x=np.array(shared.best_point[:]),
+        fun=value,
+        success=status == 0,
+        status=status,
+        message=_STATUS_MESSAGES[status],
+        nfev=sum(r['nfev'] for r in results),
+        nit=sum(r['nit'] for r in results),
+        nlocal=0,
+        nsteal=shared.num_steals.value,
+        lower_bound=lower_bound,
+        gap=value - lower_bound,
+        heap_size=(sum(r['heap_size'] for r in results) +
+                   sum(len(packet[3]) for packet in leftover)),
+        timings=timings)
@@ -0,0 +1,129 @@
+import numpy as np
+
+
+class VertexIncidenceIndex(object):
+    """
+    Looks up which live simplices of a SimplexStore contain a vertex.
+
+    Every (simplex, vertex slot) pair is an incidence, numbered
+    simplex_index * (d + 1) + slot. The incidences of each vertex form
+    a doubly-linked list stored in flat integer arrays, so adding or
+    removing a simplex costs O(d) and listing the simplices around a
+    vertex costs O(degree), without keeping any Python references to
+    removed simplices alive.
+
+    Methods
+    -------
+    add: simplex indices -> None
+    remove: simplex indices -> None
+    is_live: int -> bool
+    simplices_containing: int -> numpy.ndarray of ints
+    degree: int -> int
+    """
+
+    def __init__(self, store):
+        """
+        Parameters
+        ----------
+        store : SimplexStore
+            The store whose `simplices` rows are indexed.
+        """
+        self.store = store
+        self._width = store.dimension + 1
+        self._head = np.full(0, -1, dtype='int64')
+        self._next = np.full(0, -1, dtype='int64')
+        self._prev = np.full(0, -1, dtype='int64')
+        self._live = np.zeros(0, dtype='bool')
+
+    def add(self, simplex_indices):
+        self._reserve()
+        simplex_indices = np.unique(np.atleast_1d(simplex_indices))
+        simplex_indices = simplex_indices[~self._live[simplex_indices]]
+        if simplex_indices.size == 0:
+            return
+        self._live[simplex_indices] = True
+
+        # The new incidences of each vertex are chained together in
+        # one vectorized pass, and the chain is put in front of the
+        # vertex's existing list.
+        incidences = (
+            simplex_indices.reshape(-1, 1) * self._width +
+            np.arange(self._width)).ravel()
+        vertices = self.store.simplices[simplex_indices].ravel()
+        order = np.argsort(vertices, kind='stable')
+        incidences = incidences[order]
+        vertices = vertices[order]
+        new_vertex = np.ones(vertices.size + 1, dtype='bool')
+        new_vertex[1:-1] = vertices[1:] != vertices[:-1]
+        is_first = new_vertex[:-1]
+        is_last = new_vertex[1:]
+
+        old_heads = self._head[vertices[is_last]]
+        next_ = np.empty_like(incidences)
+        next_[:-1] = incidences[1:]
+        next_[is_last] = old_heads
+        prev = np.empty_like(incidences)
+        prev[1:] = incidences[:-1]
+        prev[is_first] = -1
+        self._next[incidences] = next_
+        self._prev[incidences] = prev
+        has_old_head = old_heads >= 0
+        self._prev[old_heads[has_old_head]] = (
+            incidences[is_last][has_old_head])
+        self._head[vertices[is_first]] = incidences[is_first]
+
+    def remove(self, simplex_indices):
+        simplex_indices = np.atleast_1d(simplex_indices)
+        self._reserve()
+        head, next_, prev = self._head, self._next, self._prev
+        rows = self.store.simplices[simplex_indices].tolist()
+        for simplex_index, row in zip(simplex_indices.tolist(), rows):
+            if not self._live[simplex_index]:
+                continue
+            self._live[simplex_index] = False
+            for slot, vertex in enumerate(row):
+                incidence = simplex_index * self._width + slot
+                before = prev[incidence]
+                after = next_[incidence]
+                if before >= 0:
+                    next_[before] = after
+                else:
+                    head[vertex] = after
+                if after >= 0:
+                    prev[after] = before
+                next_[incidence] = -1
+                prev[incidence] = -1
+
+    def is_live(self, simplex_index):
+        return (simplex_index < self._live.size and
+                bool(self._live[simplex_index]))
+
+    def simplices_containing(self, vertex_index):
+        out = []
+        if vertex_index < self._head.size:
+            incidence = self._head[vertex_index]
+            while incidence >= 0:
+                out.append(incidence // self._width)
+                incidence = self._next[incidence]
+        return np.array(out, dtype='int64')
+
+    def degree(self, vertex_index):
+        return self.simplices_containing(vertex_index).size
+
+    def _reserve(self):
+        num_points = self.store.num_points
+        if self._head.size < num_points:
+            size = max(num_points, 2 * self._head.size)
+            self._head = _extend(self._head, size, -1)
+        num_simplices = self.store.num_simplices
+        if self._live.size < num_simplices:
+            size = max(num_simplices, 2 * self._live.size)
+            self._live = _extend(self._live, size, False)
+            self._next = _extend(self._next, size * self._width, -1)
+            self._prev = _extend(self._prev, size * self._width, -1)
+
+
+def _extend(array, size, fill_value):
+    out = np.full(size, fill_value, dtype=array.dtype)
+    out[:array.size] = array
+    return out
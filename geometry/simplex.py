@@ -3,14 +3,36 @@ from collections import namedtuple
 import numpy as np
 
 
-# TODO: Some premature optimizations that are the root of all evil:
-# lazily precompute simplex.min, simplex.max
+SimplexSummary = namedtuple(
+    'SimplexSummary',
+    ['index_of_max_value', 'index_of_min_value', 'edge_lengths'])
+
+
+def summarize(points, values):
+    """
+    Parameters
+    ----------
+    points : (d + 1, d) numpy.ndarray
+    values : (d + 1,) numpy.ndarray
+
+    Returns
+    -------
+    SimplexSummary
+        The argmax and argmin of the values, and the (d + 1, d + 1)
+        distances between each pair of vertices.
+    """
+    displacements = points[:, None, :] - points[None, :, :]
+    return SimplexSummary(
+        int(np.argmax(values)),
+        int(np.argmin(values)),
+        np.sqrt((displacements**2).sum(axis=2)))
 
 
 class FunctionPoint(object):
     """Essentially a namedtuple"""
     def __init__(self, point, value, is_local_minimum=False):
         self._tuple = (point, value, is_local_minimum)
+        self._hash = None
 
     @property
     def point(self):
@@ -32,7 +54,9 @@ class FunctionPoint(object):
         return "FunctionPoint({}, {})".format(self.point, self.value)
 
     def __hash__(self):
-        return hash(self._data)
+        if self._hash is None:
+            self._hash = hash(self._data)
+        return self._hash
 
     def __eq__(self, other):
         return self._data == other._data
@@ -43,16 +67,35 @@ class Simplex(object):
     Stores information about a function on the vertices of a simplex
     (d-dimensional analogue of a triangle).
 
+    A Simplex is either built from its function points, or is a thin
+    view of one row of a SimplexStore, in which case the function
+    points are only created when they are asked for.
+
     Attributes
     ----------
     dimension : int
+    points : (d + 1, d) numpy.ndarray
+    values : (d + 1,) numpy.ndarray
     function_points : tuple of FunctionPoints
+    index_of_max_value : int
+    index_of_min_value : int
+    edge_lengths : (d + 1, d + 1) numpy.ndarray
+        The distances between each pair of vertices.
     vertex_with_max_value : FunctionPoint
-    vertex_with_max_value : FunctionPoint
+    vertex_with_min_value : FunctionPoint
+    store : SimplexStore or None
+        The store this simplex is a view of, if any.
+    index : int or None
+        The row of `store.simplices` this simplex is a view of, if any.
 
     Methods
     -------
+    from_store(SimplexStore, int) -> Simplex
     branch_on_interior_point(FunctinoPoint) -> list of d simplices
+
+    The argmax, argmin and edge lengths are computed together, the
+    first time any of them is needed. Views of a store share the
+    store's cache of them.
     """
     def __init__(self, function_points):
         """
@@ -60,41 +103,97 @@ class Simplex(object):
         ----------
         function_points : list-like of FunctionPoint objects
         """
-        self.function_points = tuple(function_points)
-        self.dimension = np.size(self.function_points[0].point)
+        self._function_points = tuple(function_points)
+        self.dimension = np.size(self._function_points[0].point)
         self._check_inputs()
+        self.points = np.array(
+            [fp.point for fp in self._function_points], dtype='float')
+        self.points = self.points.reshape(self.dimension + 1, self.dimension)
+        self.values = np.array(
+            [np.squeeze(fp.value) for fp in self._function_points],
+            dtype='float')
+        self.store = None
+        self.index = None
+        self._summary = None
+
+    @classmethod
+    def from_store(cls, store, index):
+        """
+        Parameters
+        ----------
+        store : SimplexStore
+        index : int
+            The row of `store.simplices` to view.
+        """
+        simplex = cls.__new__(cls)
+        simplex._function_points = None
+        simplex.dimension = store.dimension
+        simplex.points = store.simplex_points(index)
+        simplex.values = store.simplex_values(index)
+        simplex.store = store
+        simplex.index = index
+        simplex._summary = None
+        return simplex
+
+    @property
+    def function_points(self):
+        if self._function_points is None:
+            vertex_indices = self.store.simplices[self.index]
+            self._function_points = tuple(
+                self.store.function_point(i) for i in vertex_indices)
+        return self._function_points
 
     def branch_on_interior_point(self, new_function_point):
         simplices = []
-        for exclude_index in range(len(self.function_points)):
+        function_points = self.function_points
+        for exclude_index in range(len(function_points)):
             these_function_points = (
-                self.function_points[:exclude_index] +
-                self.function_points[exclude_index + 1:] +
+                function_points[:exclude_index] +
+                function_points[exclude_index + 1:] +
                 (new_function_point,))
             simplices.append(self.__class__(these_function_points))
         return simplices
 
+    def _get_summary(self):
+        if self._summary is None:
+            if self.store is not None:
+                self._summary = self.store.simplex_summary(self.index)
+            else:
+                self._summary = summarize(self.points, self.values)
+        return self._summary
+
+    @property
+    def index_of_max_value(self):
+        return self._get_summary().index_of_max_value
+
+    @property
+    def index_of_min_value(self):
+        return self._get_summary().index_of_min_value
+
+    @property
+    def edge_lengths(self):
+        return self._get_summary().edge_lengths
+
     def _check_inputs(self):
-        if not all([np.size(fp.value) == 1 for fp in self.function_points]):
+        function_points = self._function_points
+        if not all([np.size(fp.value) == 1 for fp in function_points]):
             msg = "Each function values must be a scalar"
             raise ValueError(msg)
-        if len(self.function_points) != self.dimension + 1:
+        if len(function_points) != self.dimension + 1:
             msg = "Evaluated points must be of shape (d+1, d)"
             raise ValueError(msg)
         all_same_dimension = all([
             np.size(fp.point) == self.dimension
-            for fp in self.function_points])
+            for fp in function_points])
         if not all_same_dimension:
             msg = "All poits must be same dimension"
             raise ValueError(msg)
 
     @property
     def vertex_with_max_value(self):
-        index = np.argmax([fp.value for fp in self.function_points])
-        return self.function_points[index]
+        return self.function_points[self.index_of_max_value]
 
     @property
     def vertex_with_min_value(self):
-        index = np.argmin([fp.value for fp in self.function_points])
-        return self.function_points[index]
+        return self.function_points[self.index_of_min_value]
 
@@ -0,0 +1,456 @@
+import os
+
+import numpy as np
+
+from globaloptimize.geometry.simplex import (
+    Simplex, FunctionPoint, SimplexSummary, summarize)
+
+
+class SimplexStore(object):
+    """
+    Stores function points and simplices in flat, growable arrays.
+
+    Each vertex is stored exactly once, as a row of `points` together
+    with its entry in `values`. Simplices are stored as rows of `d + 1`
+    integer indices into `points`, so neighbouring simplices share
+    their vertices instead of each holding its own copies.
+
+    Attributes
+    ----------
+    dimension : int
+    points : (num_points, d) numpy.ndarray
+    values : (num_points,) numpy.ndarray
+    is_local_minimum : (num_points,) numpy.ndarray of bools
+    simplices : (num_simplices, d + 1) numpy.ndarray of ints
+    bounds : (num_simplices,) numpy.ndarray
+        A lower bound for each simplex, or NaN for simplices which
+        have not been bounded or have been removed.
+
+    Each simplex's SimplexSummary, its argmax, argmin and edge lengths,
+    is cached alongside its row. It is computed the first time it is
+    asked for, unless it was given when the simplex was added, e.g.
+    derived from the simplex's parent. The cache is not saved.
+
+    Methods
+    -------
+    from_simplices: list of Simplex -> SimplexStore, array of indices
+    from_arrays
+        Create a store which uses existing arrays, without copying.
+    save, load
+        Write the store to, or read it from, a directory of .npy files.
+    compact
+        Drop all but the given simplices, and the points they use.
+    add_point, add_points
+        Add vertices to the store, returning their indices.
+    add_simplex, add_simplices
+        Add simplices, as rows of vertex indices, returning their indices.
+    add_simplex_from_function_points: Simplex -> int
+    find_point: point -> int
+    find_simplex: point -> int, barycentric coordinates
+    function_point: int -> FunctionPoint
+    simplex: int -> Simplex
+        A Simplex view of one row of the store.
+    simplex_summary: int -> SimplexSummary
+    """
+
+    def __init__(self, dimension, capacity=64):
+        """
+        Parameters
+        ----------
+        dimension : int
+            The dimension of the space the simplices live in.
+        capacity : int, optional
+            The number of points and simplices to initially allocate
+            room for. The store grows as needed.
+        """
+        self.dimension = int(dimension)
+        capacity = max(int(capacity), 1)
+        self._points = np.zeros((capacity, self.dimension), dtype='float')
+        self._values = np.zeros(capacity, dtype='float')
+        self._is_local_minimum = np.zeros(capacity, dtype='bool')
+        self._simplices = np.zeros(
+            (capacity, self.dimension + 1), dtype='int64')
+        self._bounds = np.full(capacity, np.nan, dtype='float')
+        self._clear_summaries(capacity)
+        self.num_points = 0
+        self.num_simplices = 0
+
+    @classmethod
+    def from_simplices(cls, simplices):
+        """
+        Parameters
+        ----------
+        simplices : list-like of Simplex objects
+
+        Returns
+        -------
+        store : SimplexStore
+        indices : numpy.ndarray of ints
+            The row of `store.simplices` corresponding to each simplex.
+        """
+        simplices = list(simplices)
+        dimension = simplices[0].dimension
+        store = cls(dimension, capacity=len(simplices) * (dimension + 1))
+        lookup = dict()
+        indices = [
+            store.add_simplex_from_function_points(simplex, lookup)
+            for simplex in simplices]
+        return store, np.array(indices, dtype='int64')
+
+    @classmethod
+    def from_arrays(cls, points, values, simplices, is_local_minimum=None,
+                    bounds=None):
+        """
+        Parameters
+        ----------
+        points : (num_points, d) numpy.ndarray
+        values : (num_points,) numpy.ndarray
+        simplices : (num_simplices, d + 1) numpy.ndarray of ints
+        is_local_minimum : (num_points,) numpy.ndarray of bools, optional
+        bounds : (num_simplices,) numpy.ndarray, optional
+
+        The arrays, which may be memory-mapped, are used as they are
+        until the store needs to grow, when they are copied.
+        """
+        store = cls.__new__(cls)
+        store.dimension = points.shape[1]
+        store._points = points
+        store._values = values
+        store._simplices = simplices
+        if is_local_minimum is None:
+            is_local_minimum = np.zeros(points.shape[0], dtype='bool')
+        store._is_local_minimum = is_local_minimum
+        if bounds is None:
+            bounds = np.full(simplices.shape[0], np.nan, dtype='float')
+        store._bounds = bounds
+        store._clear_summaries(simplices.shape[0])
+        store.num_points = points.shape[0]
+        store.num_simplices = simplices.shape[0]
+        return store
+
+    @classmethod
+    def load(cls, path, mmap_mode='c'):
+        """
+        Parameters
+        ----------
+        path : str
+            A directory written by SimplexStore.save
+        mmap_mode : {None, 'r', 'r+', 'c'}, optional
+            Passed to numpy.load. The default memory-maps the arrays
+            copy-on-write, so loading is zero-copy and the files on
+            disk are never changed.
+        """
+        arrays = {
+            name: np.load(
+                os.path.join(path, name + '.npy'), mmap_mode=mmap_mode)
+            for name in _SAVED_ARRAYS}
+        return cls.from_arrays(**arrays)
+
+    def save(self, path, simplex_indices=None):
+        """
+        Parameters
+        ----------
+        path : str
+            A directory, which is created if it does not exist.
+        simplex_indices : list-like of ints or None, optional
+            The simplices to save; default is all of them. All the
+            points are saved either way.
+        """
+        if simplex_indices is None:
+            simplex_indices = slice(None)
+        os.makedirs(path, exist_ok=True)
+        arrays = {
+            'points': self.points,
+            'values': self.values,
+            'is_local_minimum': self.is_local_minimum,
+            'simplices': self.simplices[simplex_indices],
+            'bounds': self.bounds[simplex_indices],
+            }
+        # Each array is written to a temporary file which then replaces
+        # the old one, which a store loaded from `path`, e.g. this one,
+        # may have memory-mapped: writing over it in place would change
+        # the arrays being saved.
+        for name, array in arrays.items():
+            filename = os.path.join(path, name + '.npy')
+            with open(filename + '.tmp', 'wb') as f:
+                np.save(f, array)
+            os.replace(filename + '.tmp', filename)
+
+    def compact(self, simplex_indices, point_indices=None):
+        """
+        Keep only the simplices `simplex_indices`, renumbered in that
+        order as 0, 1, ..., and the points which they use, together
+        with any `point_indices`.
+
+        Any other index into the store, including Simplex views, is
+        invalid afterwards.
+
+        Returns
+        -------
+        numpy.ndarray of ints
+            The old indices of the points which were kept, in their
+            new order, which is sorted.
+        """
+        simplex_indices = np.asarray(simplex_indices, dtype='int64')
+        rows = self.simplices[simplex_indices]
+        if point_indices is None:
+            point_indices = []
+        kept_points = np.unique(np.concatenate([
+            rows.ravel(), np.asarray(point_indices, dtype='int64')]))
+        new_rows = np.searchsorted(kept_points, rows)
+        bounds = self.bounds[simplex_indices]
+        index_of_max_value = self._index_of_max_value[simplex_indices]
+        index_of_min_value = self._index_of_min_value[simplex_indices]
+        edge_lengths = self._edge_lengths[simplex_indices]
+
+        capacity = _next_capacity(1, kept_points.size)
+        self._points = _resize(self.points[kept_points], capacity)
+        self._values = _resize(self.values[kept_points], capacity)
+        self._is_local_minimum = _resize(
+            self.is_local_minimum[kept_points], capacity)
+        self.num_points = kept_points.size
+
+        capacity = _next_capacity(1, simplex_indices.size)
+        self._simplices = _resize(new_rows, capacity)
+        self._bounds = _resize(bounds, capacity, np.nan)
+        self._index_of_max_value = _resize(index_of_max_value, capacity, -1)
+        self._index_of_min_value = _resize(index_of_min_value, capacity, -1)
+        self._edge_lengths = _resize(edge_lengths, capacity)
+        self.num_simplices = simplex_indices.size
+        return kept_points
+
+    @property
+    def points(self):
+        return self._points[:self.num_points]
+
+    @property
+    def values(self):
+        return self._values[:self.num_points]
+
+    @property
+    def is_local_minimum(self):
+        return self._is_local_minimum[:self.num_points]
+
+    @property
+    def simplices(self):
+        return self._simplices[:self.num_simplices]
+
+    @property
+    def bounds(self):
+        return self._bounds[:self.num_simplices]
+
+    def add_point(self, point, value, is_local_minimum=False):
+        index = self.num_points
+        self._reserve_points(index + 1)
+        self._points[index] = point
+        self._values[index] = value
+        self._is_local_minimum[index] = is_local_minimum
+        self.num_points += 1
+        return index
+
+    def add_points(self, points, values, is_local_minimum=False):
+        points = np.asarray(points, dtype='float').reshape(
+            -1, self.dimension)
+        start = self.num_points
+        stop = start + points.shape[0]
+        self._reserve_points(stop)
+        self._points[start:stop] = points
+        self._values[start:stop] = np.reshape(values, -1)
+        self._is_local_minimum[start:stop] = is_local_minimum
+        self.num_points = stop
+        return np.arange(start, stop)
+
+    def add_simplex(self, vertex_indices):
+        index = self.num_simplices
+        self._reserve_simplices(index + 1)
+        self._simplices[index] = vertex_indices
+        self.num_simplices += 1
+        return index
+
+    def add_simplices(self, rows, summaries=None):
+        """
+        Parameters
+        ----------
+        rows : (n, d + 1) array-like of ints
+        summaries : list of n SimplexSummary or None, optional
+            The simplices' summaries, if they are already known.
+        """
+        rows = np.asarray(rows, dtype='int64').reshape(
+            -1, self.dimension + 1)
+        start = self.num_simplices
+        stop = start + rows.shape[0]
+        self._reserve_simplices(stop)
+        self._simplices[start:stop] = rows
+        if summaries is not None:
+            for index, summary in enumerate(summaries, start):
+                self._set_summary(index, summary)
+        self.num_simplices = stop
+        return np.arange(start, stop)
+
+    def add_simplex_from_function_points(self, simplex, lookup=None):
+        """
+        Parameters
+        ----------
+        simplex : Simplex
+        lookup : dict or None, optional
+            A FunctionPoint -> index dictionary, used to share vertices
+            between several simplices added in a row.
+
+        Returns
+        -------
+        int
+            The index of the simplex's row in `simplices`. If `simplex`
+            is already a view of this store, its row is reused.
+        """
+        if simplex.store is self:
+            return simplex.index
+        if lookup is None:
+            lookup = dict()
+        vertex_indices = []
+        for function_point in simplex.function_points:
+            if function_point not in lookup:
+                lookup[function_point] = self.add_point(
+                    function_point.point,
+                    function_point.value,
+                    function_point.is_local_minimum)
+            vertex_indices.append(lookup[function_point])
+        return self.add_simplex(vertex_indices)
+
+    def find_point(self, point):
+        """The index of the first vertex at `point`; ValueError if none."""
+        matches = np.flatnonzero(np.all(self.points == point, axis=1))
+        if matches.size == 0:
+            raise ValueError("point is not in the store")
+        return int(matches[0])
+
+    def find_simplex(self, point, simplex_indices=None, tol=1e-12):
+        """
+        Parameters
+        ----------
+        point : (d,) numpy.ndarray
+        simplex_indices : list-like of ints or None, optional
+            The simplices to search; default is all of them.
+        tol : float, optional
+            How far outside a simplex, in barycentric coordinates,
+            `point` may be and still be found in it.
+
+        Returns
+        -------
+        index : int
+            The first simplex which contains `point`.
+        coordinates : (d + 1,) numpy.ndarray
+            The barycentric coordinates of `point` in that simplex.
+
+        Raises ValueError if no simplex contains `point`.
+        """
+        if simplex_indices is None:
+            simplex_indices = np.arange(self.num_simplices)
+        simplex_indices = np.asarray(simplex_indices, dtype='int64')
+        coordinates = _barycentric_coordinates(
+            self.simplex_points(simplex_indices), point)
+        inside = np.flatnonzero(np.all(coordinates >= -tol, axis=1))
+        if inside.size == 0:
+            raise ValueError("point is not in any of the simplices")
+        return int(simplex_indices[inside[0]]), coordinates[inside[0]]
+
+    def function_point(self, index):
+        return FunctionPoint(
+            self._points[index].copy(),
+            self._values[index],
+            bool(self._is_local_minimum[index]))
+
+    def simplex(self, index):
+        return Simplex.from_store(self, index)
+
+    def simplex_summary(self, index):
+        """The cached SimplexSummary of one simplex."""
+        if self._index_of_max_value[index] < 0:
+            self._set_summary(index, summarize(
+                self.simplex_points(index), self.simplex_values(index)))
+        return SimplexSummary(
+            int(self._index_of_max_value[index]),
+            int(self._index_of_min_value[index]),
+            self._edge_lengths[index])
+
+    def simplex_points(self, indices):
+        """The (..., d + 1, d) vertex coordinates of the simplices."""
+        return self._points[self._simplices[indices]]
+
+    def simplex_values(self, indices):
+        """The (..., d + 1) vertex values of the simplices."""
+        return self._values[self._simplices[indices]]
+
+    def simplex_is_local_minimum(self, indices):
+        """The (..., d + 1) local-minimum flags of the simplices' vertices."""
+        return self._is_local_minimum[self._simplices[indices]]
+
+    def _reserve_points(self, size):
+        if size <= self._points.shape[0]:
+            return
+        capacity = _next_capacity(self._points.shape[0], size)
+        self._points = _resize(self._points, capacity)
+        self._values = _resize(self._values, capacity)
+        self._is_local_minimum = _resize(self._is_local_minimum, capacity)
+
+    def _reserve_simplices(self, size):
+        if size <= self._simplices.shape[0]:
+            return
+        capacity = _next_capacity(self._simplices.shape[0], size)
+        self._simplices = _resize(self._simplices, capacity)
+        self._bounds = _resize(self._bounds, capacity, np.nan)
+        self._index_of_max_value = _resize(
+            self._index_of_max_value, capacity, -1)
+        self._index_of_min_value = _resize(
+            self._index_of_min_value, capacity, -1)
+        self._edge_lengths = _resize(self._edge_lengths, capacity)
+
+    def _clear_summaries(self, capacity):
+        # An index of -1 marks a summary which is not computed yet.
+        self._index_of_max_value = np.full(capacity, -1, dtype='int64')
+        self._index_of_min_value = np.full(capacity, -1, dtype='int64')
+        self._edge_lengths = np.zeros(
+            (capacity, self.dimension + 1, self.dimension + 1),
+            dtype='float')
+
+    def _set_summary(self, index, summary):
+        self._index_of_max_value[index] = summary.index_of_max_value
+        self._index_of_min_value[index] = summary.index_of_min_value
+        self._edge_lengths[index] = summary.edge_lengths
+
+
+_SAVED_ARRAYS = (
+    'points', 'values', 'is_local_minimum', 'simplices', 'bounds')
+
+
+def _barycentric_coordinates(points, point):
+    """
+    The (n, d + 1) barycentric coordinates of `point` in each of the
+    (n, d + 1, d) simplices `points`; NaN for degenerate simplices.
+    """
+    edges = np.swapaxes(points[:, 1:, :] - points[:, :1, :], 1, 2)
+    offsets = np.asarray(point, dtype='float') - points[:, 0, :]
+    try:
+        tail = np.linalg.solve(edges, offsets[..., None])[..., 0]
+    except np.linalg.LinAlgError:
+        tail = np.full(offsets.shape, np.nan)
+        for index, (matrix, offset) in enumerate(zip(edges, offsets)):
+            try:
+                tail[index] = np.linalg.solve(matrix, offset)
+            except np.linalg.LinAlgError:
+                pass
+    head = 1 - tail.sum(axis=1, keepdims=True)
+    return np.concatenate([head, tail], axis=1)
+
+
+def _next_capacity(current, size):
+    capacity = max(current, 1)
+    while capacity < size:
+        capacity *= 2
+    return capacity
+
+
+def _resize(array, capacity, fill_value=0):
+    out = np.full(
+        (capacity,) + array.shape[1:], fill_value, dtype=array.dtype)
+    out[:array.shape[0]] = array
+    return out
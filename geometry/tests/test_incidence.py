@@ -0,0 +1,69 @@
+import unittest
+
+import numpy as np
+
+from globaloptimize.geometry.simplex import FunctionPoint
+from globaloptimize.geometry.store import SimplexStore
+from globaloptimize.geometry.incidence import VertexIncidenceIndex
+from globaloptimize.geometry.tests.test_simplex import make_simplex
+
+
+class TestVertexIncidenceIndex(unittest.TestCase):
+    def test_simplices_containing_finds_all_simplices_with_vertex(self):
+        np.random.seed(1410)
+        store, indices, index = make_store_and_index()
+        for vertex in range(store.num_points):
+            correct = np.flatnonzero(np.any(store.simplices == vertex, axis=1))
+            found = index.simplices_containing(vertex)
+            self.assertEqual(sorted(found.tolist()), correct.tolist())
+
+    def test_remove_drops_simplex_from_its_vertices(self):
+        np.random.seed(1414)
+        store, indices, index = make_store_and_index()
+        removed = indices[1]
+        index.remove(removed)
+        for vertex in store.simplices[removed]:
+            self.assertNotIn(removed, index.simplices_containing(vertex))
+        self.assertFalse(index.is_live(removed))
+
+    def test_remove_keeps_other_simplices(self):
+        np.random.seed(1418)
+        store, indices, index = make_store_and_index()
+        index.remove(indices[[0, 2]])
+        for vertex in store.simplices[indices[1]]:
+            self.assertIn(indices[1], index.simplices_containing(vertex))
+
+    def test_remove_twice_does_nothing(self):
+        np.random.seed(1422)
+        store, indices, index = make_store_and_index()
+        index.remove(indices[0])
+        degrees = [index.degree(v) for v in range(store.num_points)]
+        index.remove(indices[0])
+        self.assertEqual(
+            degrees, [index.degree(v) for v in range(store.num_points)])
+
+    def test_add_after_store_grows(self):
+        np.random.seed(1426)
+        store, indices, index = make_store_and_index()
+        for _ in range(50):
+            new_vertex = store.add_point(np.random.randn(3), 0.0)
+            row = store.simplices[indices[0]].copy()
+            row[0] = new_vertex
+            new_index = store.add_simplex(row)
+            index.add(new_index)
+            self.assertEqual(
+                index.simplices_containing(new_vertex).tolist(), [new_index])
+
+
+def make_store_and_index(dimension=3):
+    simplex = make_simplex(dimension=dimension)
+    branched = simplex.branch_on_interior_point(
+        FunctionPoint(np.random.randn(dimension), 0.5))
+    store, indices = SimplexStore.from_simplices(branched)
+    index = VertexIncidenceIndex(store)
+    index.add(indices)
+    return store, indices, index
+
+
+if __name__ == '__main__':
+    unittest.main()
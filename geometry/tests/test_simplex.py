@@ -152,6 +152,21 @@ class TestSimplex(unittest.TestCase):
         min_function_point = simplex.vertex_with_min_value
         self.assertEqual(min_function_point.value, values.min())
 
+    def test_edge_lengths(self):
+        np.random.seed(1111)
+        simplex = make_simplex(dimension=4)
+        edge_lengths = simplex.edge_lengths
+        for i, p in enumerate(simplex.points):
+            for j, q in enumerate(simplex.points):
+                self.assertAlmostEqual(
+                    edge_lengths[i, j], np.linalg.norm(p - q), places=13)
+
+    def test_index_of_max_and_min_value(self):
+        np.random.seed(1113)
+        simplex = make_simplex(dimension=4)
+        self.assertEqual(simplex.index_of_max_value, np.argmax(simplex.values))
+        self.assertEqual(simplex.index_of_min_value, np.argmin(simplex.values))
+
 
 def make_function_points(points, values):
     return [FunctionPoint(p, v) for p, v in zip(points, values)]
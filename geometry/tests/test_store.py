@@ -0,0 +1,234 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from globaloptimize.geometry.simplex import (
+    Simplex, FunctionPoint, SimplexSummary, summarize)
+from globaloptimize.geometry.store import SimplexStore
+from globaloptimize.geometry.tests.test_simplex import make_simplex
+
+
+class TestSimplexStore(unittest.TestCase):
+    def test_initializes_empty(self):
+        store = SimplexStore(3)
+        self.assertEqual(store.points.shape, (0, 3))
+        self.assertEqual(store.values.shape, (0,))
+        self.assertEqual(store.simplices.shape, (0, 4))
+
+    def test_add_point_returns_consecutive_indices(self):
+        store = SimplexStore(2)
+        indices = [store.add_point(np.ones(2) * i, i) for i in range(5)]
+        self.assertEqual(indices, list(range(5)))
+
+    def test_add_point_grows_past_capacity(self):
+        np.random.seed(1012)
+        store = SimplexStore(3, capacity=2)
+        points = np.random.randn(50, 3)
+        values = np.random.randn(50)
+        for point, value in zip(points, values):
+            store.add_point(point, value)
+        self.assertTrue(np.all(store.points == points))
+        self.assertTrue(np.all(store.values == values))
+
+    def test_add_points_stores_all(self):
+        np.random.seed(1015)
+        store = SimplexStore(3, capacity=2)
+        points = np.random.randn(50, 3)
+        values = np.random.randn(50)
+        indices = store.add_points(points, values)
+        self.assertEqual(list(indices), list(range(50)))
+        self.assertTrue(np.all(store.points == points))
+
+    def test_add_simplices_grows_past_capacity(self):
+        store = SimplexStore(2, capacity=1)
+        rows = np.arange(30).reshape(10, 3)
+        indices = store.add_simplices(rows)
+        self.assertEqual(list(indices), list(range(10)))
+        self.assertTrue(np.all(store.simplices == rows))
+
+    def test_from_simplices_shares_vertices(self):
+        np.random.seed(1022)
+        simplex = make_simplex(dimension=3)
+        branched = simplex.branch_on_interior_point(
+            FunctionPoint(np.random.randn(3), 0.5))
+        store, indices = SimplexStore.from_simplices(branched)
+        # d + 1 old vertices + 1 new one:
+        self.assertEqual(store.num_points, simplex.dimension + 2)
+        self.assertEqual(len(indices), len(branched))
+
+    def test_simplex_view_has_same_function_points(self):
+        np.random.seed(1027)
+        simplices = [make_simplex(dimension=4) for _ in range(3)]
+        store, indices = SimplexStore.from_simplices(simplices)
+        for simplex, index in zip(simplices, indices):
+            view = store.simplex(index)
+            self.assertIsInstance(view, Simplex)
+            self.assertEqual(view.function_points, simplex.function_points)
+
+    def test_simplex_view_knows_its_store(self):
+        np.random.seed(1031)
+        store, indices = SimplexStore.from_simplices([make_simplex()])
+        view = store.simplex(indices[0])
+        self.assertIs(view.store, store)
+        self.assertEqual(view.index, indices[0])
+
+    def test_add_simplex_from_function_points_reuses_own_views(self):
+        np.random.seed(1034)
+        store, indices = SimplexStore.from_simplices([make_simplex()])
+        view = store.simplex(indices[0])
+        index = store.add_simplex_from_function_points(view)
+        self.assertEqual(index, indices[0])
+        self.assertEqual(store.num_simplices, 1)
+
+    def test_function_point_keeps_is_local_minimum(self):
+        store = SimplexStore(2)
+        index = store.add_point(np.zeros(2), 1.0, is_local_minimum=True)
+        self.assertTrue(store.function_point(index).is_local_minimum)
+
+    def test_simplex_points_are_stacked(self):
+        np.random.seed(1040)
+        simplices = [make_simplex(dimension=3) for _ in range(4)]
+        store, indices = SimplexStore.from_simplices(simplices)
+        points = store.simplex_points(indices)
+        values = store.simplex_values(indices)
+        self.assertEqual(points.shape, (4, 4, 3))
+        self.assertEqual(values.shape, (4, 4))
+        for simplex, these_points in zip(simplices, points):
+            self.assertTrue(np.all(simplex.points == these_points))
+
+    def test_simplex_summary_is_computed_once(self):
+        np.random.seed(1031)
+        simplex = make_simplex(dimension=3)
+        store, indices = SimplexStore.from_simplices([simplex])
+        summary = store.simplex_summary(indices[0])
+        self.assertEqual(summary[:2], (
+            simplex.index_of_max_value, simplex.index_of_min_value))
+        self.assertTrue(np.all(summary.edge_lengths == simplex.edge_lengths))
+        store._values[:] = 0
+        self.assertEqual(store.simplex_summary(indices[0])[:2], summary[:2])
+
+    def test_views_share_the_store_summary(self):
+        np.random.seed(1033)
+        store, indices = SimplexStore.from_simplices([make_simplex()])
+        view = store.simplex(indices[0])
+        self.assertTrue(np.all(
+            view.edge_lengths == store.simplex_summary(indices[0])[2]))
+        self.assertGreaterEqual(store._index_of_max_value[indices[0]], 0)
+
+    def test_add_simplices_keeps_given_summaries(self):
+        np.random.seed(1035)
+        store = SimplexStore(2, capacity=1)
+        store.add_points(np.random.randn(3, 2), np.random.randn(3))
+        summary = SimplexSummary(1, 2, np.ones((3, 3)))
+        indices = store.add_simplices([[0, 1, 2]] * 5, [summary] * 5)
+        for index in indices:
+            self.assertEqual(store.simplex_summary(index)[:2], (1, 2))
+            self.assertTrue(np.all(store.simplex_summary(index)[2] == 1))
+
+    def test_compact_keeps_summaries(self):
+        np.random.seed(1037)
+        simplices = [make_simplex() for _ in range(4)]
+        store, indices = SimplexStore.from_simplices(simplices)
+        summaries = [store.simplex_summary(i) for i in indices]
+        store.compact(indices[[3, 1]])
+        for index, old in zip(range(2), [summaries[3], summaries[1]]):
+            self.assertGreaterEqual(store._index_of_max_value[index], 0)
+            self.assertEqual(store.simplex_summary(index)[:2], old[:2])
+            self.assertTrue(np.all(store.simplex_summary(index)[2] == old[2]))
+
+    def test_loaded_store_computes_summaries(self):
+        np.random.seed(1039)
+        store, indices = SimplexStore.from_simplices([make_simplex()])
+        with tempfile.TemporaryDirectory() as directory:
+            store.save(directory)
+            loaded = SimplexStore.load(directory)
+            summary = loaded.simplex_summary(0)
+            expected = summarize(
+                store.simplex_points(0), store.simplex_values(0))
+        self.assertEqual(summary[:2], expected[:2])
+        self.assertTrue(np.all(summary.edge_lengths == expected.edge_lengths))
+
+    def test_find_simplex_returns_barycentric_coordinates(self):
+        np.random.seed(1042)
+        simplex = make_simplex(dimension=3)
+        store, indices = SimplexStore.from_simplices([simplex])
+        weights = np.random.dirichlet(np.ones(4))
+        index, coordinates = store.find_simplex(weights.dot(simplex.points))
+        self.assertEqual(index, indices[0])
+        self.assertTrue(np.allclose(coordinates, weights))
+
+    def test_find_simplex_searches_only_given_simplices(self):
+        points = np.array([[0, 0], [1, 0], [0, 1], [1, 1]], dtype='float')
+        store = SimplexStore(2)
+        store.add_points(points, np.zeros(4))
+        store.add_simplices([[0, 1, 2], [1, 2, 3]])
+        point = np.array([0.8, 0.8])
+        self.assertEqual(store.find_simplex(point)[0], 1)
+        self.assertRaises(ValueError, store.find_simplex, point, [0])
+
+    def test_find_simplex_skips_degenerate_simplices(self):
+        points = np.array([[0, 0], [1, 1], [2, 2], [0, 2]], dtype='float')
+        store = SimplexStore(2)
+        store.add_points(points, np.zeros(4))
+        store.add_simplices([[0, 1, 2], [0, 2, 3]])
+        self.assertEqual(store.find_simplex(np.array([1.0, 1.0]))[0], 1)
+
+    def test_save_and_load_round_trip(self):
+        np.random.seed(1044)
+        simplices = [make_simplex(dimension=3) for _ in range(4)]
+        store, indices = SimplexStore.from_simplices(simplices)
+        store.bounds[:] = np.random.randn(store.num_simplices)
+        with tempfile.TemporaryDirectory() as directory:
+            store.save(directory)
+            loaded = SimplexStore.load(directory)
+            for name in ['points', 'values', 'simplices', 'bounds']:
+                self.assertTrue(
+                    np.all(getattr(loaded, name) == getattr(store, name)))
+
+    def test_save_only_saves_given_simplices(self):
+        np.random.seed(1049)
+        simplices = [make_simplex(dimension=3) for _ in range(4)]
+        store, indices = SimplexStore.from_simplices(simplices)
+        with tempfile.TemporaryDirectory() as directory:
+            store.save(directory, simplex_indices=[1, 3])
+            loaded = SimplexStore.load(directory)
+            self.assertEqual(loaded.num_points, store.num_points)
+            self.assertTrue(
+                np.all(loaded.simplices == store.simplices[[1, 3]]))
+
+    def test_save_over_loaded_directory(self):
+        np.random.seed(1051)
+        simplices = [make_simplex(dimension=3) for _ in range(4)]
+        store, indices = SimplexStore.from_simplices(simplices)
+        store.bounds[:] = np.random.randn(store.num_simplices)
+        with tempfile.TemporaryDirectory() as directory:
+            store.save(directory)
+            loaded = SimplexStore.load(directory)
+            loaded.save(directory)
+            reloaded = SimplexStore.load(directory)
+            for name in ['points', 'values', 'is_local_minimum',
+                         'simplices', 'bounds']:
+                self.assertTrue(
+                    np.all(getattr(reloaded, name) == getattr(store, name)))
+            self.assertEqual(
+                sorted(os.listdir(directory)),
+                sorted(name + '.npy' for name in [
+                    'points', 'values', 'is_local_minimum', 'simplices',
+                    'bounds']))
+
+    def test_loaded_store_can_grow(self):
+        np.random.seed(1053)
+        store, indices = SimplexStore.from_simplices([make_simplex()])
+        with tempfile.TemporaryDirectory() as directory:
+            store.save(directory)
+            loaded = SimplexStore.load(directory)
+            index = loaded.add_point(np.ones(3), 2.0)
+            loaded.add_simplex(loaded.simplices[0])
+        self.assertEqual(index, store.num_points)
+        self.assertEqual(loaded.num_simplices, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,9 @@
+import itertools
+import math
 import unittest
 
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
 
 from globaloptimize.geometry.simplex import Simplex, FunctionPoint
@@ -90,6 +94,189 @@ class TestHyperRectangleTriangulation(unittest.TestCase):
 
         self.assertEqual(calculated_function_points, correct_function_points)
 
+    def test_delaunay_method_uses_all_corners(self):
+        bounds = np.array([[0, 1], [0, 2], [-1, 1]])
+        f = lambda x: np.sum(x)
+        triangulation = triangulate.triangulate_function_on_hyperrectangle(
+            f, bounds, method='delaunay')
+        calculated_points = set(
+            [fp for s in triangulation for fp in s.function_points])
+        self.assertEqual(len(calculated_points), 2**3)
+
+    def test_raises_error_on_unknown_method(self):
+        f = lambda x: np.sum(x)
+        self.assertRaises(
+            ValueError,
+            triangulate.triangulate_function_on_hyperrectangle,
+            f, [[0, 1]] * 2, method='unknown')
+
+
+class TestKuhnTriangulation(unittest.TestCase):
+    def test_has_ndim_factorial_simplices(self):
+        for ndim, number in [(1, 1), (2, 2), (3, 6), (5, 120)]:
+            rows = triangulate._kuhn_triangulation(ndim)
+            self.assertEqual(rows.shape, (number, ndim + 1))
+
+    def test_every_simplex_has_lower_and_upper_corners(self):
+        ndim = 4
+        rows = triangulate._kuhn_triangulation(ndim)
+        self.assertTrue(np.all(rows[:, 0] == 0))
+        self.assertTrue(np.all(rows[:, -1] == 2**ndim - 1))
+
+    def test_simplices_tile_the_hyperrectangle(self):
+        np.random.seed(1501)
+        ndim = 4
+        bounds = np.sort(np.random.randn(ndim, 2), axis=1)
+        store = triangulate.triangulate_function_on_hyperrectangle_into_store(
+            lambda x: np.sum(x), bounds)
+        points = store.simplex_points(np.arange(store.num_simplices))
+        volumes = np.abs(np.linalg.det(points[:, 1:] - points[:, :1]))
+        volumes /= math.factorial(ndim)
+        box_volume = np.prod(bounds[:, 1] - bounds[:, 0])
+        self.assertTrue(np.all(volumes > 0))
+        self.assertAlmostEqual(volumes.sum(), box_volume, places=10)
+        # and every point in the box is in some simplex:
+        for _ in range(20):
+            point = bounds[:, 0] + np.random.rand(ndim) * (
+                bounds[:, 1] - bounds[:, 0])
+            store.find_simplex(point)
+
+    def test_store_shares_corners_between_simplices(self):
+        ndim = 3
+        store = triangulate.triangulate_function_on_hyperrectangle_into_store(
+            lambda x: np.sum(x), [[0, 1]] * ndim)
+        self.assertEqual(store.num_points, 2**ndim)
+        self.assertTrue(np.all(store.values == store.points.sum(axis=1)))
+
+
+class TestCornerEvaluation(unittest.TestCase):
+    def test_evaluates_vectorized_function_in_one_call(self):
+        calls = []
+
+        def vectorized_function(x):
+            calls.append(x.shape)
+            return x.sum(axis=1)
+
+        ndim = 4
+        store = triangulate.triangulate_function_on_hyperrectangle_into_store(
+            vectorized_function, [[0, 1]] * ndim, vectorized=True)
+        self.assertEqual(calls, [(2**ndim, ndim)])
+        self.assertTrue(np.all(store.values == store.points.sum(axis=1)))
+
+    def test_evaluates_in_chunks_with_progress(self):
+        calls = []
+        progress = []
+
+        def vectorized_function(x):
+            calls.append(x.shape[0])
+            return x.sum(axis=1)
+
+        triangulate.triangulate_function_on_hyperrectangle_into_store(
+            vectorized_function, [[0, 1]] * 4, vectorized=True,
+            chunk_size=6, progress=lambda *args: progress.append(args))
+        self.assertEqual(calls, [6, 6, 4])
+        self.assertEqual(progress, [(6, 16), (12, 16), (16, 16)])
+
+    def test_evaluates_with_executor(self):
+        triangulate_into_store = (
+            triangulate.triangulate_function_on_hyperrectangle_into_store)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            store = triangulate_into_store(
+                lambda x: np.sum(x), [[0, 1]] * 3, executor=executor)
+        self.assertTrue(np.all(store.values == store.points.sum(axis=1)))
+
+    def test_triangulate_function_on_hyperrectangle_passes_options(self):
+        for method in ['kuhn', 'delaunay']:
+            triangulation = triangulate.triangulate_function_on_hyperrectangle(
+                lambda x: x.sum(axis=1), [[0, 1]] * 2, method=method,
+                vectorized=True)
+            for simplex in triangulation:
+                self.assertTrue(np.all(
+                    simplex.values == simplex.points.sum(axis=1)))
+
+    def test_cover_evaluates_vectorized_function(self):
+        store, _ = triangulate.cover_function_on_hyperrectangle(
+            lambda x: x.sum(axis=1), [[0, 1]] * 3, vectorized=True)
+        self.assertTrue(np.all(store.values == store.points.sum(axis=1)))
+
+
+class TestKuhnCover(unittest.TestCase):
+    def test_simplex_vertices_match_kuhn_triangulation(self):
+        ndim = 4
+        cover = triangulate.KuhnCover(ndim)
+        rows = triangulate._kuhn_triangulation(ndim)
+        from_cover = [
+            cover.vertices(order[:-1])
+            for order in itertools.permutations(range(ndim))]
+        self.assertTrue(np.all(np.array(from_cover) == rows))
+
+    def test_whole_hyperrectangle_has_all_corners(self):
+        cover = triangulate.KuhnCover(3)
+        self.assertEqual(sorted(cover.vertices(())), list(range(8)))
+
+    def test_children_split_on_each_remaining_axis(self):
+        cover = triangulate.KuhnCover(4)
+        children = cover.children((2,))
+        self.assertEqual(children, [(2, 0), (2, 1), (2, 3)])
+        self.assertFalse(cover.is_simplex((2,)))
+        self.assertTrue(cover.is_simplex((2, 0, 1)))
+
+    def test_region_contains_its_simplices(self):
+        ndim = 4
+        cover = triangulate.KuhnCover(ndim)
+        prefix = (1, 3)
+        region = set(cover.vertices(prefix))
+        for order in itertools.permutations(range(ndim)):
+            if order[:2] == prefix:
+                self.assertTrue(set(cover.vertices(order[:-1])) <= region)
+
+    def test_contains_points_of_its_vertices_hull(self):
+        np.random.seed(1241)
+        ndim = 4
+        cover = triangulate.KuhnCover(ndim)
+        corners = triangulate._produce_points_at_corners_of_hyperrectangle(
+            [[0, 1]] * ndim)
+        for prefix in [(), (2,), (1, 3), (1, 3, 0)]:
+            vertices = corners[cover.vertices(prefix)]
+            weights = np.random.dirichlet(np.ones(len(vertices)), size=20)
+            for point in weights.dot(vertices):
+                self.assertTrue(cover.contains(prefix, point))
+        self.assertFalse(cover.contains((1, 3), [0.5, 0.2, 0.1, 0.4]))
+        self.assertTrue(cover.contains((1, 3), [0.1, 0.5, 0.2, 0.4]))
+
+    def test_uses_corner_indices(self):
+        corner_indices = np.arange(8) + 10
+        cover = triangulate.KuhnCover(3, corner_indices)
+        self.assertTrue(np.all(cover.vertices((0,)) >= 10))
+
+    def test_add_and_pop_regions(self):
+        cover = triangulate.KuhnCover(3)
+        region_ids = cover.add([(0,), (1,)])
+        self.assertEqual(cover.pop(region_ids[1]), (1,))
+        self.assertEqual(list(cover.prefixes.values()), [(0,)])
+
+    def test_cover_function_on_hyperrectangle_evaluates_corners(self):
+        store, cover = triangulate.cover_function_on_hyperrectangle(
+            lambda x: np.sum(x), [[0, 1]] * 3)
+        self.assertEqual(store.num_points, 8)
+        self.assertEqual(store.num_simplices, 0)
+        self.assertEqual(len(cover.prefixes), 0)
+
+
+class TestEnclosingSimplex(unittest.TestCase):
+    def test_contains_the_hyperrectangle(self):
+        np.random.seed(1511)
+        ndim = 4
+        bounds = np.sort(np.random.randn(ndim, 2), axis=1)
+        store = triangulate.triangulate_function_on_hyperrectangle_into_store(
+            lambda x: np.sum(x), bounds, method='simplex')
+        self.assertEqual(store.num_points, ndim + 1)
+        self.assertEqual(store.num_simplices, 1)
+        corners = triangulate._produce_points_at_corners_of_hyperrectangle(
+            bounds)
+        for corner in corners:
+            self.assertEqual(store.find_simplex(corner)[0], 0)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,14 +1,225 @@
+from itertools import permutations
+
 import numpy as np
 from scipy.spatial import Delaunay
 
 from globaloptimize.geometry.simplex import Simplex, FunctionPoint
+from globaloptimize.geometry.store import SimplexStore
+from globaloptimize.util.evaluate import evaluate_points
+
+
+def triangulate_function_on_hyperrectangle(function, bounds, method='kuhn',
+                                           **evaluate_kwargs):
+    """
+    Parameters
+    ----------
+    function : callable
+        f(point) -> float
+    bounds : (d, 2) list-like of bounds for each parameter
+    method : {'kuhn', 'simplex', 'delaunay'}, optional
+        How to cover the hyperrectangle; see
+        triangulate_function_on_hyperrectangle_into_store.
+    **evaluate_kwargs
+        `executor`, `vectorized`, `chunk_size` or `progress`; see
+        triangulate_function_on_hyperrectangle_into_store.
 
+    Returns
+    -------
+    list of Simplex objects
+    """
+    if method == 'delaunay':
+        points = _produce_points_at_corners_of_hyperrectangle(bounds)
+        values = evaluate_points(function, points, **evaluate_kwargs)
+        function_points = [FunctionPoint(point, value)
+                           for point, value in zip(points, values)]
+        return triangulate_function_points_into_simplices(function_points)
+    store = triangulate_function_on_hyperrectangle_into_store(
+        function, bounds, method=method, **evaluate_kwargs)
+    function_points = [
+        store.function_point(i) for i in range(store.num_points)]
+    return [
+        Simplex([function_points[i] for i in row])
+        for row in store.simplices]
+
+
+def triangulate_function_on_hyperrectangle_into_store(
+        function, bounds, method='kuhn', executor=None, vectorized=False,
+        chunk_size=None, progress=None):
+    """
+    Parameters
+    ----------
+    function : callable
+        f(point) -> float
+    bounds : (d, 2) list-like of bounds for each parameter
+    method : {'kuhn', 'simplex'}, optional
+        'kuhn', the default, splits the hyperrectangle into the d!
+        simplices of the Kuhn (Freudenthal) triangulation, which share
+        the 2^d corners. 'simplex' covers it with a single simplex,
+        with a vertex at the lower corner and one on each axis through
+        it, which takes only d + 1 evaluations. That simplex extends
+        outside of the hyperrectangle, so `function` must be defined
+        there, and the optimizer can find points outside of `bounds`.
+    executor : object with a `map` method, optional
+    vectorized : bool, optional
+    chunk_size : int or None, optional
+    progress : callable or None, optional
+        How to evaluate `function` at the corners; see
+        globaloptimize.util.evaluate.evaluate_points. If `vectorized`,
+        `function` is f(points) -> array.
 
-def triangulate_function_on_hyperrectangle(function, bounds):
+    Returns
+    -------
+    SimplexStore
+    """
+    if method == 'kuhn':
+        points = _produce_points_at_corners_of_hyperrectangle(bounds)
+        rows = _kuhn_triangulation(len(bounds))
+    elif method == 'simplex':
+        points = _produce_vertices_of_enclosing_simplex(bounds)
+        rows = np.arange(len(bounds) + 1).reshape(1, -1)
+    else:
+        raise ValueError("method must be one of 'kuhn', 'simplex'")
+    values = evaluate_points(
+        function, points, executor=executor, vectorized=vectorized,
+        chunk_size=chunk_size, progress=progress)
+    store = SimplexStore(
+        len(bounds), capacity=max(points.shape[0], rows.shape[0]))
+    store.add_points(points, values)
+    store.add_simplices(rows)
+    return store
+
+
+def cover_function_on_hyperrectangle(function, bounds, executor=None,
+                                     vectorized=False, chunk_size=None,
+                                     progress=None):
+    """
+    The lazy form of the Kuhn triangulation of the hyperrectangle.
+
+    Parameters
+    ----------
+    function : callable
+        f(point) -> float
+    bounds : (d, 2) list-like of bounds for each parameter
+    executor : object with a `map` method, optional
+    vectorized : bool, optional
+    chunk_size : int or None, optional
+    progress : callable or None, optional
+        How to evaluate `function` at the corners; see
+        globaloptimize.util.evaluate.evaluate_points. If `vectorized`,
+        `function` is f(points) -> array.
+
+    Returns
+    -------
+    store : SimplexStore
+        The 2^d corners, with their values, and no simplices.
+    cover : KuhnCover
+        With no regions yet; the whole hyperrectangle is the region
+        with the empty prefix, ().
+    """
     points = _produce_points_at_corners_of_hyperrectangle(bounds)
-    function_points = [FunctionPoint(point, function(point))
-                       for point in points]
-    return triangulate_function_points_into_simplices(function_points)
+    values = evaluate_points(
+        function, points, executor=executor, vectorized=vectorized,
+        chunk_size=chunk_size, progress=progress)
+    store = SimplexStore(len(bounds), capacity=points.shape[0])
+    store.add_points(points, values)
+    return store, KuhnCover(len(bounds))
+
+
+class KuhnCover(object):
+    """
+    Regions of the Kuhn triangulation of a hyperrectangle, for building
+    the triangulation lazily.
+
+    The simplices of the Kuhn triangulation correspond to permutations
+    of the axes. A region is the union of the simplices whose
+    permutations start with the same prefix, p, i.e. the convex
+    polytope {x : x[p[0]] >= ... >= x[p[-1]] >= every other x[i]} in
+    the scaled unit cube. The empty prefix is the whole hyperrectangle,
+    and a prefix of length d - 1 is a single simplex. Splitting a region
+    gives one region for each axis which can come next, so the
+    triangulation need only be built where it is explored.
+
+    Attributes
+    ----------
+    ndim : int
+    corner_indices : (2**ndim,) numpy.ndarray of ints
+        The index in a SimplexStore of each corner, in the order of
+        _produce_points_at_corners_of_hyperrectangle.
+    prefixes : dict
+        int -> tuple of the regions which are in the cover.
+
+    Methods
+    -------
+    add: list of prefixes -> list of region ids
+    pop: region id -> prefix
+    children: prefix -> list of prefixes
+    is_simplex: prefix -> bool
+    contains: prefix, (d,) array -> bool
+    vertices: prefix -> array of store indices
+    """
+
+    def __init__(self, ndim, corner_indices=None):
+        """
+        Parameters
+        ----------
+        ndim : int
+        corner_indices : list-like of ints or None, optional
+            Default is 0, 1, ..., 2**ndim - 1, i.e. the corners are the
+            first points of the store.
+        """
+        self.ndim = int(ndim)
+        if corner_indices is None:
+            corner_indices = np.arange(2**self.ndim)
+        self.corner_indices = np.asarray(corner_indices, dtype='int64')
+        self.prefixes = dict()
+        self._next_id = 0
+        self._weights = 2**np.arange(self.ndim - 1, -1, -1)
+
+    def add(self, prefixes):
+        ids = []
+        for prefix in prefixes:
+            self.prefixes[self._next_id] = tuple(prefix)
+            ids.append(self._next_id)
+            self._next_id += 1
+        return ids
+
+    def pop(self, region_id):
+        return self.prefixes.pop(region_id)
+
+    def children(self, prefix):
+        return [
+            tuple(prefix) + (axis,)
+            for axis in range(self.ndim) if axis not in prefix]
+
+    def is_simplex(self, prefix):
+        return len(prefix) >= self.ndim - 1
+
+    def contains(self, prefix, coordinates, tol=1e-12):
+        """
+        Whether the region has the point at `coordinates` in the scaled
+        unit cube, i.e. (point - lower corner) / (upper - lower corner).
+        """
+        coordinates = np.asarray(coordinates, dtype='float')
+        rest = np.delete(coordinates, prefix)
+        chain = np.concatenate([coordinates[list(prefix)], [rest.max()]])
+        return bool(np.all(np.diff(chain) <= tol))
+
+    def vertices(self, prefix):
+        """
+        The store indices of the region's vertices: the corners on the
+        path from the lower corner along the axes in `prefix`, and then
+        every corner reached from there along the other axes. For a
+        simplex, these are in the order of _kuhn_triangulation.
+        """
+        prefix = np.asarray(prefix, dtype='int64')
+        path = np.cumsum(
+            np.concatenate([[0], self._weights[prefix]]))
+        rest = np.delete(self._weights, prefix)
+        subsets = np.arange(2**rest.size).reshape(-1, 1)
+        shifts = np.arange(rest.size - 1, -1, -1)
+        offsets = ((subsets >> shifts) & 1).dot(rest).reshape(-1)
+        corner_ids = np.concatenate([path[:-1], path[-1] + offsets])
+        return self.corner_indices[corner_ids]
 
 
 def triangulate_function_points_into_simplices(function_points):
@@ -26,19 +237,45 @@ def _produce_points_at_corners_of_hyperrectangle(bounds):
     Parameters
     ----------
     bounds : (N, 2) list-like of bounds for each parameter
+
+    The corners are ordered by their binary encoding, with the first
+    parameter as the most significant bit: corner k is at the upper
+    bound of parameter i if bit N - 1 - i of k is set.
+    """
+    bounds = np.asarray(bounds, dtype='float').reshape(-1, 2)
+    ndim = bounds.shape[0]
+    corner_ids = np.arange(2**ndim).reshape(-1, 1)
+    shifts = np.arange(ndim - 1, -1, -1)
+    bits = (corner_ids >> shifts) & 1
+    side_lengths = bounds[:, 1] - bounds[:, 0]
+    return bounds[:, 0] + bits * side_lengths
+
+
+def _kuhn_triangulation(ndim):
     """
-    ndim = len(bounds)
-    origin = np.array([b[0] for b in bounds])
-    side_lengths = np.array([b[1] - b[0] for b in bounds])
-    sides = np.eye(ndim, dtype='float') * side_lengths.reshape(ndim, 1)
-
-    corners = []
-    for corner_id in range(2**ndim):
-        # Get a binary encoding for the corner as a string, '00001' etc
-        encoding = bin(corner_id).split('b')[1].rjust(ndim, '0')
-        this_corner = origin.copy().astype('float')
-        for side, zero_or_one in zip(sides, encoding):
-            this_corner += side * int(zero_or_one)
-        corners.append(this_corner)
-    return np.array(corners)
+    The (ndim!, ndim + 1) rows of corner indices of the simplices of
+    the Kuhn triangulation of the unit cube, in the corner order of
+    _produce_points_at_corners_of_hyperrectangle.
 
+    Each permutation p of the axes gives the simplex whose vertices
+    walk from the lower corner to the upper one, stepping along axis
+    p[0], then p[1], and so on; it is {x : x[p[0]] >= x[p[1]] >= ...}.
+    """
+    orders = np.array(list(permutations(range(ndim))), dtype='int64')
+    steps = 2**(ndim - 1 - orders)
+    rows = np.zeros((orders.shape[0], ndim + 1), dtype='int64')
+    np.cumsum(steps, axis=1, out=rows[:, 1:])
+    return rows
+
+
+def _produce_vertices_of_enclosing_simplex(bounds):
+    """
+    The vertices of the simplex {x : x >= lower, sum((x - lower) /
+    side_lengths) <= N}, which contains the hyperrectangle.
+    """
+    bounds = np.asarray(bounds, dtype='float').reshape(-1, 2)
+    ndim = bounds.shape[0]
+    side_lengths = bounds[:, 1] - bounds[:, 0]
+    vertices = np.tile(bounds[:, 0], (ndim + 1, 1))
+    vertices[1:] += ndim * np.diag(side_lengths)
+    return vertices
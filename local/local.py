@@ -0,0 +1,72 @@
+import numpy as np
+from scipy.optimize import minimize
+
+from globaloptimize.geometry.simplex import FunctionPoint
+
+
+class LocalMinimizer(object):
+    """
+    Finds a local minimum of a function, starting from a point.
+
+    BranchBoundOptimizer runs a LocalMinimizer during branch and bound
+    to find good points, and known local minima, early.
+    """
+
+    def minimize(self, objective_function, initial_point, bounds):
+        """
+        Parameters
+        ----------
+        objective_function : callable
+            f(point) -> float
+        initial_point : (d,) numpy.ndarray
+        bounds : tuple of (d,) numpy.ndarrays
+            The (lower, upper) corners of a box to stay inside of.
+
+        Returns
+        -------
+        FunctionPoint
+            The best point found. Its `is_local_minimum` is whether the
+            minimizer verified that the point is a local minimum.
+        """
+        raise NotImplementedError("Implement in subclass")
+
+
+class ScipyLocalMinimizer(LocalMinimizer):
+    """Local minimization with scipy.optimize.minimize"""
+
+    def __init__(self, method='L-BFGS-B', gtol=1e-5, **minimize_kwargs):
+        """
+        Parameters
+        ----------
+        method : str, optional
+            A scipy.optimize.minimize method which accepts bounds, e.g.
+            'L-BFGS-B', 'TNC', 'Powell', 'Nelder-Mead' or 'SLSQP'.
+        gtol : float, optional
+            A result is only a local minimum if the norm of its gradient
+            is below this. Methods which return no gradient, e.g.
+            'Powell' and 'Nelder-Mead', never find local minima.
+        **minimize_kwargs
+            Passed to scipy.optimize.minimize, e.g. `options` or `tol`.
+        """
+        self.method = method
+        self.gtol = gtol
+        self.minimize_kwargs = minimize_kwargs
+
+    def minimize(self, objective_function, initial_point, bounds):
+        lower, upper = bounds
+        result = minimize(
+            objective_function,
+            np.asarray(initial_point, dtype='float'),
+            method=self.method,
+            bounds=list(zip(lower, upper)),
+            **self.minimize_kwargs)
+        # A successful exit only means the method's own tolerances were
+        # met, e.g. on the step size, not that the gradient vanishes.
+        jac = result.get('jac')
+        is_local_minimum = bool(
+            result.success and jac is not None and
+            np.linalg.norm(jac) < self.gtol)
+        return FunctionPoint(
+            np.asarray(result.x, dtype='float'),
+            float(result.fun),
+            is_local_minimum)
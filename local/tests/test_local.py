@@ -0,0 +1,75 @@
+import unittest
+
+import numpy as np
+
+from globaloptimize.local.local import LocalMinimizer, ScipyLocalMinimizer
+from globaloptimize.geometry.simplex import FunctionPoint
+
+
+class TestLocalMinimizer(unittest.TestCase):
+    def test_minimize_raises_notimplementederror(self):
+        minimizer = LocalMinimizer()
+        bounds = (-np.ones(2), np.ones(2))
+        self.assertRaises(
+            NotImplementedError,
+            minimizer.minimize, square_distance_from_center, np.zeros(2),
+            bounds)
+
+
+class TestScipyLocalMinimizer(unittest.TestCase):
+    def test_minimize_finds_interior_minimum(self):
+        minimizer = ScipyLocalMinimizer()
+        bounds = (-np.ones(3), 2 * np.ones(3))
+        result = minimizer.minimize(
+            square_distance_from_center, np.array([1.5, -0.5, 1.0]), bounds)
+        self.assertIsInstance(result, FunctionPoint)
+        self.assertTrue(result.is_local_minimum)
+        self.assertTrue(np.allclose(result.point, 0, atol=1e-6))
+        self.assertEqual(result.value, square_distance_from_center(
+            result.point))
+
+    def test_minimize_stays_in_bounds(self):
+        minimizer = ScipyLocalMinimizer()
+        bounds = (np.ones(2), 2 * np.ones(2))
+        result = minimizer.minimize(
+            square_distance_from_center, np.array([1.5, 1.5]), bounds)
+        self.assertTrue(np.all(result.point >= bounds[0]))
+        self.assertTrue(np.allclose(result.point, 1))
+
+    def test_passes_method_to_scipy(self):
+        minimizer = ScipyLocalMinimizer(
+            method='Nelder-Mead', options={'xatol': 1e-8, 'fatol': 1e-12})
+        bounds = (-np.ones(2), np.ones(2))
+        result = minimizer.minimize(
+            square_distance_from_center, np.array([0.5, 0.5]), bounds)
+        self.assertTrue(np.allclose(result.point, 0, atol=1e-5))
+
+    def test_no_local_minimum_without_gradient(self):
+        minimizer = ScipyLocalMinimizer(method='Nelder-Mead')
+        bounds = (-np.ones(2), np.ones(2))
+        result = minimizer.minimize(
+            square_distance_from_center, np.array([0.5, 0.5]), bounds)
+        self.assertFalse(result.is_local_minimum)
+
+    def test_no_local_minimum_above_gtol(self):
+        bounds = (-np.ones(2), np.ones(2))
+        for gtol, expected in [(1e-5, True), (1e-15, False)]:
+            minimizer = ScipyLocalMinimizer(gtol=gtol)
+            result = minimizer.minimize(
+                square_distance_from_center, np.array([0.5, 0.5]), bounds)
+            self.assertEqual(result.is_local_minimum, expected)
+
+    def test_no_local_minimum_on_the_boundary(self):
+        minimizer = ScipyLocalMinimizer()
+        bounds = (np.ones(2), 2 * np.ones(2))
+        result = minimizer.minimize(
+            square_distance_from_center, np.array([1.5, 1.5]), bounds)
+        self.assertFalse(result.is_local_minimum)
+
+
+def square_distance_from_center(p):
+    return np.linalg.norm(p)**2
+
+
+if __name__ == '__main__':
+    unittest.main()
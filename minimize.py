@@ -0,0 +1,244 @@
+"""
+A scipy.optimize-like interface to branch-and-bound minimization on a
+hyperrectangle.
+"""
+import os
+import multiprocessing
+
+import numpy as np
+
+from globaloptimize.optimize import BranchBoundOptimizer
+from globaloptimize.bound.bound import (
+    MaxPointSimplexBoundCalculator,
+    CircumsphereSimplexBoundCalculator,
+    CentroidSimplexBoundCalculator,
+    OrdinaryPointBoundCalculator,
+    )
+from globaloptimize.branch.branch import LongestEdgeBranchingStrategy
+
+
+SIMPLEX_BOUNDERS = {
+    'max_point': MaxPointSimplexBoundCalculator,
+    'circumsphere': CircumsphereSimplexBoundCalculator,
+    'centroid': CentroidSimplexBoundCalculator,
+    }
+
+# The radius-based bounds only shrink if the simplices stay well-shaped,
+# which max-vertex bisection does not do.
+_DEFAULT_BRANCHING_STRATEGIES = {
+    'circumsphere': LongestEdgeBranchingStrategy,
+    'centroid': LongestEdgeBranchingStrategy,
+    }
+
+# The batch size for a map-like `workers` or a vectorized objective,
+# whose parallelism we do not know.
+_DEFAULT_BATCH_SIZE = 16
+
+
+def minimize_branch_bound(fun, bounds, args=(), lipschitz=np.inf,
+                          gradient_lipschitz=np.inf, maxfev=1000, ftol=1e-5,
+                          rtol=0.0, workers=1, vectorized=False,
+                          callback=None, batch_size=None, bounder='max_point',
+                          lazy=False, prune=False, **optimizer_kwargs):
+    """
+    Find the global minimum of a function on a hyperrectangle, to
+    within `ftol`, by branch and bound.
+
+    The hyperrectangle is split into the simplices of its Kuhn
+    triangulation, which are bisected until none can contain a point
+    more than `ftol` below the best point found. The bounds on each
+    simplex come from the Lipschitz constants of `fun` and of its
+    gradient, so at least one of them must be given; the result is
+    only certified if they are true bounds.
+
+    Parameters
+    ----------
+    fun : callable
+        fun(x, *args) -> float, where x is a (d,) numpy.ndarray; or,
+        if `vectorized`, fun(x, *args) -> (S,) array of floats, where x
+        is a (d, S) array of S points, as in
+        scipy.optimize.differential_evolution.
+    bounds : scipy.optimize.Bounds or (d, 2) sequence of (min, max)
+        The hyperrectangle; every bound must be finite.
+    args : tuple, optional
+        Extra arguments to `fun`.
+    lipschitz : float, optional
+        A bound on |f(x) - f(y)| / |x - y| on the hyperrectangle.
+    gradient_lipschitz : float, optional
+        A bound on |grad f(x) - grad f(y)| / |x - y|.
+    maxfev : int, optional
+        The maximum number of evaluations of `fun`, including the 2^d
+        at the corners of the hyperrectangle.
+    ftol, rtol : float, optional
+        Stop once the best point found is certified to be within
+        `ftol + rtol * abs(fun)` of the global minimum.
+    workers : int or map-like callable, optional
+        As in scipy.optimize.differential_evolution: if an int other
+        than 1, the points are evaluated in parallel with a
+        multiprocessing.Pool of that many processes, or of one per CPU
+        for -1; if a map-like callable, such as
+        multiprocessing.Pool.map, points are evaluated with
+        ``workers(func, iterable)``. Parallel evaluation requires `fun`
+        to be picklable, and overrides `vectorized`. Default is 1, to
+        evaluate serially.
+    vectorized : bool, optional
+        Whether `fun` evaluates several points in one call, as above.
+    callback : callable or None, optional
+        callback(intermediate_result), with an OptimizeResult of `x`,
+        `fun`, `nfev`, `nit`, `lower_bound` and `gap` so far, called
+        after each batch; `nfev` includes the corners, as in the
+        result. Minimization stops if it returns True or
+        raises StopIteration.
+    batch_size : int or None, optional
+        The number of simplices to branch on, and midpoints to evaluate
+        together, per batch. Default is 1 for serial evaluation, the
+        number of processes for an int `workers`, and 16 for a map-like
+        `workers` or `vectorized`.
+    bounder : {'max_point', 'circumsphere', 'centroid'}, optional
+        The SimplexBoundCalculator to use; see globaloptimize.bound.
+        'circumsphere' and 'centroid' bound by a radius of the simplex,
+        which only shrinks if the simplices stay well-shaped, so unless
+        a `branching_strategy` is passed they bisect the longest edge;
+        with the optimizer's default, max-vertex bisection, they are far
+        looser than 'max_point'.
+    lazy : bool, optional
+        Whether to triangulate the hyperrectangle lazily; see
+        BranchBoundOptimizer.from_hyperrectangle.
+    prune : bool, optional
+        See BranchBoundOptimizer.optimize.
+    **optimizer_kwargs
+        Passed to BranchBoundOptimizer, e.g. `local_minimizer` or
+        `branching_strategy`.
+
+    Returns
+    -------
+    scipy.optimize.OptimizeResult
+        As returned by BranchBoundOptimizer.optimize, except that
+        `nfev` includes the evaluations at the corners.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> result = minimize_branch_bound(
+    ...     lambda x: np.sum(x**2), [(-1, 2), (-1, 2)],
+    ...     gradient_lipschitz=2.0, ftol=1e-3)
+    >>> bool(result.success), bool(result.fun < 1e-3)
+    (True, True)
+    """
+    bounds = _standardize_bounds(bounds)
+    ndim = bounds.shape[0]
+    if not np.isfinite(lipschitz) and not np.isfinite(gradient_lipschitz):
+        msg = "At least one of lipschitz, gradient_lipschitz must be finite"
+        raise ValueError(msg)
+    if bounder not in SIMPLEX_BOUNDERS:
+        msg = "bounder must be one of {}".format(sorted(SIMPLEX_BOUNDERS))
+        raise ValueError(msg)
+    num_corners = 2**ndim
+    if maxfev < num_corners:
+        msg = "maxfev must be at least 2**d = {}".format(num_corners)
+        raise ValueError(msg)
+    simplex_bounder = SIMPLEX_BOUNDERS[bounder](
+        OrdinaryPointBoundCalculator(lipschitz, gradient_lipschitz))
+    if (optimizer_kwargs.get('branching_strategy') is None and
+            bounder in _DEFAULT_BRANCHING_STRATEGIES):
+        optimizer_kwargs['branching_strategy'] = (
+            _DEFAULT_BRANCHING_STRATEGIES[bounder]())
+
+    pool = None
+    if callable(workers):
+        executor = _MapExecutor(workers)
+        default_batch_size = _DEFAULT_BATCH_SIZE
+        vectorized = False
+    elif workers == 1:
+        executor = None
+        default_batch_size = _DEFAULT_BATCH_SIZE if vectorized else 1
+    else:
+        processes = os.cpu_count() if workers == -1 else int(workers)
+        pool = multiprocessing.Pool(processes)
+        executor = pool
+        default_batch_size = processes
+        vectorized = False
+    if batch_size is None:
+        batch_size = default_batch_size
+    if vectorized:
+        function = _TransposedFunction(fun, args)
+    else:
+        function = _FunctionWithArgs(fun, args)
+    if callback is not None:
+        callback = _CallbackWithCorners(callback, num_corners)
+
+    try:
+        optimizer = BranchBoundOptimizer.from_hyperrectangle(
+            function, bounds, simplex_bounder, lazy=lazy, executor=executor,
+            vectorized=vectorized, **optimizer_kwargs)
+        result = optimizer.optimize(
+            max_function_evaluations=maxfev - num_corners,
+            ftol=ftol,
+            rtol=rtol,
+            batch_size=batch_size,
+            prune=prune,
+            callback=callback)
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+    result.nfev += num_corners
+    return result
+
+
+class _FunctionWithArgs(object):
+    """A picklable fun(x, *args)."""
+
+    def __init__(self, function, args):
+        self.function = function
+        self.args = tuple(args)
+
+    def __call__(self, point):
+        return self.function(point, *self.args)
+
+
+class _TransposedFunction(_FunctionWithArgs):
+    """Evaluates a (n, d) array of points with a function of (d, n)."""
+
+    def __call__(self, points):
+        return self.function(np.transpose(points), *self.args)
+
+
+class _CallbackWithCorners(object):
+    """Adds the evaluations at the corners to the intermediate `nfev`,
+    which the optimizer counts without them."""
+
+    def __init__(self, callback, num_corners):
+        self.callback = callback
+        self.num_corners = num_corners
+
+    def __call__(self, intermediate_result):
+        intermediate_result.nfev += self.num_corners
+        return self.callback(intermediate_result)
+
+
+class _MapExecutor(object):
+    """Adapts a map-like callable, workers(func, iterable), to the
+    `executor.map(func, iterable)` of evaluate_points."""
+
+    def __init__(self, map_function):
+        self.map_function = map_function
+
+    def map(self, function, iterable):
+        return self.map_function(function, iterable)
+
+
+def _standardize_bounds(bounds):
+    if hasattr(bounds, 'lb') and hasattr(bounds, 'ub'):
+        lower, upper = np.broadcast_arrays(
+            np.asarray(bounds.lb, dtype='float'),
+            np.asarray(bounds.ub, dtype='float'))
+        bounds = np.stack([lower.ravel(), upper.ravel()], axis=1)
+    bounds = np.asarray(bounds, dtype='float')
+    if bounds.ndim != 2 or bounds.shape[1] != 2 or bounds.shape[0] == 0:
+        raise ValueError("bounds must be a (d, 2) sequence of (min, max)")
+    if not np.all(np.isfinite(bounds)):
+        raise ValueError("bounds must be finite")
+    if not np.all(bounds[:, 0] < bounds[:, 1]):
+        raise ValueError("Each lower bound must be less than its upper")
+    return bounds
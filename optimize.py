@@ -1,85 +1,1141 @@
+import asyncio
+import os
+from collections import namedtuple
+
 import numpy as np
+from scipy.optimize import OptimizeResult
 
 from globaloptimize.util.heap import Heap
 from globaloptimize.util.util import ObjectValuePair
-from globaloptimize.geometry.simplex import Simplex, FunctionPoint
+from globaloptimize.util.evaluate import evaluate_points
+from globaloptimize.util.timing import PhaseTimer
+from globaloptimize.geometry.simplex import FunctionPoint, SimplexSummary
+from globaloptimize.geometry.store import SimplexStore
+from globaloptimize.geometry.incidence import VertexIncidenceIndex
+from globaloptimize.geometry.triangulate import (
+    KuhnCover,
+    cover_function_on_hyperrectangle,
+    triangulate_function_on_hyperrectangle_into_store,
+    )
+from globaloptimize.branch.branch import MaxVertexEdgeBranchingStrategy
+
 
+_CURRENT_MIN_FILENAME = 'current_min.npz'
+_COVER_FILENAME = 'kuhn_cover.npz'
 
-# TODO:
-# The current branch_on_candidate branches on longest edge from the max
-# vertex. For different bouning methods, it might make sense to do the
-# longest edge from the min vertex (e.g. for min-F0-based-bounds).
+_STATUS_MESSAGES = {
+    0: "The minimum is certified to within ftol + rtol * abs(fun).",
+    1: "The maximum number of function evaluations was reached.",
+    2: "The callback requested a stop.",
+    }
 
-# TODO: Return a more detailed return type with whether the optimization
-# succeeded.
+FrontierChunk = namedtuple(
+    'FrontierChunk',
+    ['simplex_indices', 'bounds', 'points', 'values', 'is_local_minimum',
+     'region_ids', 'region_bounds'])
 
 
 class BranchBoundOptimizer(object):
-    def __init__(self, objective_function, initial_simplices, simplex_bounder):
+    def __init__(self, objective_function, initial_simplices, simplex_bounder,
+                 executor=None, vectorized=False, local_minimizer=None,
+                 local_search_interval=100, branching_strategy=None,
+                 lipschitz_estimator=None, hooks=None):
+        """
+        Parameters
+        ----------
+        objective_function : callable
+            f(point) -> float, or f(points) -> array if `vectorized`.
+        initial_simplices : list-like of Simplex objects, or SimplexStore
+            If a SimplexStore, every simplex in it is an initial
+            simplex, and simplices which already have a bound in the
+            store are not re-bounded.
+        simplex_bounder : SimplexBoundCalculator
+        executor : object with a `map` method, optional
+            Used to evaluate the midpoints of a batch of candidates in
+            parallel, e.g. a concurrent.futures executor. See
+            globaloptimize.util.evaluate.evaluate_points.
+        vectorized : bool, optional
+            Whether `objective_function` evaluates a (n, d) array of
+            points in one call. Default is False.
+        local_minimizer : LocalMinimizer or None, optional
+            If given, `optimize` runs `local_search` when it starts and
+            then every `local_search_interval` function evaluations; see
+            globaloptimize.local.local. Default is no local searches.
+        local_search_interval : int, optional
+            The number of branch-and-bound function evaluations between
+            local searches; at least 1.
+        branching_strategy : BranchingStrategy or None, optional
+            How to split candidates; see globaloptimize.branch.branch.
+            Default is to bisect the longest edge from the vertex with
+            the max value.
+        lipschitz_estimator : AdaptiveLipschitzPointBoundCalculator, optional
+            If given, it is shown the initial points and every edge
+            which is split, and whenever its constants change, every
+            live bound is re-calculated; see `rebound_all`. It should be
+            the point bounder which `simplex_bounder` uses.
+        hooks : OptimizerHooks or None, optional
+            Told of each pop, evaluation, branch, improvement of the
+            current minimum and the end of `optimize`; see
+            globaloptimize.util.hooks, whose EventLog records them.
+            Default is None, which costs nothing.
+        """
+        if local_search_interval < 1:
+            raise ValueError("local_search_interval must be at least 1")
         self.objective_function = objective_function
         self.simplex_bounder = simplex_bounder
-        self._heap = self._setup_heap(initial_simplices)
+        self.executor = executor
+        self.vectorized = vectorized
+        self.local_minimizer = local_minimizer
+        self.local_search_interval = local_search_interval
+        self.num_local_searches = 0
+        if branching_strategy is None:
+            branching_strategy = MaxVertexEdgeBranchingStrategy()
+        self.branching_strategy = branching_strategy
+        self.lipschitz_estimator = lipschitz_estimator
+        self.hooks = hooks
+        self._timer = PhaseTimer()
+        if isinstance(initial_simplices, SimplexStore):
+            self._store = initial_simplices
+            indices = np.arange(self._store.num_simplices)
+        else:
+            self._store, indices = SimplexStore.from_simplices(
+                initial_simplices)
+        if self._observe_initial_points():
+            # Any bounds in the store came from other constants.
+            self._store.bounds[:] = np.nan
+        self._incidence = VertexIncidenceIndex(self._store)
+        self._heap = self._setup_heap(indices)
         self.current_min_function_point = self._get_min_function_point(
-            initial_simplices)
-
-    def optimize(self, max_function_evaluations=1000, ftol=1e-5):
-        for _ in range(max_function_evaluations):
-            candidate = self._heap.pop_min()
-            if candidate.value > self.current_min_function_point.value - ftol:
-                # add candidate back to heap, so we can re-start easily.
-                self._heap.add_to_heap(candidate)
-                return self.current_min_function_point
-            else:
-                self.process_candidate(candidate)
-        # We hit max iterations:
-        return self.current_min_function_point
+            indices)
+        self.num_pruned = 0
+        self._cover = None
+        # Candidates popped by optimize_async whose evaluations are in
+        # flight, by task:
+        self._in_flight = dict()
+
+    @classmethod
+    def from_hyperrectangle(cls, objective_function, bounds, simplex_bounder,
+                            lazy=False, chunk_size=None, progress=None,
+                            **kwargs):
+        """
+        Start from the Kuhn triangulation of a hyperrectangle.
+
+        Parameters
+        ----------
+        objective_function : callable
+        bounds : (d, 2) list-like of bounds for each parameter
+        simplex_bounder : SimplexBoundCalculator
+        lazy : bool, optional
+            If True, start from the hyperrectangle as a single region,
+            and only split regions into the d! simplices of the
+            triangulation as they are popped from the heap; see
+            KuhnCover. Regions are bounded with
+            `simplex_bounder.bound_polytope`. Start-up then takes the
+            2^d corner evaluations and one bound, and memory grows with
+            the explored frontier, instead of with d!. Default is False.
+        chunk_size : int or None, optional
+        progress : callable or None, optional
+            How to evaluate the 2^d corners, with the `executor` and
+            `vectorized` of the optimizer; see
+            globaloptimize.util.evaluate.evaluate_points.
+        **kwargs
+            Passed to the constructor, e.g. `executor`.
+        """
+        evaluate_kwargs = {
+            'executor': kwargs.get('executor'),
+            'vectorized': kwargs.get('vectorized', False),
+            'chunk_size': chunk_size,
+            'progress': progress,
+            }
+        if not lazy:
+            store = triangulate_function_on_hyperrectangle_into_store(
+                objective_function, bounds, **evaluate_kwargs)
+            return cls(objective_function, store, simplex_bounder, **kwargs)
+        store, cover = cover_function_on_hyperrectangle(
+            objective_function, bounds, **evaluate_kwargs)
+        optimizer = cls(objective_function, store, simplex_bounder, **kwargs)
+        optimizer._cover = cover
+        optimizer._push_regions([()])
+        return optimizer
+
+    @classmethod
+    def load(cls, path, objective_function, simplex_bounder, mmap_mode='c',
+             **kwargs):
+        """
+        Resume an optimizer written by `save`.
+
+        Parameters
+        ----------
+        path : str
+        objective_function : callable
+        simplex_bounder : SimplexBoundCalculator
+            Should be the same as the saved optimizer's; the saved
+            bounds are used as they are, without re-bounding.
+        mmap_mode : {None, 'r+', 'c'}, optional
+            How to memory-map the saved arrays; see SimplexStore.load.
+        **kwargs
+            Passed to the constructor, e.g. `executor`.
+        """
+        store = SimplexStore.load(path, mmap_mode=mmap_mode)
+        optimizer = cls(objective_function, store, simplex_bounder, **kwargs)
+        with np.load(os.path.join(path, _CURRENT_MIN_FILENAME)) as data:
+            optimizer.current_min_function_point = FunctionPoint(
+                data['point'],
+                float(data['value']),
+                bool(data['is_local_minimum']))
+        cover_path = os.path.join(path, _COVER_FILENAME)
+        if os.path.exists(cover_path):
+            with np.load(cover_path) as data:
+                optimizer._cover = KuhnCover(
+                    store.dimension, data['corner_indices'])
+                prefixes = [
+                    tuple(row[:length].tolist()) for row, length in
+                    zip(data['prefixes'], data['lengths'])]
+                region_ids = optimizer._cover.add(prefixes)
+                optimizer._push_region_entries(
+                    region_ids, data['bounds'].tolist())
+        return optimizer
+
+    def save(self, path):
+        """
+        Write the optimizer's state to the directory `path`, as .npy
+        files which BranchBoundOptimizer.load memory-maps.
+
+        Only the simplices which are still live, i.e. in the heap, are
+        saved, together with their bounds, the vertices and the
+        current minimum, and any lazy regions which are not split yet.
+        """
+        live = np.flatnonzero(~np.isnan(self._store.bounds))
+        self._store.save(path, simplex_indices=live)
+        current_min = self.current_min_function_point
+        np.savez(
+            os.path.join(path, _CURRENT_MIN_FILENAME),
+            point=current_min.point,
+            value=current_min.value,
+            is_local_minimum=current_min.is_local_minimum)
+        cover_path = os.path.join(path, _COVER_FILENAME)
+        if self._cover is None:
+            # A lazy optimizer saved here before left its regions, which
+            # load would otherwise add to this one.
+            if os.path.exists(cover_path):
+                os.remove(cover_path)
+        else:
+            regions = [
+                e for e in self._heap
+                if e.object < 0 and not self._is_stale(e)]
+            prefixes = np.full(
+                (len(regions), self._store.dimension), -1, dtype='int64')
+            lengths = np.zeros(len(regions), dtype='int64')
+            for row, entry in enumerate(regions):
+                prefix = self._cover.prefixes[-1 - entry.object]
+                prefixes[row, :len(prefix)] = prefix
+                lengths[row] = len(prefix)
+            np.savez(
+                cover_path,
+                prefixes=prefixes,
+                lengths=lengths,
+                bounds=np.array([e.value for e in regions], dtype='float'),
+                corner_indices=self._cover.corner_indices)
+
+    @property
+    def lower_bound(self):
+        """
+        The least value the objective can take on the domain, as far as
+        the bounds show: the least bound of a live simplex or region, or
+        the current minimum if that is less.
+
+        This only looks at the top of the heap, which is kept free of
+        stale entries, and at any candidates in flight in
+        `optimize_async`, so its time does not grow with the heap, and
+        it does not change the optimizer.
+        """
+        lower_bound = self.current_min_function_point.value
+        if len(self._heap) > 0:
+            lower_bound = min(lower_bound, self._heap.peek_min().value)
+        for candidate in self._in_flight.values():
+            lower_bound = min(lower_bound, candidate.value)
+        return lower_bound
+
+    @property
+    def gap(self):
+        """
+        The current minimum less `lower_bound`; the most by which the
+        current minimum can be above the global minimum. Divide by the
+        absolute current minimum for a relative gap.
+        """
+        return self.current_min_function_point.value - self.lower_bound
+
+    def iter_frontier(self, chunk_size=1024):
+        """
+        Iterate over the live simplices in the heap, in chunks of
+        arrays, without changing the optimizer, e.g. to stream the
+        frontier to disk or to a plot.
+
+        Only one chunk of the heap is copied at a time, so it is safe to
+        iterate from another thread while `optimize` runs; each chunk is
+        then consistent by itself, but the chunks together are not a
+        snapshot: a simplex may be missed, or appear in two chunks, if
+        it is branched on in between. Chunks taken across a `prune` are
+        meaningless, since it renumbers the store.
+
+        Parameters
+        ----------
+        chunk_size : int, optional
+            The number of heap entries per chunk. Stale entries, i.e.
+            those of simplices already branched on or re-bounded, are
+            dropped, so chunks may be smaller.
+
+        Yields
+        ------
+        FrontierChunk
+            With, for n simplices with d + 1 vertices each,
+            simplex_indices : (n,) array of store indices
+            bounds : (n,) array
+            points : (n, d + 1, d) array of the vertices
+            values : (n, d + 1) array
+            is_local_minimum : (n, d + 1) array of bools
+            region_ids, region_bounds : arrays of the lazy regions in
+                the chunk, which are not split into simplices yet; see
+                `from_hyperrectangle`.
+        """
+        store = self._store
+        for entries in self._heap.iter_chunks(chunk_size):
+            objects = np.array([e.object for e in entries], dtype='int64')
+            values = np.array([e.value for e in entries], dtype='float')
+            is_region = objects < 0
+            simplex_indices = objects[~is_region]
+            bounds = values[~is_region]
+            # Read the store after the heap, so that every index in the
+            # chunk is already in the store.
+            store_bounds = store.bounds
+            live = simplex_indices < len(store_bounds)
+            live[live] = store_bounds[simplex_indices[live]] == bounds[live]
+            simplex_indices = simplex_indices[live]
+            vertex_indices = store.simplices[simplex_indices]
+            # Regions split outside of the heap, by a local search, are
+            # stale.
+            region_ids = -1 - objects[is_region]
+            live_regions = np.array(
+                [i in self._cover.prefixes for i in region_ids.tolist()],
+                dtype='bool')
+            yield FrontierChunk(
+                simplex_indices=simplex_indices,
+                bounds=bounds[live],
+                points=store.points[vertex_indices],
+                values=store.values[vertex_indices],
+                is_local_minimum=store.is_local_minimum[vertex_indices],
+                region_ids=region_ids[live_regions],
+                region_bounds=values[is_region][live_regions])
+
+    def optimize(self, max_function_evaluations=1000, ftol=1e-5,
+                 batch_size=1, prune=False, callback=None, rtol=0.0):
+        """
+        Parameters
+        ----------
+        max_function_evaluations : int, optional
+        ftol : float, optional
+            Stop once no simplex can contain a point more than `ftol`
+            below the current minimum, i.e. once `gap` is at most
+            `ftol`.
+        batch_size : int, optional
+            The number of best candidates to pop, and whose midpoints
+            are evaluated together, per iteration. Batches larger than
+            1 let `executor` or a vectorized objective evaluate them in
+            parallel.
+        prune : bool, optional
+            If True, periodically drop the simplices which can never be
+            processed with this `ftol`; see `prune`. A sweep is made
+            when the current minimum has improved and the heap has
+            doubled in size since the last sweep, so memory stays
+            proportional to the live frontier. Default is False.
+        callback : callable or None, optional
+            callback(intermediate_result), called after each batch with
+            an OptimizeResult of `x`, `fun`, `nfev`, `nit`,
+            `lower_bound` and `gap` so far. Optimization stops if it
+            returns True or raises StopIteration.
+        rtol : float, optional
+            A relative tolerance, added to `ftol`: stop once `gap` is
+            at most `ftol + rtol * abs(fun)`, where `fun` is the current
+            minimum. Default is 0.
+
+        Returns
+        -------
+        scipy.optimize.OptimizeResult
+            With the best point found, `x`, and its value, `fun`;
+            `success`, `status` and `message`, for whether the minimum
+            was certified to within `ftol` or the evaluations ran out;
+            `status` is 0 if it was, 1 if the evaluations ran out, and
+            2 if `callback` stopped it; `nfev`, `nit` (the number of
+            batches branched on) and
+            `nlocal` (the number of local searches) for this call;
+            `lower_bound`, the least bound on the objective over the
+            domain, and `gap`, `fun - lower_bound`; `heap_size`; and
+            `timings`, a dict of the wall-clock seconds spent in
+            'evaluation', 'bounding', 'branching', 'heap',
+            'local_search' and 'prune', with the 'other' and 'total'.
+        """
+        self._timer = PhaseTimer()
+        num_local_searches = self.num_local_searches
+        nfev = 0
+        nit = 0
+        status = 1
+        next_local_search = 0
+        last_sweep_size = len(self._heap)
+        last_sweep_min = self.current_min_function_point.value
+        while nfev < max_function_evaluations:
+            if self.local_minimizer is not None and nfev >= next_local_search:
+                with self._timer.phase('local_search'):
+                    nfev += self.local_search(max_function_evaluations - nfev)
+                next_local_search = nfev + self.local_search_interval
+                continue
+            number = min(
+                batch_size,
+                (max_function_evaluations - nfev) // self._points_per_split)
+            if number == 0:
+                break
+            candidates = self._pop_candidates(number, ftol, rtol)
+            if len(candidates) == 0:
+                status = 0
+                break
+            nfev += self.process_candidates(candidates)
+            nit += 1
+            if callback is not None and _stop_requested(
+                    callback, self._intermediate_result(nfev, nit)):
+                status = 2
+                break
+            if (prune and len(self._heap) >= 2 * last_sweep_size and
+                    self.current_min_function_point.value < last_sweep_min):
+                with self._timer.phase('prune'):
+                    self.prune(ftol)
+                last_sweep_size = len(self._heap)
+                last_sweep_min = self.current_min_function_point.value
+        result = self._make_result(
+            status, nfev, nit, self.num_local_searches - num_local_searches)
+        if self.hooks is not None:
+            self.hooks.on_terminate(result)
+        return result
+
+    def prune(self, ftol=0.0):
+        """
+        Drop every simplex, or lazy region, whose bound is above the
+        current minimum minus `ftol`, together with stale heap entries,
+        and compact the store down to the remaining simplices and the
+        corners of the remaining regions.
+
+        The dropped simplices can never be processed by `optimize` with
+        this `ftol` or a larger one; they are counted in `num_pruned`.
+        Simplex views and indices into the store are invalid after a
+        prune, which should not be run while `optimize_async` is
+        running.
+
+        Returns
+        -------
+        int
+            The number of simplices dropped.
+        """
+        threshold = self.current_min_function_point.value - ftol
+        # A simplex can have several live entries, e.g. if it was pushed
+        # again with the same bound, but must only get one row.
+        live = list({
+            e.object: e for e in self._heap
+            if not self._is_stale(e)}.values())
+        keep = [e for e in live if e.value <= threshold]
+        number_pruned = len(live) - len(keep)
+        self.num_pruned += number_pruned
+
+        kept_simplices = [e for e in keep if e.object >= 0]
+        corners = []
+        if self._cover is not None:
+            kept_regions = set(-1 - e.object for e in keep if e.object < 0)
+            for region_id in list(self._cover.prefixes):
+                if region_id not in kept_regions:
+                    self._cover.pop(region_id)
+            corners = [
+                self._cover.vertices(prefix)
+                for prefix in self._cover.prefixes.values()]
+            corners = np.concatenate(corners) if corners else []
+        kept_points = self._store.compact(
+            [e.object for e in kept_simplices], point_indices=corners)
+        for new_index, entry in enumerate(kept_simplices):
+            entry.object = new_index
+        if self._cover is not None:
+            # Corners of dropped regions get meaningless indices, but the
+            # kept regions, and their children, never use them.
+            self._cover.corner_indices = np.searchsorted(
+                kept_points, self._cover.corner_indices)
+        self._heap = Heap.create_from_iterable(keep)
+        self._incidence = VertexIncidenceIndex(self._store)
+        self._incidence.add(np.arange(len(kept_simplices)))
+        return number_pruned
+
+    def local_search(self, max_function_evaluations=None):
+        """
+        Run `local_minimizer` from the best vertex of the most promising
+        live simplex, unless that vertex is already a known local
+        minimum.
+
+        A result inside a live simplex becomes a new vertex, splitting
+        that simplex, and updates the current minimum. If the minimizer
+        converged strictly inside the bounding box of the domain, the
+        vertex is flagged as a local minimum, which bounders such as
+        LocalMinimumSimplexBoundCalculator use.
+
+        Parameters
+        ----------
+        max_function_evaluations : int or None, optional
+            The most evaluations the minimizer may use; if it runs out,
+            the best point it found is used. Default is no limit.
+
+        Returns
+        -------
+        int
+            The number of function evaluations used.
+        """
+        start = self._local_search_start()
+        if start is None:
+            return 0
+        function = _BudgetedFunction(
+            self._evaluate_scalar, max_function_evaluations)
+        lower = self._store.points.min(axis=0)
+        upper = self._store.points.max(axis=0)
+        try:
+            result = self.local_minimizer.minimize(
+                function, self._store.points[start].copy(), (lower, upper))
+        except _BudgetExhausted:
+            result = function.best
+        self.num_local_searches += 1
+        if result is not None:
+            is_local_minimum = bool(
+                result.is_local_minimum and
+                np.all(lower < result.point) and
+                np.all(result.point < upper))
+            self._add_local_search_result(
+                result.point, result.value, is_local_minimum)
+        return function.nfev
 
     def process_candidate(self, candidate):
-        simplex = candidate.object
+        self.process_candidates([candidate])
+
+    def process_candidates(self, candidates):
+        """
+        Branch on each candidate, evaluating all of their new points
+        together. Returns the number of function evaluations.
+        """
+        plans = [self._plan_split(c.object) for c in candidates]
+        new_points = np.concatenate([plan[-1] for plan in plans])
+        point_indices = self._evaluate_points(new_points)
+        children = []
+        edges = []
+        for number, plan in enumerate(plans):
+            start = number * self._points_per_split
+            stop = start + self._points_per_split
+            children.append(
+                self._apply_split(plan, point_indices[start:stop]))
+            edges.append(_along_edge(plan, point_indices[start:stop]))
+        self._remove_simplices([c.object for c in candidates])
+        self._push_indices([i for indices in children for i in indices])
+        if self.hooks is not None:
+            for candidate, child_indices in zip(candidates, children):
+                self._on_branch(
+                    candidate.object, candidate.value, child_indices)
+        self._observe(edges)
+        return len(point_indices)
+
+    def simplices_containing(self, vertex_index):
+        """
+        The live simplices, i.e. those in the heap which have not been
+        branched on, which have the vertex `vertex_index` of the store.
+        Use `self._store.find_point` to find the index of a point.
+        """
+        return self._incidence.simplices_containing(vertex_index)
+
+    def refine_around_vertex(self, vertex_index):
+        """
+        Branch on every live simplex which contains `vertex_index`,
+        regardless of its bound. Candidates popped from the heap, e.g.
+        in flight in `optimize_async`, are skipped, so they are not
+        branched on twice. Returns the number of simplices branched on.
+        """
+        simplex_indices = self.simplices_containing(vertex_index)
+        simplex_indices = simplex_indices[
+            ~np.isnan(self._store.bounds[simplex_indices])].tolist()
+        if len(simplex_indices) > 0:
+            bounds = self._store.bounds[simplex_indices].tolist()
+            self.process_candidates([
+                ObjectValuePair(index, bound)
+                for index, bound in zip(simplex_indices, bounds)])
+        return len(simplex_indices)
+
+    def rebound_around_vertex(self, vertex_index):
+        """
+        Re-calculate the bounds of every live simplex which contains
+        `vertex_index`, e.g. after the information at that vertex has
+        changed. Candidates popped from the heap, e.g. in flight in
+        `optimize_async`, are skipped, so they are not popped again.
+        Returns the number of simplices re-bounded.
+        """
+        simplex_indices = self.simplices_containing(vertex_index)
+        simplex_indices = simplex_indices[
+            ~np.isnan(self._store.bounds[simplex_indices])].tolist()
+        self._bound_and_push(simplex_indices)
+        return len(simplex_indices)
 
-        new_simplices = self.branch_on_candidate(simplex)
-        for simplex in new_simplices:
-            candidate = ObjectValuePair(
-                simplex, self.simplex_bounder.bound(simplex))
-            self._heap.add_to_heap(candidate)
+    def rebound_all(self):
+        """
+        Re-calculate the bound of every live simplex and lazy region,
+        e.g. after the constants of the simplex bounder have changed,
+        and rebuild the heap from them. Candidates in flight in
+        `optimize_async` keep their bounds. Returns the number of
+        simplices and regions re-bounded.
+        """
+        # Candidates in flight are marked as taken, so are not live.
+        live = np.flatnonzero(~np.isnan(self._store.bounds)).tolist()
+        bounds = self._bound_indices(live)
+        self._store.bounds[live] = bounds
+        entries = [
+            ObjectValuePair(index, bound)
+            for index, bound in zip(live, bounds)]
+        if self._cover is not None:
+            entries.extend(
+                ObjectValuePair(-1 - region_id, self._bound_region(prefix))
+                for region_id, prefix in self._cover.prefixes.items())
+        with self._timer.phase('heap'):
+            self._heap = Heap.create_from_iterable(entries)
+        return len(entries)
 
     def branch_on_candidate(self, simplex):
-        # choose 2 vertices to branch off
-        vertices_old = simplex.function_points
-        vertex_max = simplex.vertex_with_max_value
-        index_farthest = np.argmax(
-            [np.linalg.norm(vertex_max.point - v.point) for v in vertices_old])
-        vertex_farthest = vertices_old[index_farthest]
+        index = self._store.add_simplex_from_function_points(simplex)
+        new_indices = self._branch_on_index(index)
+        return tuple(self._store.simplex(i) for i in new_indices)
 
-        other_vertices = [
-            v for v in vertices_old if v not in [vertex_farthest, vertex_max]]
+    @property
+    def _points_per_split(self):
+        return self.branching_strategy.num_pieces - 1
 
-        # branch off the midpoint of those 2 vertices
-        midpoint = 0.5 * (vertex_max.point + vertex_farthest.point)
-        vertex_midpoint = self._evaluate_function_point(midpoint)
+    def _branch_on_index(self, index):
+        plan = self._plan_split(index)
+        point_indices = self._evaluate_points(plan[-1])
+        return self._apply_split(plan, point_indices)
 
-        new_candidates = (
-            Simplex(other_vertices + [vertex_midpoint, vertex_max]),
-            Simplex(other_vertices + [vertex_midpoint, vertex_farthest]))
-        return new_candidates
+    def _plan_split(self, index):
+        with self._timer.phase('branching'):
+            vertex_indices = self._store.simplices[index].copy()
+            summary = self._store.simplex_summary(index)
+            summary = summary._replace(
+                edge_lengths=summary.edge_lengths.copy())
+            points = self._store.points[vertex_indices]
+            values = self._store.values[vertex_indices]
+            i, j = self.branching_strategy.choose_edge(
+                points, values, summary)
+            new_points = self.branching_strategy.new_points(points, i, j)
+        return vertex_indices, summary, i, j, new_points
+
+    def _apply_split(self, plan, new_point_indices):
+        # The k children of a k-way split are the pieces between
+        # consecutive points along the edge from vertex i to vertex j.
+        vertex_indices, summary, i, j, _ = plan
+        along_edge = _along_edge(plan, new_point_indices)
+        with self._timer.phase('branching'):
+            rows = []
+            summaries = []
+            for start, stop in zip(along_edge[:-1], along_edge[1:]):
+                row = vertex_indices.copy()
+                row[i] = start
+                row[j] = stop
+                rows.append(row)
+                summaries.append(
+                    _child_summary(self._store, summary, row, i, j))
+            return self._store.add_simplices(rows, summaries).tolist()
+
+    def _local_search_start(self):
+        candidate = self._peek_candidate(np.inf)
+        if candidate is None:
+            return None
+        vertex_indices = self._store.simplices[candidate.object]
+        start = vertex_indices[
+            np.argmin(self._store.values[vertex_indices])]
+        if self._store.is_local_minimum[start]:
+            return None
+        return start
+
+    def _add_local_search_result(self, point, value, is_local_minimum):
+        if self._cover is not None:
+            # The point can be in lazy regions, which have no simplices
+            # to insert it into yet.
+            self._split_regions_containing(point)
+        live = np.flatnonzero(~np.isnan(self._store.bounds))
+        try:
+            index, coordinates = self._store.find_simplex(point, live)
+        except ValueError:
+            # Outside of the live simplices, e.g. outside of a domain
+            # which is not a box, so we can't use the point.
+            return
+        vertex_indices = self._store.simplices[index]
+        nearest = np.argmax(coordinates)
+        if coordinates[nearest] >= 1 - 1e-12:
+            # The point is (numerically) a vertex, e.g. the start.
+            if (is_local_minimum and
+                    self._store.values[vertex_indices[nearest]] <= value):
+                self._store.is_local_minimum[vertex_indices[nearest]] = True
+                self.rebound_around_vertex(vertex_indices[nearest])
+            return
+        point_index = self._store.add_point(point, value, is_local_minimum)
+        self._update_current_min([point_index])
+        # Replacing each vertex with the new point splits the simplex
+        # into d + 1 children, less any which are flat because the
+        # point is on a face of the simplex:
+        rows = []
+        for slot in np.flatnonzero(coordinates > 1e-12):
+            row = vertex_indices.copy()
+            row[slot] = point_index
+            rows.append(row)
+        new_indices = self._store.add_simplices(rows).tolist()
+        bound = self._store.bounds[index]
+        self._remove_simplices([index])
+        self._push_indices(new_indices)
+        if self.hooks is not None:
+            self._on_branch(index, bound, new_indices)
+        self._observe([[vertex, point_index] for vertex in vertex_indices])
+
+    def _make_result(self, status, nfev, nit, nlocal):
+        result = self._intermediate_result(nfev, nit)
+        result.update(
+            success=status == 0,
+            status=status,
+            message=_STATUS_MESSAGES[status],
+            nlocal=nlocal,
+            heap_size=len(self._heap),
+            timings=self._timer.summary())
+        return result
+
+    def _intermediate_result(self, nfev, nit):
+        best = self.current_min_function_point
+        lower_bound = self.lower_bound
+        return OptimizeResult(
+            x=best.point.copy(),
+            fun=best.value,
+            nfev=nfev,
+            nit=nit,
+            lower_bound=lower_bound,
+            gap=best.value - lower_bound)
+
+    def _evaluate_scalar(self, point):
+        with self._timer.phase('evaluation'):
+            if self.vectorized:
+                value = self.objective_function(np.reshape(point, (1, -1)))
+                value = float(np.reshape(value, -1)[0])
+            else:
+                value = float(self.objective_function(point))
+        if self.hooks is not None:
+            self.hooks.on_evaluate(np.reshape(point, (1, -1)), [value])
+        return value
 
     def _evaluate_function_point(self, point):
-        value = self.objective_function(point)
-        function_point = FunctionPoint(point, value)
-        if value < self.current_min_function_point.value:
-            self.current_min_function_point = function_point
-        return function_point
+        return self._store.function_point(self._evaluate_point(point))
+
+    def _evaluate_point(self, point):
+        return self._evaluate_points(np.reshape(point, (1, -1)))[0]
+
+    def _evaluate_points(self, points):
+        with self._timer.phase('evaluation'):
+            if len(points) == 1 and not self.vectorized:
+                values = [self.objective_function(points[0])]
+            else:
+                values = evaluate_points(
+                    self.objective_function,
+                    points,
+                    executor=self.executor,
+                    vectorized=self.vectorized)
+        return self._add_evaluated_points(points, values)
 
-    def _setup_heap(self, simplices):
+    def _add_evaluated_points(self, points, values):
+        if self.hooks is not None:
+            self.hooks.on_evaluate(points, values)
+        indices = self._store.add_points(points, values)
+        self._update_current_min(indices)
+        return indices.tolist()
+
+    def _update_current_min(self, point_indices):
+        values = self._store.values[point_indices]
+        best = np.argmin(values)
+        if values[best] < self.current_min_function_point.value:
+            self.current_min_function_point = self._store.function_point(
+                point_indices[best])
+            if self.hooks is not None:
+                self.hooks.on_incumbent_improved(
+                    self.current_min_function_point)
+
+    def _pop_candidates(self, number, ftol, rtol=0.0):
+        candidates = []
+        current_min = self.current_min_function_point.value
+        threshold = current_min - (ftol + rtol * abs(current_min))
+        with self._timer.phase('heap'):
+            while len(candidates) < number:
+                # We peek first so that the last candidate checked stays
+                # in the heap, so we can re-start easily.
+                if self._peek_candidate(threshold) is None:
+                    break
+                candidate = self._heap.pop_min()
+                # Mark the simplex as taken, so that any other entry for
+                # it is stale, and it is not popped twice.
+                self._store.bounds[candidate.object] = np.nan
+                candidates.append(candidate)
+            self._drop_stale_top()
+        if self.hooks is not None and len(candidates) > 0:
+            self.hooks.on_pop(
+                [c.object for c in candidates], [c.value for c in candidates])
+        return candidates
+
+    def _push_back(self, candidates):
+        # Undo _pop_candidates, for candidates which were not branched on.
+        for candidate in candidates:
+            self._store.bounds[candidate.object] = candidate.value
+        with self._timer.phase('heap'):
+            self._heap.push_many(candidates)
+
+    def _peek_candidate(self, threshold):
+        """
+        The heap entry of the best live simplex, if its bound is at most
+        `threshold`, or None. Stale entries on top of the heap are
+        dropped, and lazy regions on top are split, on the way.
+        """
+        while len(self._heap) > 0:
+            candidate = self._heap.peek_min()
+            if self._is_stale(candidate):
+                self._heap.pop_min()
+            elif candidate.value > threshold:
+                return None
+            elif candidate.object < 0:
+                self._heap.pop_min()
+                self._split_region(candidate)
+            else:
+                return candidate
+        return None
+
+    def _on_branch(self, simplex_index, bound, child_indices):
+        self.hooks.on_branch(
+            simplex_index, bound, child_indices,
+            self._store.bounds[child_indices])
+
+    def _observe_initial_points(self):
+        # Each point is paired with the best and worst points, which is
+        # linear in the number of points, unlike every pair.
+        if self.lipschitz_estimator is None or self._store.num_points < 2:
+            return False
+        values = self._store.values
+        others = np.arange(self._store.num_points)
+        pairs = np.concatenate([
+            np.stack([others, np.full_like(others, end)], axis=1)
+            for end in [np.argmin(values), np.argmax(values)]])
+        return self.lipschitz_estimator.observe(
+            self._store.points[pairs], values[pairs])
+
+    def _observe(self, segments):
+        # segments are rows of store indices of points along lines.
+        if self.lipschitz_estimator is None:
+            return
+        segments = np.asarray(segments, dtype='int64')
+        changed = self.lipschitz_estimator.observe(
+            self._store.points[segments], self._store.values[segments])
+        if changed:
+            self.rebound_all()
+
+    def _drop_stale_top(self):
+        # Every operation which can leave a stale entry on top of the
+        # heap calls this, so that `lower_bound` can just peek.
+        while len(self._heap) > 0 and self._is_stale(self._heap.peek_min()):
+            self._heap.pop_min()
+
+    def _is_stale(self, entry):
+        # Entries go stale when their simplex is branched on outside of
+        # the heap, or re-bounded; the store keeps the current bound,
+        # which is NaN once a simplex has been removed. Lazy regions,
+        # whose entries have negative objects, are never re-bounded, but
+        # go stale when they are split outside of the heap.
+        if entry.object < 0:
+            return -1 - entry.object not in self._cover.prefixes
+        return not self._store.bounds[entry.object] == entry.value
+
+    def _split_region(self, entry):
+        prefix = self._cover.pop(-1 - entry.object)
+        self._push_regions(self._cover.children(prefix))
+
+    def _split_regions_containing(self, point):
+        cover = self._cover
+        corners = self._store.points[cover.corner_indices]
+        lower = corners.min(axis=0)
+        coordinates = (point - lower) / (corners.max(axis=0) - lower)
+        while True:
+            region_ids = [
+                region_id for region_id, prefix in cover.prefixes.items()
+                if cover.contains(prefix, coordinates)]
+            if len(region_ids) == 0:
+                break
+            for region_id in region_ids:
+                self._push_regions(cover.children(cover.pop(region_id)))
+        # The heap entries of the split regions are now stale.
+        with self._timer.phase('heap'):
+            self._drop_stale_top()
+
+    def _push_regions(self, prefixes):
+        simplices = [p for p in prefixes if self._cover.is_simplex(p)]
+        regions = [p for p in prefixes if not self._cover.is_simplex(p)]
+        if len(simplices) > 0:
+            rows = [self._cover.vertices(prefix) for prefix in simplices]
+            self._push_indices(self._store.add_simplices(rows).tolist())
+        if len(regions) > 0:
+            bounds = [self._bound_region(prefix) for prefix in regions]
+            self._push_region_entries(self._cover.add(regions), bounds)
+
+    def _push_region_entries(self, region_ids, bounds):
+        # Regions go in the heap alongside simplices, with objects
+        # -1, -2, ... so that they are told apart from store indices.
+        with self._timer.phase('heap'):
+            self._heap.push_many(
+                ObjectValuePair(-1 - region_id, bound)
+                for region_id, bound in zip(region_ids, bounds))
+
+    def _bound_region(self, prefix):
+        vertex_indices = self._cover.vertices(prefix)
+        with self._timer.phase('bounding'):
+            return self.simplex_bounder.bound_polytope(
+                self._store.points[vertex_indices],
+                self._store.values[vertex_indices],
+                self._store.is_local_minimum[vertex_indices])
+
+    def _remove_simplices(self, simplex_indices):
+        self._store.bounds[simplex_indices] = np.nan
+        self._incidence.remove(simplex_indices)
+        with self._timer.phase('heap'):
+            self._drop_stale_top()
+
+    def _push_indices(self, simplex_indices):
+        self._incidence.add(simplex_indices)
+        self._bound_and_push(simplex_indices)
+
+    def _bound_and_push(self, simplex_indices):
+        bounds = self._bound_indices(simplex_indices)
+        old_bounds = self._store.bounds[simplex_indices].tolist()
+        self._store.bounds[simplex_indices] = bounds
+        # A simplex whose bound is unchanged still has its live entry in
+        # the heap, which a new entry would duplicate.
+        with self._timer.phase('heap'):
+            self._heap.push_many(
+                ObjectValuePair(index, bound)
+                for index, bound, old_bound in zip(
+                    simplex_indices, bounds, old_bounds)
+                if not bound == old_bound)
+            self._drop_stale_top()
+
+    def _bound_indices(self, simplex_indices):
+        with self._timer.phase('bounding'):
+            return self.simplex_bounder.bound_many(
+                self._store.simplex_points(simplex_indices),
+                self._store.simplex_values(simplex_indices),
+                self._store.simplex_is_local_minimum(
+                    simplex_indices)).tolist()
+
+    def _setup_heap(self, simplex_indices):
+        simplex_indices = np.asarray(simplex_indices, dtype='int64')
+        bounds = self._store.bounds[simplex_indices]
+        missing = np.isnan(bounds)
+        if np.any(missing):
+            bounds[missing] = self._bound_indices(simplex_indices[missing])
+            self._store.bounds[simplex_indices] = bounds
+        bounds = bounds.tolist()
+        self._incidence.add(simplex_indices)
         heap_entries = [
-            ObjectValuePair(simplex, self.simplex_bounder.bound(simplex))
-            for simplex in simplices]
+            ObjectValuePair(index, bound)
+            for index, bound in zip(simplex_indices.tolist(), bounds)]
         heap = Heap.create_from_iterable(heap_entries)
         return heap
 
-    def _get_min_function_point(self, initial_simplices):
-        min_vertices = [s.vertex_with_min_value for s in initial_simplices]
-        min_values = [v.value for v in min_vertices]
-        index = np.argmin(min_values)
-        return min_vertices[index]
+    def _get_min_function_point(self, simplex_indices):
+        if len(simplex_indices) == 0:
+            # e.g. a lazy cover, whose store starts with only corners
+            vertex_indices = np.arange(self._store.num_points)
+        else:
+            vertex_indices = self._store.simplices[simplex_indices].ravel()
+        index = vertex_indices[np.argmin(self._store.values[vertex_indices])]
+        return self._store.function_point(index)
+
+
+def _stop_requested(callback, intermediate_result):
+    try:
+        return bool(callback(intermediate_result))
+    except StopIteration:
+        return True
+
+
+def _along_edge(plan, new_point_indices):
+    # The store indices of the points along the split edge, in order.
+    vertex_indices, _, i, j, _ = plan
+    return (
+        [vertex_indices[i]] + list(new_point_indices) + [vertex_indices[j]])
+
+
+def _child_summary(store, summary, row, i, j):
+    # A child of a split differs from its parent only in vertices i and
+    # j, so only their edges are measured, and only their values are
+    # compared with the parent's extremes.
+    points = store.points[row]
+    values = store.values[row]
+    edge_lengths = summary.edge_lengths.copy()
+    for slot in (i, j):
+        lengths = np.sqrt(((points - points[slot])**2).sum(axis=1))
+        edge_lengths[slot, :] = lengths
+        edge_lengths[:, slot] = lengths
+    return SimplexSummary(
+        _child_extreme_index(
+            summary.index_of_max_value, values, i, j, np.argmax),
+        _child_extreme_index(
+            summary.index_of_min_value, values, i, j, np.argmin),
+        edge_lengths)
+
+
+def _child_extreme_index(parent_index, values, i, j, arg_extreme):
+    if parent_index in (i, j):
+        # The parent's extreme vertex may be gone.
+        return int(arg_extreme(values))
+    # Ties go to the first vertex, as with arg_extreme(values): any
+    # other vertex which ties with the parent's is after it.
+    slots = sorted((parent_index, i, j))
+    return slots[int(arg_extreme(values[slots]))]
+
+
+class _BudgetExhausted(Exception):
+    pass
+
+
+class _BudgetedFunction(object):
+    """Counts evaluations, keeps the best one, and raises
+    _BudgetExhausted when asked for more than `max_evaluations`."""
+
+    def __init__(self, function, max_evaluations=None):
+        self.function = function
+        self.max_evaluations = max_evaluations
+        self.nfev = 0
+        self.best = None
+
+    def __call__(self, point):
+        if (self.max_evaluations is not None and
+                self.nfev >= self.max_evaluations):
+            raise _BudgetExhausted
+        point = np.array(point, dtype='float')
+        value = self.function(point)
+        self.nfev += 1
+        if self.best is None or value < self.best.value:
+            self.best = FunctionPoint(point, value)
+        return value
+
+
+class AsyncBranchBoundOptimizer(BranchBoundOptimizer):
+    """
+    A BranchBoundOptimizer for objectives which are coroutine functions,
+    e.g. `async def objective_function(point)`.
+
+    optimize_async keeps several midpoint evaluations in flight at once,
+    and pushes each candidate's children into the heap as soon as its
+    evaluation completes, so that many optimizations can share one
+    event loop without threads.
+    """
+
+    def __init__(self, objective_function, initial_simplices, simplex_bounder,
+                 max_in_flight=8, branching_strategy=None,
+                 lipschitz_estimator=None, hooks=None):
+        """
+        Parameters
+        ----------
+        objective_function : coroutine function
+            `await objective_function(point)` -> float
+        initial_simplices : list-like of Simplex objects
+        simplex_bounder : SimplexBoundCalculator
+        max_in_flight : int, optional
+            The default number of candidates to keep running at once.
+        branching_strategy : BranchingStrategy or None, optional
+        lipschitz_estimator : AdaptiveLipschitzPointBoundCalculator, optional
+        hooks : OptimizerHooks or None, optional
+        """
+        super(AsyncBranchBoundOptimizer, self).__init__(
+            objective_function, initial_simplices, simplex_bounder,
+            branching_strategy=branching_strategy,
+            lipschitz_estimator=lipschitz_estimator,
+            hooks=hooks)
+        self.max_in_flight = max_in_flight
+
+    async def optimize_async(self, max_function_evaluations=1000, ftol=1e-5,
+                             max_in_flight=None, rtol=0.0):
+        """
+        Parameters
+        ----------
+        max_function_evaluations : int, optional
+        ftol : float, optional
+            Stop once no simplex can contain a point more than `ftol`
+            below the current minimum, and no evaluations are in flight.
+        max_in_flight : int or None, optional
+            Defaults to `self.max_in_flight`.
+        rtol : float, optional
+            A relative tolerance, added to `ftol`; see `optimize`.
+
+        Returns
+        -------
+        scipy.optimize.OptimizeResult
+            As for `optimize`, where `nit` is the number of candidates
+            branched on, and 'evaluation' is the time spent waiting for
+            evaluations in flight.
+        """
+        if max_in_flight is None:
+            max_in_flight = self.max_in_flight
+        self._timer = PhaseTimer()
+        in_flight = self._in_flight = dict()
+        nfev = 0
+        nit = 0
+        try:
+            while True:
+                converged = False
+                while (len(in_flight) < max_in_flight and
+                       nfev + self._points_per_split <=
+                       max_function_evaluations):
+                    candidates = self._pop_candidates(1, ftol, rtol)
+                    if len(candidates) == 0:
+                        converged = True
+                        break
+                    task = asyncio.ensure_future(
+                        self._process_candidate_async(candidates[0]))
+                    in_flight[task] = candidates[0]
+                    nfev += self._points_per_split
+                if len(in_flight) == 0:
+                    break
+                with self._timer.phase('evaluation'):
+                    done, _ = await asyncio.wait(
+                        in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        del in_flight[task]
+                        nit += 1
+                for task in done:
+                    task.result()
+        finally:
+            # On an error or cancellation, put back the candidates that
+            # were not finished, so we can re-start easily.
+            for task in in_flight:
+                task.cancel()
+            self._push_back(list(in_flight.values()))
+            self._in_flight = dict()
+        result = self._make_result(0 if converged else 1, nfev, nit, 0)
+        if self.hooks is not None:
+            self.hooks.on_terminate(result)
+        return result
 
+    async def _process_candidate_async(self, candidate):
+        plan = self._plan_split(candidate.object)
+        new_points = plan[-1]
+        values = await asyncio.gather(
+            *[self.objective_function(point) for point in new_points])
+        point_indices = self._add_evaluated_points(new_points, values)
+        new_indices = self._apply_split(plan, point_indices)
+        self._remove_simplices([candidate.object])
+        self._push_indices(new_indices)
+        if self.hooks is not None:
+            self._on_branch(candidate.object, candidate.value, new_indices)
+        self._observe([_along_edge(plan, point_indices)])
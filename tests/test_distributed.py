@@ -0,0 +1,164 @@
+import unittest
+import multiprocessing
+
+import numpy as np
+from scipy.optimize import OptimizeResult
+
+from globaloptimize.distributed import (
+    optimize_distributed,
+    _SharedState,
+    _Worker,
+    _worker_arrays,
+    )
+from globaloptimize.optimize import BranchBoundOptimizer
+from globaloptimize.util.util import ObjectValuePair
+from globaloptimize.geometry.store import SimplexStore
+from globaloptimize.geometry.triangulate import (
+    triangulate_function_on_hyperrectangle_into_store)
+from globaloptimize.bound.bound import (
+    MaxPointSimplexBoundCalculator,
+    OrdinaryPointBoundCalculator,
+    )
+from globaloptimize.local.local import ScipyLocalMinimizer
+
+
+class TestOptimizeDistributed(unittest.TestCase):
+    def test_certifies_global_minimum(self):
+        result = optimize_distributed(
+            shifted_square_norm, [(-1, 2)] * 3, make_bounder(),
+            num_workers=2, ftol=1e-3, max_function_evaluations=20000)
+        self.assertIsInstance(result, OptimizeResult)
+        self.assertTrue(result.success)
+        self.assertEqual(result.status, 0)
+        self.assertLess(result.fun, 1e-3)
+        self.assertTrue(np.allclose(result.x, 0.3, atol=0.05))
+        self.assertLessEqual(result.lower_bound, result.fun)
+        self.assertLessEqual(result.gap, 1e-3)
+
+    def test_certifies_with_workers_which_start_idle(self):
+        # The square has only 2 simplices to deal out to 4 workers.
+        result = optimize_distributed(
+            shifted_square_norm, [(-1, 2)] * 2, make_bounder(),
+            num_workers=4, ftol=1e-4, max_function_evaluations=20000)
+        self.assertTrue(result.success)
+        self.assertLess(result.fun, 1e-4)
+
+    def test_agrees_with_one_worker(self):
+        results = [
+            optimize_distributed(
+                shifted_square_norm, [(-1, 2)] * 2, make_bounder(),
+                num_workers=num_workers, ftol=1e-3,
+                max_function_evaluations=20000)
+            for num_workers in [1, 3]]
+        for result in results:
+            self.assertTrue(result.success)
+        self.assertAlmostEqual(results[0].fun, results[1].fun, places=3)
+        self.assertEqual(results[0].nsteal, 0)
+
+    def test_stops_at_shared_budget(self):
+        result = optimize_distributed(
+            shifted_square_norm, [(-1, 2)] * 3, make_bounder(),
+            num_workers=3, ftol=0, max_function_evaluations=50)
+        self.assertFalse(result.success)
+        self.assertEqual(result.status, 1)
+        self.assertLessEqual(result.nfev, 50)
+        self.assertGreater(result.nfev, 40)
+        self.assertGreater(result.gap, 0)
+        self.assertGreater(result.heap_size, 0)
+
+    def test_sums_worker_timings(self):
+        result = optimize_distributed(
+            shifted_square_norm, [(-1, 2)] * 2, make_bounder(),
+            num_workers=2, max_function_evaluations=20)
+        self.assertIn('evaluation', result.timings)
+        self.assertGreaterEqual(result.timings['total'], 0)
+
+    def test_raises_worker_errors(self):
+        self.assertRaises(
+            RuntimeError,
+            optimize_distributed, fails_inside, [(0, 1)] * 2,
+            make_bounder(), num_workers=2)
+
+    def test_raises_error_on_bad_arguments(self):
+        bad_kwargs = [
+            {'num_workers': 0},
+            {'steal_size': 0},
+            {'local_minimizer': ScipyLocalMinimizer()},
+            ]
+        for kwargs in bad_kwargs:
+            self.assertRaises(
+                ValueError,
+                optimize_distributed, shifted_square_norm, [(-1, 2)] * 2,
+                make_bounder(), **kwargs)
+
+
+class TestWorker(unittest.TestCase):
+    def test_idle_worker_takes_work_given_away(self):
+        store = triangulate_function_on_hyperrectangle_into_store(
+            shifted_square_norm, [(-1, 2)] * 2)
+        shared = _SharedState(
+            multiprocessing.get_context(), 2, 1000,
+            store.points[0], store.values[0])
+        busy, idle = [
+            make_worker(store, simplex_indices, shared)
+            for simplex_indices in [np.arange(store.num_simplices), []]]
+        busy.optimizer.optimize(ftol=0, max_function_evaluations=20)
+        # Duplicate entries, which must not be both kept and given away:
+        heap = busy.optimizer._heap
+        heap.push_many([ObjectValuePair(e.object, e.value) for e in heap])
+        num_live = len(live_simplices(busy))
+
+        busy._give_away_work()
+        self.assertTrue(idle._wait_for_work())
+        kept = live_simplices(busy)
+        given = live_simplices(idle)
+        self.assertGreater(len(given), 0)
+        self.assertEqual(len(kept) + len(given), num_live)
+        self.assertEqual(kept & given, set())
+        # Both workers have some of the best simplices:
+        self.assertEqual(
+            busy.optimizer.lower_bound, idle.optimizer.lower_bound)
+        self.assertEqual(shared.num_steals.value, 1)
+        self.assertEqual(shared.num_outstanding.value, 0)
+
+
+def make_worker(store, simplex_indices, shared):
+    points, values, is_local_minimum, simplices = _worker_arrays(
+        store, np.asarray(simplex_indices, dtype='int'))
+    optimizer = BranchBoundOptimizer(
+        shifted_square_norm,
+        SimplexStore.from_arrays(points, values, simplices, is_local_minimum),
+        make_bounder())
+    return _Worker(
+        optimizer, shared, ftol=0, rtol=0, batch_size=1, steal_size=4)
+
+
+def live_simplices(worker):
+    # As sets of vertices, which are the same in every worker's store.
+    store = worker.optimizer._store
+    live = np.flatnonzero(~np.isnan(store.bounds))
+    return set(
+        frozenset(map(tuple, store.simplex_points(index).tolist()))
+        for index in live)
+
+
+def make_bounder():
+    return MaxPointSimplexBoundCalculator(
+        OrdinaryPointBoundCalculator(np.inf, 2.0))
+
+
+def shifted_square_norm(x):
+    # Off the midpoints of the edges, so the minimum is not found early.
+    return np.sum((x - 0.3)**2)
+
+
+def fails_inside(x):
+    # Fine at the corners of the unit square, which the calling
+    # process evaluates, but not in the workers.
+    if np.any((x > 0) & (x < 1)):
+        raise ValueError
+    return 0.0
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,169 @@
+import unittest
+
+import numpy as np
+from scipy.optimize import Bounds, OptimizeResult
+
+from globaloptimize.minimize import minimize_branch_bound
+from globaloptimize.local.local import ScipyLocalMinimizer
+from globaloptimize.benchmarks import functions
+
+
+class TestMinimizeBranchBound(unittest.TestCase):
+    def test_finds_global_minimum(self):
+        result = minimize_branch_bound(
+            shifted_square_norm, [(-1, 2)] * 2, gradient_lipschitz=2.0,
+            ftol=1e-3, maxfev=2000)
+        self.assertIsInstance(result, OptimizeResult)
+        self.assertTrue(result.success)
+        self.assertLess(result.fun, 1e-3)
+        self.assertTrue(np.allclose(result.x, 0.5, atol=0.05))
+
+    def test_nfev_includes_corners(self):
+        counter = FunctionCallCounter(shifted_square_norm)
+        result = minimize_branch_bound(
+            counter, [(-1, 2)] * 3, gradient_lipschitz=2.0, maxfev=20)
+        self.assertEqual(result.nfev, counter.counter)
+        self.assertEqual(result.nfev, 20)
+        self.assertFalse(result.success)
+
+    def test_passes_args(self):
+        result = minimize_branch_bound(
+            shifted_square_norm, [(-1, 2)] * 2, args=(1.5,),
+            gradient_lipschitz=2.0, ftol=1e-3, maxfev=2000)
+        self.assertTrue(np.allclose(result.x, 1.5, atol=0.05))
+
+    def test_accepts_scipy_bounds(self):
+        from_sequence = minimize_branch_bound(
+            shifted_square_norm, [(-1, 2)] * 2, gradient_lipschitz=2.0,
+            maxfev=50)
+        from_bounds = minimize_branch_bound(
+            shifted_square_norm, Bounds([-1, -1], [2, 2]),
+            gradient_lipschitz=2.0, maxfev=50)
+        self.assertTrue(np.all(from_sequence.x == from_bounds.x))
+
+    def test_vectorized_takes_points_as_columns(self):
+        shapes = []
+
+        def vectorized(x, center=0.5):
+            shapes.append(x.shape)
+            return np.sum((x - center)**2, axis=0)
+
+        result = minimize_branch_bound(
+            vectorized, [(-1, 2)] * 2, gradient_lipschitz=2.0,
+            vectorized=True, ftol=1e-3, maxfev=2000)
+        self.assertLess(result.fun, 1e-3)
+        self.assertEqual(shapes[0], (2, 4))
+        self.assertTrue(all(shape[0] == 2 for shape in shapes))
+        self.assertGreater(max(shape[1] for shape in shapes), 1)
+
+    def test_workers_map_like_callable(self):
+        calls = []
+
+        def workers(function, iterable):
+            points = list(iterable)
+            calls.append(len(points))
+            return map(function, points)
+
+        result = minimize_branch_bound(
+            shifted_square_norm, [(-1, 2)] * 2, gradient_lipschitz=2.0,
+            workers=workers, batch_size=4, ftol=1e-3, maxfev=2000)
+        self.assertLess(result.fun, 1e-3)
+        self.assertEqual(calls[0], 4)
+        self.assertGreater(max(calls[1:]), 1)
+
+    def test_workers_int_uses_process_pool(self):
+        serial = minimize_branch_bound(
+            shifted_square_norm, [(-1, 2)] * 2, gradient_lipschitz=2.0,
+            batch_size=2, maxfev=100)
+        parallel = minimize_branch_bound(
+            shifted_square_norm, [(-1, 2)] * 2, gradient_lipschitz=2.0,
+            workers=2, maxfev=100)
+        self.assertEqual(parallel.nfev, serial.nfev)
+        self.assertEqual(parallel.fun, serial.fun)
+
+    def test_callback_receives_intermediate_results(self):
+        results = []
+        result = minimize_branch_bound(
+            shifted_square_norm, [(-1, 2)] * 2, args=(0.3,),
+            gradient_lipschitz=2.0, callback=results.append, ftol=0,
+            maxfev=30)
+        self.assertEqual(len(results), 30 - 4)
+        # Counting the 4 corners, as the result does:
+        self.assertEqual([r.nfev for r in results], list(range(5, 31)))
+        self.assertEqual(results[-1].nfev, result.nfev)
+        values = [r.fun for r in results]
+        self.assertEqual(values, sorted(values, reverse=True))
+
+    def test_callback_can_stop(self):
+        for stop in [lambda result: result.nit >= 5, raise_stop_iteration]:
+            result = minimize_branch_bound(
+                shifted_square_norm, [(-1, 2)] * 2, gradient_lipschitz=2.0,
+                callback=stop, maxfev=100)
+            self.assertEqual(result.status, 2)
+            self.assertFalse(result.success)
+            self.assertLess(result.nfev, 100)
+
+    def test_passes_optimizer_kwargs(self):
+        result = minimize_branch_bound(
+            shifted_square_norm, [(-1, 2)] * 2, gradient_lipschitz=2.0,
+            local_minimizer=ScipyLocalMinimizer(), maxfev=100)
+        self.assertEqual(result.nlocal, 1)
+        self.assertLess(result.fun, 1e-10)
+
+    def test_radius_bounders_certify_minimum(self):
+        branin = functions.make_branin()
+        for bounder in ['circumsphere', 'centroid']:
+            result = minimize_branch_bound(
+                branin.function, branin.bounds,
+                lipschitz=branin.f_lipshitz_constant,
+                gradient_lipschitz=branin.df1_dx1_lipshitz_constant,
+                bounder=bounder, ftol=1e-2, maxfev=3000)
+            self.assertTrue(result.success)
+            self.assertLessEqual(result.gap, 1e-2)
+
+    def test_raises_error_without_finite_lipschitz_constant(self):
+        self.assertRaises(
+            ValueError,
+            minimize_branch_bound, shifted_square_norm, [(-1, 2)] * 2)
+
+    def test_raises_error_if_maxfev_less_than_corners(self):
+        self.assertRaises(
+            ValueError,
+            minimize_branch_bound, shifted_square_norm, [(-1, 2)] * 3,
+            gradient_lipschitz=2.0, maxfev=7)
+
+    def test_raises_error_on_invalid_bounds(self):
+        for bounds in [[(2, 1)], [(0, np.inf)], [0, 1], []]:
+            self.assertRaises(
+                ValueError,
+                minimize_branch_bound, shifted_square_norm, bounds,
+                gradient_lipschitz=2.0)
+
+    def test_raises_error_on_unknown_bounder(self):
+        self.assertRaises(
+            ValueError,
+            minimize_branch_bound, shifted_square_norm, [(-1, 2)] * 2,
+            gradient_lipschitz=2.0, bounder='nope')
+
+
+class FunctionCallCounter(object):
+    def __init__(self, function):
+        self.function = function
+        self.counter = 0
+
+    def __call__(self, *args, **kwargs):
+        self.counter += 1
+        return self.function(*args, **kwargs)
+
+
+def shifted_square_norm(x, center=0.5):
+    return np.sum((x - center)**2)
+
+
+def raise_stop_iteration(intermediate_result):
+    if intermediate_result.nit >= 5:
+        raise StopIteration
+
+
+if __name__ == '__main__':
+    unittest.main()
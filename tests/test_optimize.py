@@ -1,15 +1,31 @@
+import os
+import asyncio
+import tempfile
+import threading
 import warnings
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 
 import numpy as np
+from scipy.optimize import OptimizeResult
 
-from globaloptimize.optimize import BranchBoundOptimizer
+from globaloptimize.optimize import (
+    BranchBoundOptimizer,
+    AsyncBranchBoundOptimizer,
+    )
 from globaloptimize.util.heap import Heap
-from globaloptimize.geometry.simplex import Simplex, FunctionPoint
+from globaloptimize.util.util import ObjectValuePair
+from globaloptimize.geometry.simplex import Simplex, FunctionPoint, summarize
 from globaloptimize.bound.bound import (
     MaxPointSimplexBoundCalculator,
     OrdinaryPointBoundCalculator,
+    LocalMinimumSimplexBoundCalculator,
+    LocalMinimumPointBoundCalculator,
+    AdaptiveLipschitzPointBoundCalculator,
     )
+from globaloptimize.local.local import LocalMinimizer, ScipyLocalMinimizer
+from globaloptimize.util.hooks import OptimizerHooks, EventLog, EVENT_CODES
+from globaloptimize.branch import branch
 from globaloptimize.geometry.tests.test_simplex import make_simplex
 
 
@@ -52,15 +68,34 @@ class TestBranchBoundOptimizerBasicMethods(unittest.TestCase):
             initial_simplices,
             simplex_bound_calculator)
 
-        heap = optimizer._setup_heap(initial_simplices)
+        simplex_indices = np.arange(len(initial_simplices))
+        heap = optimizer._setup_heap(simplex_indices)
         self.assertEqual(len(initial_simplices), heap.num_in_heap)
 
         heap_entries = []
         while len(heap) > 0:
             heap_entries.append(heap.pop_min())
-        simplices_in_heap = [entry.object for entry in heap_entries]
+        simplices_in_heap = [
+            optimizer._store.simplex(entry.object).function_points
+            for entry in heap_entries]
         for simplex in initial_simplices:
-            self.assertIn(simplex, simplices_in_heap)
+            self.assertIn(simplex.function_points, simplices_in_heap)
+
+    def test_setup_heap_uses_local_minimum_flags(self):
+        np.random.seed(1031)
+        simplex = make_simplex()
+        function_points = list(simplex.function_points)
+        index = simplex.index_of_min_value
+        function_points[index] = FunctionPoint(
+            function_points[index].point, function_points[index].value, True)
+        bounder = LocalMinimumSimplexBoundCalculator(
+            make_simplex_bound_calculator(),
+            LocalMinimumPointBoundCalculator(2, 1e-3))
+        optimizer = BranchBoundOptimizer(
+            square_distance_from_center, [Simplex(function_points)], bounder)
+        flagged_bound = bounder.bound(Simplex(function_points))
+        self.assertGreater(flagged_bound, bounder.bound(simplex))
+        self.assertEqual(optimizer._heap.peek_min().value, flagged_bound)
 
     def test_init_sets_up_heap(self):
         np.random.seed(1024)
@@ -169,6 +204,870 @@ class TestBranchBoundOptimizerBasicMethods(unittest.TestCase):
         self.assertEqual(len(optimizer._heap), size_before_branching + 1)
 
 
+class TestBranchBoundOptimizerIncidence(unittest.TestCase):
+    def test_simplices_containing_tracks_branching(self):
+        np.random.seed(1501)
+        optimizer = make_realistic_optimizer_with_function_call_counter(3)
+        optimizer.optimize(ftol=0, max_function_evaluations=10)
+
+        live = [
+            entry.object for entry in optimizer._heap._entries
+            if not optimizer._is_stale(entry)]
+        store = optimizer._store
+        for vertex in range(store.num_points):
+            correct = [i for i in live if vertex in store.simplices[i]]
+            found = optimizer.simplices_containing(vertex)
+            self.assertEqual(sorted(found.tolist()), sorted(correct))
+
+    def test_refine_around_vertex_branches_each_simplex(self):
+        np.random.seed(1505)
+        optimizer = make_realistic_optimizer_with_function_call_counter(3)
+        optimizer.optimize(ftol=0, max_function_evaluations=10)
+        vertex = optimizer._store.find_point(
+            optimizer.current_min_function_point.point)
+        degree = len(optimizer.simplices_containing(vertex))
+        counter_before = optimizer.objective_function.counter
+
+        number = optimizer.refine_around_vertex(vertex)
+        self.assertEqual(number, degree)
+        self.assertEqual(
+            optimizer.objective_function.counter, counter_before + degree)
+
+    def test_rebound_around_vertex_makes_old_entries_stale(self):
+        np.random.seed(1509)
+        optimizer = make_realistic_optimizer_with_function_call_counter(3)
+        vertex = 0
+        simplices = optimizer.simplices_containing(vertex)
+        old_entries = [
+            e for e in optimizer._heap._entries if e.object in simplices]
+        optimizer.simplex_bounder = make_simplex_bound_calculator(1, 1)
+
+        optimizer.rebound_around_vertex(vertex)
+        for entry in old_entries:
+            self.assertTrue(optimizer._is_stale(entry))
+
+    def test_rebound_around_vertex_keeps_one_entry_per_simplex(self):
+        np.random.seed(1511)
+        optimizer = make_realistic_optimizer_with_function_call_counter(2)
+        optimizer.optimize(ftol=0, max_function_evaluations=10)
+        for vertex in range(optimizer._store.num_points):
+            optimizer.rebound_around_vertex(vertex)
+        objects = [e.object for e in optimizer._heap]
+        self.assertEqual(len(objects), len(set(objects)))
+
+    def test_optimize_skips_stale_entries(self):
+        np.random.seed(1513)
+        optimizer = make_realistic_optimizer_with_function_call_counter(2)
+        optimizer.refine_around_vertex(0)
+        result = optimizer.optimize(ftol=0.01, max_function_evaluations=300)
+        self.assertLessEqual(result.fun, 0.01)
+
+
+class TestBranchBoundOptimizerPrune(unittest.TestCase):
+    def test_prune_drops_dominated_simplices(self):
+        np.random.seed(1701)
+        optimizer = make_realistic_optimizer_with_function_call_counter(3)
+        optimizer.optimize(ftol=0, max_function_evaluations=50)
+        ftol = 0.1
+        threshold = optimizer.current_min_function_point.value - ftol
+        dominated = [e for e in optimizer._heap if e.value > threshold]
+        assert len(dominated) > 0
+
+        number_pruned = optimizer.prune(ftol)
+        self.assertEqual(number_pruned, len(dominated))
+        self.assertEqual(optimizer.num_pruned, len(dominated))
+        for entry in optimizer._heap:
+            self.assertLessEqual(entry.value, threshold)
+
+    def test_prune_compacts_store(self):
+        np.random.seed(1705)
+        optimizer = make_realistic_optimizer_with_function_call_counter(3)
+        optimizer.optimize(ftol=0, max_function_evaluations=50)
+        optimizer.prune(0.1)
+        self.assertEqual(optimizer._store.num_simplices, len(optimizer._heap))
+        used = np.unique(optimizer._store.simplices)
+        self.assertEqual(used.size, optimizer._store.num_points)
+
+    def test_prune_gives_duplicate_entries_one_row(self):
+        np.random.seed(1707)
+        optimizer = make_realistic_optimizer_with_function_call_counter(3)
+        optimizer.optimize(ftol=0, max_function_evaluations=50)
+        optimizer._heap.push_many([
+            ObjectValuePair(e.object, e.value) for e in optimizer._heap])
+        optimizer.prune(0.1)
+        store = optimizer._store
+        self.assertEqual(store.num_simplices, len(optimizer._heap))
+        rows = np.unique(np.sort(store.simplices, axis=1), axis=0)
+        self.assertEqual(len(rows), store.num_simplices)
+
+    def test_prune_keeps_summaries_of_kept_simplices(self):
+        np.random.seed(1711)
+        optimizer = make_realistic_optimizer_with_function_call_counter(3)
+        optimizer.optimize(ftol=0, max_function_evaluations=50)
+        store = optimizer._store
+        before = {
+            id(e): store.simplex_summary(e.object)
+            for e in optimizer._heap}
+        optimizer.prune(0.1)
+        for entry in optimizer._heap:
+            summary = store.simplex_summary(entry.object)
+            self.assertEqual(summary[:2], before[id(entry)][:2])
+            self.assertTrue(np.all(
+                summary.edge_lengths == before[id(entry)].edge_lengths))
+
+    def test_prune_keeps_bounds_and_vertices_of_kept_simplices(self):
+        np.random.seed(1709)
+        optimizer = make_realistic_optimizer_with_function_call_counter(3)
+        optimizer.optimize(ftol=0, max_function_evaluations=50)
+        store = optimizer._store
+        before = {
+            id(e): store.simplex_points(e.object).tolist()
+            for e in optimizer._heap}
+        optimizer.prune(0.1)
+        for entry in optimizer._heap:
+            self.assertEqual(
+                store.simplex_points(entry.object).tolist(),
+                before[id(entry)])
+            self.assertEqual(store.bounds[entry.object], entry.value)
+
+    def test_optimize_with_prune_gives_same_result(self):
+        results = []
+        heap_sizes = []
+        for prune in [False, True]:
+            np.random.seed(1713)
+            optimizer = make_realistic_optimizer_with_function_call_counter(2)
+            results.append(optimizer.optimize(
+                ftol=0.01, max_function_evaluations=300, prune=prune))
+            heap_sizes.append(len(optimizer._heap))
+        self.assertEqual(results[0].fun, results[1].fun)
+        self.assertTrue(np.all(results[0].x == results[1].x))
+        self.assertLess(heap_sizes[1], heap_sizes[0])
+
+
+class TestBranchBoundOptimizerSaveLoad(unittest.TestCase):
+    def test_load_restores_heap_without_rebounding(self):
+        np.random.seed(1601)
+        optimizer = make_realistic_optimizer_with_function_call_counter(3)
+        optimizer.optimize(ftol=0, max_function_evaluations=20)
+        with tempfile.TemporaryDirectory() as directory:
+            optimizer.save(directory)
+            bounder = BoundCallCounter(optimizer.simplex_bounder)
+            loaded = BranchBoundOptimizer.load(
+                directory, optimizer.objective_function, bounder)
+            self.assertEqual(bounder.counter, 0)
+            self.assertEqual(
+                sorted(e.value for e in loaded._heap._entries),
+                sorted(e.value for e in optimizer._heap._entries))
+
+    def test_load_restores_current_min_function_point(self):
+        np.random.seed(1605)
+        optimizer = make_realistic_optimizer_with_function_call_counter(3)
+        optimizer.optimize(ftol=0, max_function_evaluations=20)
+        with tempfile.TemporaryDirectory() as directory:
+            optimizer.save(directory)
+            loaded = BranchBoundOptimizer.load(
+                directory,
+                optimizer.objective_function,
+                optimizer.simplex_bounder)
+        self.assertEqual(
+            loaded.current_min_function_point,
+            optimizer.current_min_function_point)
+
+    def test_save_over_loaded_checkpoint(self):
+        np.random.seed(1607)
+        optimizer = make_realistic_optimizer_with_function_call_counter(3)
+        optimizer.optimize(ftol=0, max_function_evaluations=20)
+        with tempfile.TemporaryDirectory() as directory:
+            optimizer.save(directory)
+            loaded = BranchBoundOptimizer.load(
+                directory,
+                optimizer.objective_function,
+                optimizer.simplex_bounder)
+            names = ['points', 'values', 'simplices', 'bounds']
+            saved = {
+                name: np.array(getattr(loaded._store, name))
+                for name in names}
+            loaded.save(directory)
+            reloaded = BranchBoundOptimizer.load(
+                directory,
+                optimizer.objective_function,
+                optimizer.simplex_bounder)
+            for name in names:
+                self.assertTrue(np.all(
+                    getattr(reloaded._store, name) == saved[name]))
+            self.assertEqual(
+                reloaded.current_min_function_point,
+                optimizer.current_min_function_point)
+
+    def test_save_eager_over_lazy_checkpoint(self):
+        lazy = make_hyperrectangle_optimizer(dimension=3, lazy=True)
+        lazy.optimize(ftol=0, max_function_evaluations=5)
+        eager = make_hyperrectangle_optimizer(dimension=3)
+        eager.optimize(ftol=0, max_function_evaluations=10)
+        with tempfile.TemporaryDirectory() as directory:
+            lazy.save(directory)
+            eager.save(directory)
+            loaded = BranchBoundOptimizer.load(
+                directory, eager.objective_function, eager.simplex_bounder)
+        self.assertIsNone(loaded._cover)
+        self.assertEqual(len(loaded._heap), len(eager._heap))
+
+    def test_loaded_optimizer_continues_like_original(self):
+        np.random.seed(1609)
+        optimizer = make_realistic_optimizer_with_function_call_counter(2)
+        optimizer.optimize(ftol=0, max_function_evaluations=20)
+        with tempfile.TemporaryDirectory() as directory:
+            optimizer.save(directory)
+            loaded = BranchBoundOptimizer.load(
+                directory,
+                optimizer.objective_function,
+                optimizer.simplex_bounder)
+            result_loaded = loaded.optimize(
+                ftol=0, max_function_evaluations=30)
+        result_original = optimizer.optimize(
+            ftol=0, max_function_evaluations=30)
+        self.assertEqual(result_loaded.fun, result_original.fun)
+
+    def test_load_does_not_modify_saved_files(self):
+        np.random.seed(1613)
+        optimizer = make_realistic_optimizer_with_function_call_counter(2)
+        optimizer.optimize(ftol=0, max_function_evaluations=5)
+        with tempfile.TemporaryDirectory() as directory:
+            optimizer.save(directory)
+            bounds_path = os.path.join(directory, 'bounds.npy')
+            saved_bounds = np.load(bounds_path)
+            loaded = BranchBoundOptimizer.load(
+                directory,
+                optimizer.objective_function,
+                optimizer.simplex_bounder)
+            loaded.optimize(ftol=0, max_function_evaluations=1)
+            self.assertTrue(np.all(np.load(bounds_path) == saved_bounds))
+
+
+class TestBranchBoundOptimizerLocalSearch(unittest.TestCase):
+    def test_local_search_finds_and_flags_local_minimum(self):
+        np.random.seed(1701)
+        optimizer = make_realistic_optimizer_with_function_call_counter(3)
+        optimizer.local_minimizer = ScipyLocalMinimizer()
+        nfev = optimizer.local_search()
+        self.assertEqual(nfev, optimizer.objective_function.counter)
+        current_min = optimizer.current_min_function_point
+        self.assertLess(current_min.value, 1e-10)
+        self.assertTrue(current_min.is_local_minimum)
+
+    def test_local_search_splits_simplex_containing_result(self):
+        np.random.seed(1705)
+        dimension = 3
+        optimizer = make_realistic_optimizer_with_function_call_counter(
+            dimension)
+        optimizer.local_minimizer = ScipyLocalMinimizer()
+        optimizer.local_search()
+        vertex_index = optimizer._store.num_points - 1
+        containing = optimizer.simplices_containing(vertex_index)
+        self.assertEqual(containing.size, dimension + 1)
+        self.assertTrue(np.isnan(optimizer._store.bounds[0]))
+
+    def test_local_search_respects_max_function_evaluations(self):
+        np.random.seed(1709)
+        optimizer = make_realistic_optimizer_with_function_call_counter(3)
+        optimizer.local_minimizer = ScipyLocalMinimizer()
+        nfev = optimizer.local_search(max_function_evaluations=5)
+        self.assertEqual(nfev, 5)
+        self.assertEqual(optimizer.objective_function.counter, 5)
+
+    def test_local_search_does_not_flag_minimum_on_boundary(self):
+        points = np.array([[1, 1], [3, 1], [1, 3]], dtype='float')
+        function_points = [
+            FunctionPoint(p, square_distance_from_center(p)) for p in points]
+        optimizer = BranchBoundOptimizer(
+            square_distance_from_center,
+            [Simplex(function_points)],
+            make_simplex_bound_calculator(),
+            local_minimizer=ScipyLocalMinimizer())
+        optimizer.local_search()
+        self.assertFalse(np.any(optimizer._store.is_local_minimum))
+
+    def test_local_search_skips_known_local_minima(self):
+        np.random.seed(1713)
+        optimizer = make_realistic_optimizer_with_function_call_counter(3)
+        optimizer.local_minimizer = ScipyLocalMinimizer()
+        optimizer._store.is_local_minimum[:] = True
+        self.assertEqual(optimizer.local_search(), 0)
+        self.assertEqual(optimizer.num_local_searches, 0)
+
+    def test_optimize_with_local_searches_converges_faster(self):
+        nfevs = []
+        for local_minimizer in [None, ScipyLocalMinimizer()]:
+            np.random.seed(1717)
+            optimizer = make_realistic_optimizer_with_function_call_counter(2)
+            optimizer.local_minimizer = local_minimizer
+            optimizer.optimize(ftol=1e-3, max_function_evaluations=2000)
+            nfevs.append(optimizer.objective_function.counter)
+        self.assertLess(nfevs[1], nfevs[0])
+
+    def test_optimize_does_not_call_more_than_maxiter_fevs(self):
+        np.random.seed(1721)
+        maxfev = 30
+        optimizer = make_realistic_optimizer_with_function_call_counter(3)
+        optimizer.local_minimizer = ScipyLocalMinimizer()
+        optimizer.local_search_interval = 10
+        optimizer.optimize(ftol=0, max_function_evaluations=maxfev)
+        self.assertEqual(optimizer.objective_function.counter, maxfev)
+
+    def test_lazy_local_search_result_in_unsplit_region(self):
+        optimizer = make_hyperrectangle_optimizer(dimension=3, lazy=True)
+        point = np.array([0.5, 0.1, -0.2])
+        optimizer.local_minimizer = FixedPointMinimizer(point)
+        optimizer._local_search_start()
+        cover = optimizer._cover
+        coordinates = (point + 1.0) / 2.5
+        assert any(
+            cover.contains(prefix, coordinates)
+            for prefix in cover.prefixes.values())
+
+        optimizer.local_search()
+        self.assertTrue(np.all(
+            optimizer.current_min_function_point.point == point))
+        vertex = optimizer._store.find_point(point)
+        self.assertGreater(len(optimizer.simplices_containing(vertex)), 0)
+        for prefix in cover.prefixes.values():
+            self.assertFalse(cover.contains(prefix, coordinates))
+        region_ids = [-1 - e.object for e in optimizer._heap
+                      if e.object < 0 and not optimizer._is_stale(e)]
+        self.assertEqual(sorted(region_ids), sorted(cover.prefixes))
+
+    def test_raises_error_on_nonpositive_local_search_interval(self):
+        np.random.seed(1723)
+        for local_search_interval in [0, -10]:
+            self.assertRaises(
+                ValueError,
+                BranchBoundOptimizer, square_distance_from_center,
+                [make_simplex()], make_simplex_bound_calculator(),
+                local_minimizer=ScipyLocalMinimizer(),
+                local_search_interval=local_search_interval)
+
+
+class FixedPointMinimizer(LocalMinimizer):
+    def __init__(self, point):
+        self.point = point
+
+    def minimize(self, objective_function, initial_point, bounds):
+        return FunctionPoint(
+            self.point, objective_function(self.point), True)
+
+
+class SummaryRecorder(branch.MaxVertexEdgeBranchingStrategy):
+    def __init__(self):
+        self.summaries = []
+
+    def choose_edge(self, points, values, summary=None):
+        self.summaries.append(summary)
+        return super(SummaryRecorder, self).choose_edge(
+            points, values, summary)
+
+
+class TestBranchBoundOptimizerBranchingStrategy(unittest.TestCase):
+    def test_default_strategy_bisects_from_max_vertex(self):
+        optimizer = make_branch_bound_optimizer()
+        self.assertIsInstance(
+            optimizer.branching_strategy,
+            branch.MaxVertexEdgeBranchingStrategy)
+
+    def test_multiway_split_tiles_simplex(self):
+        np.random.seed(1901)
+        num_pieces = 4
+        optimizer = make_branch_bound_optimizer(dimension=3)
+        optimizer.branching_strategy = branch.MultiwayBranchingStrategy(
+            branch.LongestEdgeBranchingStrategy(), num_pieces)
+        children = optimizer._branch_on_index(0)
+        self.assertEqual(len(children), num_pieces)
+
+        def volume(index):
+            points = optimizer._store.simplex_points(index)
+            return abs(np.linalg.det(points[1:] - points[0]))
+        total = sum(volume(index) for index in children)
+        self.assertAlmostEqual(total, volume(0), places=10)
+
+    def test_split_derives_children_summaries(self):
+        np.random.seed(1903)
+        optimizer = make_branch_bound_optimizer(dimension=3)
+        optimizer.branching_strategy = branch.MultiwayBranchingStrategy(
+            branch.MaxVertexEdgeBranchingStrategy(), 3)
+        store = optimizer._store
+        children = optimizer._branch_on_index(0)
+        for _ in range(10):
+            children = optimizer._branch_on_index(children[-1])
+        # The children's summaries are cached without being asked for.
+        self.assertTrue(np.all(store._index_of_max_value[children] >= 0))
+        for index in range(1, store.num_simplices):
+            derived = store.simplex_summary(index)
+            expected = summarize(
+                store.simplex_points(index), store.simplex_values(index))
+            self.assertEqual(derived[:2], expected[:2])
+            np.testing.assert_allclose(
+                derived.edge_lengths, expected.edge_lengths, rtol=1e-13)
+
+    def test_strategy_reads_cached_summaries(self):
+        np.random.seed(1904)
+        optimizer = make_branch_bound_optimizer(dimension=3)
+        strategy = SummaryRecorder()
+        optimizer.branching_strategy = strategy
+        store = optimizer._store
+        children = optimizer._branch_on_index(0)
+        optimizer._branch_on_index(children[0])
+        cached = store._edge_lengths[children[0]]
+        self.assertTrue(np.all(strategy.summaries[-1].edge_lengths == cached))
+
+    def test_optimize_counts_all_new_points(self):
+        np.random.seed(1905)
+        maxfev = 20
+        optimizer = make_realistic_optimizer_with_function_call_counter(3)
+        optimizer.branching_strategy = branch.MultiwayBranchingStrategy(
+            branch.MaxVertexEdgeBranchingStrategy(), 4)
+        optimizer.optimize(ftol=0, max_function_evaluations=maxfev)
+        self.assertLessEqual(optimizer.objective_function.counter, maxfev)
+        self.assertGreater(optimizer.objective_function.counter, maxfev - 3)
+
+    def test_optimize_converges_with_each_strategy(self):
+        strategies = [
+            branch.MaxVertexEdgeBranchingStrategy(),
+            branch.MinVertexEdgeBranchingStrategy(),
+            branch.LongestEdgeBranchingStrategy(),
+            branch.MultiwayBranchingStrategy(
+                branch.LongestEdgeBranchingStrategy(), 3),
+            ]
+        for strategy in strategies:
+            np.random.seed(1909)
+            optimizer = make_realistic_optimizer_with_function_call_counter(2)
+            optimizer.branching_strategy = strategy
+            result = optimizer.optimize(
+                ftol=1e-3, max_function_evaluations=5000)
+            self.assertLess(optimizer.objective_function.counter, 5000)
+            self.assertLess(result.fun, 1e-3)
+
+    def test_optimize_async_with_multiway_split(self):
+        np.random.seed(1913)
+        optimizer = make_async_optimizer(dimension=2)
+        optimizer.branching_strategy = branch.MultiwayBranchingStrategy(
+            branch.LongestEdgeBranchingStrategy(), 3)
+        asyncio.run(optimizer.optimize_async(
+            ftol=0, max_function_evaluations=21))
+        self.assertEqual(optimizer.objective_function.counter, 20)
+
+
+class BoundCallCounter(object):
+    def __init__(self, simplex_bounder):
+        self.simplex_bounder = simplex_bounder
+        self.counter = 0
+
+    def bound_many(self, points, values, is_local_minimum=None):
+        self.counter += 1
+        return self.simplex_bounder.bound_many(
+            points, values, is_local_minimum)
+
+
+class TestBranchBoundOptimizerLowerBound(unittest.TestCase):
+    def test_lower_bound_is_least_live_bound(self):
+        np.random.seed(2001)
+        optimizer = make_realistic_optimizer_with_function_call_counter(3)
+        optimizer.optimize(ftol=0, max_function_evaluations=30)
+        live = [e.value for e in optimizer._heap
+                if not optimizer._is_stale(e)]
+        self.assertEqual(optimizer.lower_bound, min(live))
+        self.assertEqual(
+            optimizer.gap,
+            optimizer.current_min_function_point.value - min(live))
+
+    def test_lower_bound_does_not_change_heap(self):
+        np.random.seed(2002)
+        optimizer = make_realistic_optimizer_with_function_call_counter(3)
+        optimizer.optimize(ftol=0, max_function_evaluations=30)
+        entries = list(optimizer._heap._entries)
+        optimizer.lower_bound
+        optimizer.gap
+        self.assertEqual(
+            [id(e) for e in optimizer._heap._entries],
+            [id(e) for e in entries])
+
+    def test_top_of_heap_stays_live_when_branching_outside_heap(self):
+        np.random.seed(2003)
+        optimizer = make_realistic_optimizer_with_function_call_counter(3)
+        optimizer.optimize(ftol=0, max_function_evaluations=30)
+        for _ in range(5):
+            top = optimizer._heap.peek_min().object
+            vertex = optimizer._store.simplices[top][0]
+            optimizer.refine_around_vertex(vertex)
+            self.assertFalse(optimizer._is_stale(optimizer._heap.peek_min()))
+            live = [e.value for e in optimizer._heap
+                    if not optimizer._is_stale(e)]
+            self.assertEqual(optimizer._heap.peek_min().value, min(live))
+
+    def test_lower_bound_is_current_min_when_heap_is_empty(self):
+        np.random.seed(2004)
+        optimizer = make_realistic_optimizer_with_function_call_counter(2)
+        optimizer._heap = Heap()
+        self.assertEqual(
+            optimizer.lower_bound, optimizer.current_min_function_point.value)
+        self.assertEqual(optimizer.gap, 0)
+
+    def test_lower_bound_counts_lazy_regions(self):
+        optimizer = make_hyperrectangle_optimizer(dimension=4, lazy=True)
+        region = optimizer._heap.peek_min()
+        assert region.object < 0
+        self.assertEqual(optimizer.lower_bound, region.value)
+
+    def test_optimize_stops_at_relative_gap(self):
+        results = []
+        counters = []
+        for rtol in [0.0, 0.5]:
+            optimizer = make_hyperrectangle_optimizer(
+                dimension=2, objective_function=shifted_square_norm)
+            results.append(optimizer.optimize(
+                ftol=1e-4, rtol=rtol, max_function_evaluations=1000))
+            counters.append(optimizer.objective_function.counter)
+        self.assertTrue(results[1].success)
+        self.assertLessEqual(results[1].gap, 0.5 * abs(results[1].fun))
+        self.assertLess(counters[1], counters[0])
+
+    def test_optimize_async_lower_bound_counts_candidates_in_flight(self):
+        np.random.seed(2005)
+        optimizer = make_async_optimizer(2)
+        initial_bound = optimizer._heap.peek_min().value
+        lower_bounds = []
+
+        async def objective_function(point):
+            lower_bounds.append(optimizer.lower_bound)
+            return square_distance_from_center(point)
+
+        optimizer.objective_function = objective_function
+        asyncio.run(optimizer.optimize_async(
+            ftol=0, max_function_evaluations=1))
+        self.assertEqual(lower_bounds, [initial_bound])
+        self.assertEqual(optimizer._in_flight, dict())
+
+
+class TestBranchBoundOptimizerLipschitzEstimator(unittest.TestCase):
+    def test_converges_without_given_constants(self):
+        optimizer = make_adaptive_optimizer()
+        result = optimizer.optimize(ftol=1e-3, max_function_evaluations=2000)
+        self.assertTrue(result.success)
+        self.assertLess(result.fun, 1e-3)
+
+    def test_uses_fewer_evaluations_than_overestimated_constants(self):
+        adaptive = make_adaptive_optimizer()
+        adaptive.optimize(ftol=1e-2, max_function_evaluations=2000)
+        overestimated = BranchBoundOptimizer.from_hyperrectangle(
+            FunctionCallCounter(square_distance_from_center),
+            [[-1.0, 1.5]] * 2,
+            make_simplex_bound_calculator(40.0, 20.0))
+        overestimated.optimize(ftol=1e-2, max_function_evaluations=2000)
+        self.assertLess(
+            adaptive.objective_function.counter,
+            overestimated.objective_function.counter)
+
+    def test_initial_bounds_use_initial_estimates(self):
+        optimizer = make_adaptive_optimizer()
+        estimator = optimizer.lipschitz_estimator
+        self.assertGreater(estimator.f_lipshitz_estimate, 0)
+        self.assertTrue(np.isfinite(optimizer.lower_bound))
+
+    def test_live_bounds_match_current_constants(self):
+        optimizer = make_adaptive_optimizer(dimension=3)
+        optimizer.optimize(ftol=0, max_function_evaluations=60)
+        live = np.flatnonzero(~np.isnan(optimizer._store.bounds))
+        self.assertTrue(np.allclose(
+            optimizer._store.bounds[live], optimizer._bound_indices(live)))
+
+    def test_rebound_all_rebuilds_heap_from_live_simplices(self):
+        optimizer = make_adaptive_optimizer(dimension=3, lazy=True)
+        optimizer.optimize(ftol=0, max_function_evaluations=40)
+        live = np.flatnonzero(~np.isnan(optimizer._store.bounds))
+        number = optimizer.rebound_all()
+        self.assertEqual(number, live.size + len(optimizer._cover.prefixes))
+        self.assertEqual(len(optimizer._heap), number)
+        for entry in optimizer._heap:
+            self.assertFalse(optimizer._is_stale(entry))
+
+    def test_changed_constants_rebound_heap(self):
+        optimizer = make_adaptive_optimizer()
+        optimizer.optimize(ftol=0, max_function_evaluations=10)
+        estimator = optimizer.lipschitz_estimator
+        before = estimator.f_lipshitz_constant
+        lower_bound = optimizer.lower_bound
+        # A steep pair of points raises the f constant, which lowers
+        # every bound:
+        steep = optimizer._store.add_points(
+            np.zeros((2, 2)) + [[0], [1]], [0.0, 10 * before])
+        optimizer._observe([steep])
+        self.assertGreater(estimator.f_lipshitz_constant, before)
+        self.assertLess(optimizer.lower_bound, lower_bound)
+        live = np.flatnonzero(~np.isnan(optimizer._store.bounds))
+        self.assertEqual(len(optimizer._heap), live.size)
+        for entry in optimizer._heap:
+            self.assertFalse(optimizer._is_stale(entry))
+
+
+class TestBranchBoundOptimizerHooks(unittest.TestCase):
+    def test_reports_every_evaluation(self):
+        hooks = HookRecorder()
+        optimizer = make_hyperrectangle_optimizer(dimension=2)
+        optimizer.hooks = hooks
+        result = optimizer.optimize(
+            ftol=0, max_function_evaluations=30, batch_size=3)
+        evaluated = sum(len(values) for values, in hooks.events['evaluate'])
+        self.assertEqual(evaluated, result.nfev)
+
+    def test_reports_pops_and_branches(self):
+        hooks = HookRecorder()
+        optimizer = make_hyperrectangle_optimizer(dimension=2)
+        optimizer.hooks = hooks
+        result = optimizer.optimize(ftol=0, max_function_evaluations=20)
+        self.assertEqual(len(hooks.events['pop']), result.nit)
+        popped = [index for indices, _ in hooks.events['pop']
+                  for index in indices]
+        branched = [event[0] for event in hooks.events['branch']]
+        self.assertEqual(popped, branched)
+        for _, _, child_indices, child_bounds in hooks.events['branch']:
+            self.assertEqual(len(child_indices), 2)
+            self.assertEqual(
+                child_bounds.tolist(), optimizer._bound_indices(child_indices))
+
+    def test_reports_improvements_and_termination(self):
+        hooks = HookRecorder()
+        optimizer = make_hyperrectangle_optimizer(
+            dimension=2, objective_function=shifted_square_norm)
+        optimizer.hooks = hooks
+        result = optimizer.optimize(ftol=1e-3, max_function_evaluations=500)
+        values = [point.value for point, in hooks.events['incumbent']]
+        self.assertGreater(len(values), 0)
+        self.assertTrue(np.all(np.diff(values) < 0))
+        self.assertEqual(values[-1], result.fun)
+        self.assertEqual(hooks.events['terminate'], [(result,)])
+
+    def test_reports_local_search_evaluations(self):
+        hooks = HookRecorder()
+        optimizer = BranchBoundOptimizer.from_hyperrectangle(
+            shifted_square_norm, [[-1.0, 1.5]] * 2,
+            make_simplex_bound_calculator(np.inf, 2),
+            local_minimizer=ScipyLocalMinimizer(), hooks=hooks)
+        result = optimizer.optimize(max_function_evaluations=50)
+        self.assertEqual(result.nlocal, 1)
+        evaluated = sum(len(values) for values, in hooks.events['evaluate'])
+        self.assertEqual(evaluated, result.nfev)
+
+    def test_reports_async_branches(self):
+        hooks = HookRecorder()
+        optimizer = make_async_optimizer(2)
+        optimizer.hooks = hooks
+        result = asyncio.run(optimizer.optimize_async(
+            ftol=0, max_function_evaluations=12, max_in_flight=3))
+        self.assertEqual(len(hooks.events['branch']), result.nit)
+        self.assertEqual(hooks.events['terminate'], [(result,)])
+
+    def test_event_log_records_run(self):
+        with tempfile.TemporaryDirectory() as directory:
+            optimizer = make_hyperrectangle_optimizer(dimension=2)
+            optimizer.hooks = EventLog(directory, chunk_size=16)
+            result = optimizer.optimize(ftol=0, max_function_evaluations=40)
+            events = EventLog.load(directory)
+        evaluations = events['event'] == EVENT_CODES['evaluate']
+        self.assertEqual(np.count_nonzero(evaluations), result.nfev)
+        self.assertEqual(events['event'][-1], EVENT_CODES['terminate'])
+        self.assertEqual(events['value'][-1], result.fun)
+
+
+class HookRecorder(OptimizerHooks):
+    def __init__(self):
+        self.events = {
+            name: [] for name in
+            ['pop', 'evaluate', 'branch', 'incumbent', 'terminate']}
+
+    def on_pop(self, simplex_indices, bounds):
+        self.events['pop'].append((list(simplex_indices), list(bounds)))
+
+    def on_evaluate(self, points, values):
+        self.events['evaluate'].append((list(values),))
+
+    def on_branch(self, simplex_index, bound, child_indices, child_bounds):
+        self.events['branch'].append(
+            (simplex_index, bound, list(child_indices),
+             np.array(child_bounds)))
+
+    def on_incumbent_improved(self, function_point):
+        self.events['incumbent'].append((function_point,))
+
+    def on_terminate(self, result):
+        self.events['terminate'].append((result,))
+
+
+class TestBranchBoundOptimizerFrontier(unittest.TestCase):
+    def test_yields_live_simplices(self):
+        optimizer = make_hyperrectangle_optimizer(dimension=3)
+        optimizer.optimize(ftol=0, max_function_evaluations=40)
+        chunks = list(optimizer.iter_frontier(chunk_size=16))
+        self.assertTrue(all(len(c.simplex_indices) <= 16 for c in chunks))
+        indices = np.concatenate([c.simplex_indices for c in chunks])
+        live = np.flatnonzero(~np.isnan(optimizer._store.bounds))
+        self.assertEqual(sorted(indices.tolist()), live.tolist())
+        for chunk in chunks:
+            store = optimizer._store
+            self.assertTrue(np.all(
+                chunk.bounds == store.bounds[chunk.simplex_indices]))
+            self.assertTrue(np.all(
+                chunk.points == store.simplex_points(chunk.simplex_indices)))
+            self.assertEqual(chunk.values.shape, chunk.points.shape[:2])
+            self.assertEqual(chunk.region_ids.size, 0)
+
+    def test_does_not_change_heap(self):
+        optimizer = make_hyperrectangle_optimizer(dimension=3)
+        optimizer.optimize(ftol=0, max_function_evaluations=40)
+        entries = list(optimizer._heap)
+        lower_bound = optimizer.lower_bound
+        list(optimizer.iter_frontier(chunk_size=7))
+        self.assertEqual(list(optimizer._heap), entries)
+        self.assertEqual(optimizer.lower_bound, lower_bound)
+
+    def test_skips_stale_entries(self):
+        optimizer = make_hyperrectangle_optimizer(dimension=2)
+        optimizer.optimize(ftol=0, max_function_evaluations=10)
+        num_entries = len(optimizer._heap)
+        vertex = optimizer.current_min_function_point
+        optimizer.refine_around_vertex(
+            optimizer._store.find_point(vertex.point))
+        self.assertGreater(len(optimizer._heap), num_entries)
+        indices = np.concatenate([
+            chunk.simplex_indices for chunk in optimizer.iter_frontier()])
+        live = np.flatnonzero(~np.isnan(optimizer._store.bounds))
+        self.assertEqual(sorted(indices.tolist()), live.tolist())
+
+    def test_yields_lazy_regions(self):
+        optimizer = make_hyperrectangle_optimizer(dimension=3, lazy=True)
+        chunks = list(optimizer.iter_frontier())
+        self.assertEqual(chunks[0].region_ids.tolist(), [0])
+        self.assertEqual(chunks[0].simplex_indices.size, 0)
+        self.assertEqual(
+            chunks[0].region_bounds.tolist(), [optimizer.lower_bound])
+
+    def test_streams_from_another_thread(self):
+        optimizer = make_hyperrectangle_optimizer(dimension=3)
+        done = threading.Event()
+        errors = []
+        num_snapshots = [0]
+
+        def stream():
+            try:
+                while not done.is_set():
+                    for chunk in optimizer.iter_frontier(chunk_size=8):
+                        assert np.all(np.isfinite(chunk.bounds))
+                    num_snapshots[0] += 1
+            except Exception as error:
+                errors.append(error)
+
+        thread = threading.Thread(target=stream)
+        thread.start()
+        try:
+            optimizer.optimize(ftol=0, max_function_evaluations=2000)
+        finally:
+            done.set()
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertGreater(num_snapshots[0], 0)
+
+
+class TestBranchBoundOptimizerFromHyperrectangle(unittest.TestCase):
+    def test_eager_start_triangulates_whole_hyperrectangle(self):
+        optimizer = make_hyperrectangle_optimizer(dimension=3, lazy=False)
+        self.assertEqual(optimizer._store.num_simplices, 6)
+        self.assertEqual(len(optimizer._heap), 6)
+
+    def test_lazy_start_has_one_region_and_no_simplices(self):
+        optimizer = make_hyperrectangle_optimizer(dimension=5, lazy=True)
+        self.assertEqual(optimizer._store.num_points, 32)
+        self.assertEqual(optimizer._store.num_simplices, 0)
+        self.assertEqual(len(optimizer._heap), 1)
+        self.assertEqual(list(optimizer._cover.prefixes.values()), [()])
+
+    def test_evaluates_corners_with_vectorized_objective(self):
+        calls = []
+
+        def objective_function(x):
+            calls.append(x.shape)
+            return np.sum(x**2, axis=1)
+
+        for lazy in [False, True]:
+            del calls[:]
+            optimizer = BranchBoundOptimizer.from_hyperrectangle(
+                objective_function, [[-1.0, 1.5]] * 3,
+                make_simplex_bound_calculator(np.inf, 2),
+                lazy=lazy, vectorized=True)
+            self.assertEqual(calls, [(8, 3)])
+            result = optimizer.optimize(
+                ftol=1e-3, max_function_evaluations=500)
+            self.assertLess(result.fun, 1e-3)
+
+    def test_lazy_gives_same_result_as_eager(self):
+        results = []
+        counters = []
+        for lazy in [False, True]:
+            optimizer = make_hyperrectangle_optimizer(dimension=3, lazy=lazy)
+            results.append(optimizer.optimize(
+                ftol=1e-3, max_function_evaluations=500))
+            counters.append(optimizer.objective_function.counter)
+        self.assertEqual(results[0].fun, results[1].fun)
+        self.assertTrue(np.all(results[0].x == results[1].x))
+        self.assertEqual(counters[0], counters[1])
+
+    def test_lazy_materializes_fewer_simplices(self):
+        optimizer = make_hyperrectangle_optimizer(dimension=6, lazy=True)
+        optimizer.optimize(ftol=0, max_function_evaluations=50)
+        self.assertLess(optimizer._store.num_simplices, 720)
+        self.assertGreater(len(optimizer._cover.prefixes), 0)
+
+    def test_prune_drops_dominated_regions_from_cover(self):
+        optimizer = make_hyperrectangle_optimizer(
+            dimension=6, lazy=True, objective_function=weighted_square_norm)
+        optimizer.optimize(ftol=0, max_function_evaluations=80)
+        assert len(optimizer._cover.prefixes) > 0
+        optimizer.prune(0.0)
+        self.assertEqual(len(optimizer._cover.prefixes), 0)
+        self.assertEqual(optimizer._store.num_simplices, len(optimizer._heap))
+
+    def test_prune_keeps_corners_of_remaining_regions(self):
+        optimizer = make_hyperrectangle_optimizer(
+            dimension=6, lazy=True, objective_function=weighted_square_norm)
+        optimizer.optimize(ftol=0, max_function_evaluations=80)
+        regions = [e for e in optimizer._heap if e.object < 0]
+        # Drop only the simplices whose bounds are above every region's:
+        threshold = max(e.value for e in regions)
+        ftol = optimizer.current_min_function_point.value - threshold
+        num_points = optimizer._store.num_points
+        optimizer.prune(ftol)
+        self.assertLess(optimizer._store.num_points, num_points)
+        self.assertEqual(
+            len([e for e in optimizer._heap if e.object < 0]), len(regions))
+        for entry in regions:
+            prefix = optimizer._cover.prefixes[-1 - entry.object]
+            self.assertEqual(optimizer._bound_region(prefix), entry.value)
+
+    def test_save_and_load_keep_regions(self):
+        optimizer = make_hyperrectangle_optimizer(dimension=4, lazy=True)
+        optimizer.optimize(ftol=0, max_function_evaluations=20)
+        with tempfile.TemporaryDirectory() as directory:
+            optimizer.save(directory)
+            loaded = BranchBoundOptimizer.load(
+                directory,
+                optimizer.objective_function,
+                optimizer.simplex_bounder)
+            self.assertEqual(
+                sorted(loaded._cover.prefixes.values()),
+                sorted(optimizer._cover.prefixes.values()))
+            result_loaded = loaded.optimize(
+                ftol=0, max_function_evaluations=30)
+        result_original = optimizer.optimize(
+            ftol=0, max_function_evaluations=30)
+        self.assertEqual(result_loaded.fun, result_original.fun)
+
+
 class TestBranchBoundOptimizerOptimize(unittest.TestCase):
     def setUp(self):
         warnings.filterwarnings('error')
@@ -223,20 +1122,57 @@ class TestBranchBoundOptimizerOptimize(unittest.TestCase):
 
         self.assertLessEqual(optimizer.current_min_function_point.value, ftol)
 
-    def test_optimize_returns_correct_dtype_when_did_not_converge(self):
+    def test_optimize_returns_result_when_did_not_converge(self):
         np.random.seed(1652)
         optimizer = make_realistic_optimizer_with_function_call_counter(2)
         out = optimizer.optimize(ftol=0, max_function_evaluations=1)
 
-        self.assertIsInstance(out, FunctionPoint)
+        self.assertIsInstance(out, OptimizeResult)
+        self.assertFalse(out.success)
+        self.assertEqual(out.status, 1)
+        self.assertEqual(out.nfev, 1)
 
-    def test_optimize_returns_correct_dtype_when_did_converge(self):
+    def test_optimize_returns_result_when_did_converge(self):
         np.random.seed(1652)
         optimizer = make_realistic_optimizer_with_function_call_counter(2)
         maxfev = 30
         out = optimizer.optimize(ftol=0.1, max_function_evaluations=maxfev)
         assert optimizer.objective_function.counter < maxfev
-        self.assertIsInstance(out, FunctionPoint)
+        self.assertIsInstance(out, OptimizeResult)
+        self.assertTrue(out.success)
+        self.assertEqual(out.status, 0)
+        self.assertEqual(out.nfev, optimizer.objective_function.counter)
+        self.assertGreaterEqual(out.lower_bound, out.fun - 0.1)
+
+    def test_optimize_result_reports_best_point_and_counters(self):
+        np.random.seed(1653)
+        optimizer = make_realistic_optimizer_with_function_call_counter(2)
+        out = optimizer.optimize(ftol=0, max_function_evaluations=20)
+        best = optimizer.current_min_function_point
+        self.assertTrue(np.all(out.x == best.point))
+        self.assertEqual(out.fun, best.value)
+        self.assertEqual(out.nit, 20)
+        self.assertEqual(out.nlocal, 0)
+        self.assertEqual(out.heap_size, len(optimizer._heap))
+        self.assertEqual(out.gap, out.fun - out.lower_bound)
+        self.assertGreaterEqual(out.gap, 0)
+
+    def test_optimize_result_lower_bound_is_least_live_bound(self):
+        np.random.seed(1654)
+        optimizer = make_realistic_optimizer_with_function_call_counter(3)
+        out = optimizer.optimize(ftol=0, max_function_evaluations=30)
+        live = [e.value for e in optimizer._heap
+                if not optimizer._is_stale(e)]
+        self.assertEqual(out.lower_bound, min(live))
+
+    def test_optimize_result_reports_timings(self):
+        np.random.seed(1655)
+        optimizer = make_realistic_optimizer_with_function_call_counter(3)
+        out = optimizer.optimize(ftol=0, max_function_evaluations=30)
+        for phase in ['evaluation', 'bounding', 'branching', 'heap']:
+            self.assertGreater(out.timings[phase], 0)
+        parts = sum(v for k, v in out.timings.items() if k != 'total')
+        self.assertAlmostEqual(parts, out.timings['total'], places=6)
 
     def test_optimize_returns_best_point(self):
         np.random.seed(1652)
@@ -246,7 +1182,229 @@ class TestBranchBoundOptimizerOptimize(unittest.TestCase):
         ftol = 0.01
         result = optimizer.optimize(ftol=ftol, max_function_evaluations=200)
 
-        self.assertLessEqual(result.value, global_min + ftol)
+        self.assertLessEqual(result.fun, global_min + ftol)
+
+
+class TestBranchBoundOptimizerBatchOptimize(unittest.TestCase):
+    def setUp(self):
+        warnings.filterwarnings('error')
+
+    def tearDown(self):
+        warnings.filterwarnings('default')
+
+    def test_process_candidates_adds_2_per_candidate_to_heap(self):
+        np.random.seed(1201)
+        optimizer = make_branch_bound_optimizer()
+        size_before_branching = len(optimizer._heap)
+        candidates = optimizer._heap.pop_many(3)
+
+        optimizer.process_candidates(candidates)
+        self.assertEqual(len(optimizer._heap), size_before_branching + 3)
+
+    def test_pop_candidates_skips_duplicate_entries(self):
+        np.random.seed(1202)
+        optimizer = make_branch_bound_optimizer()
+        # Entries of the same simplex with the same bound, which are not
+        # stale by their bound alone:
+        entries = list(optimizer._heap)
+        optimizer._heap.push_many(entries)
+
+        candidates = optimizer._pop_candidates(4, ftol=0)
+        objects = [c.object for c in candidates]
+        self.assertGreater(len(objects), 1)
+        self.assertEqual(len(objects), len(set(objects)))
+
+    def test_push_back_undoes_pop_candidates(self):
+        np.random.seed(1204)
+        optimizer = make_branch_bound_optimizer()
+        bounds = optimizer._store.bounds.copy()
+        candidates = optimizer._pop_candidates(2, ftol=0)
+
+        optimizer._push_back(candidates)
+        self.assertTrue(np.array_equal(optimizer._store.bounds, bounds))
+        self.assertEqual(
+            sorted(c.object for c in optimizer._pop_candidates(2, ftol=0)),
+            sorted(c.object for c in candidates))
+
+    def test_batch_optimize_does_not_call_more_than_maxiter_fevs(self):
+        np.random.seed(1203)
+        maxfev = 7
+        optimizer = make_realistic_optimizer_with_function_call_counter()
+        optimizer.optimize(max_function_evaluations=maxfev, ftol=0,
+                           batch_size=3)
+        self.assertEqual(optimizer.objective_function.counter, maxfev)
+
+    def test_batch_optimize_converges_with_thread_pool(self):
+        np.random.seed(1428)
+        optimizer = make_realistic_optimizer_with_function_call_counter(2)
+        ftol = 0.01
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            optimizer.executor = executor
+            result = optimizer.optimize(
+                ftol=ftol, max_function_evaluations=400, batch_size=4)
+        self.assertLessEqual(result.fun, ftol)
+
+    def test_batch_optimize_evaluates_vectorized_objective_in_batches(self):
+        np.random.seed(1209)
+        optimizer = make_realistic_optimizer_with_function_call_counter(2)
+        objective_function = FunctionCallCounter(
+            lambda x: np.linalg.norm(x, axis=1)**2)
+        optimizer.objective_function = objective_function
+        optimizer.vectorized = True
+        num_points_before = optimizer._store.num_points
+
+        maxfev = 20
+        optimizer.optimize(
+            ftol=0, max_function_evaluations=maxfev, batch_size=5)
+        num_evaluated = optimizer._store.num_points - num_points_before
+        self.assertEqual(num_evaluated, maxfev)
+        self.assertLess(objective_function.counter, maxfev)
+
+    def test_batch_optimize_leaves_dominated_candidates_in_heap(self):
+        np.random.seed(1626)
+        optimizer = make_realistic_optimizer_with_function_call_counter()
+        num_initial_simplices = len(optimizer._heap)
+
+        optimizer.optimize(max_function_evaluations=10, ftol=1e5,
+                           batch_size=4)
+        assert optimizer.objective_function.counter == 0
+        self.assertEqual(len(optimizer._heap), num_initial_simplices)
+
+
+class TestAsyncBranchBoundOptimizer(unittest.TestCase):
+    def test_optimize_async_converges(self):
+        np.random.seed(1428)
+        optimizer = make_async_optimizer(2)
+        ftol = 0.01
+        result = asyncio.run(optimizer.optimize_async(
+            ftol=ftol, max_function_evaluations=400, max_in_flight=4))
+        self.assertLessEqual(result.fun, ftol)
+        self.assertTrue(result.success)
+        self.assertEqual(result.nfev, optimizer.objective_function.counter)
+        self.assertEqual(result.nit, result.nfev)
+
+    def test_optimize_async_reports_when_evaluations_ran_out(self):
+        np.random.seed(1431)
+        optimizer = make_async_optimizer(2)
+        result = asyncio.run(optimizer.optimize_async(
+            ftol=0, max_function_evaluations=10, max_in_flight=4))
+        self.assertFalse(result.success)
+        self.assertEqual(result.nfev, 10)
+        self.assertGreater(result.timings['evaluation'], 0)
+
+    def test_optimize_async_does_not_call_more_than_maxiter_fevs(self):
+        np.random.seed(1433)
+        optimizer = make_async_optimizer()
+        maxfev = 9
+        asyncio.run(optimizer.optimize_async(
+            ftol=0, max_function_evaluations=maxfev, max_in_flight=4))
+        self.assertEqual(optimizer.objective_function.counter, maxfev)
+
+    def test_optimize_async_keeps_evaluations_in_flight(self):
+        np.random.seed(1437)
+        optimizer = make_async_optimizer()
+        objective_function = optimizer.objective_function
+        asyncio.run(optimizer.optimize_async(
+            ftol=0, max_function_evaluations=12, max_in_flight=3))
+        self.assertEqual(objective_function.max_in_flight, 3)
+
+    def test_optimize_async_puts_back_unfinished_candidates_on_error(self):
+        np.random.seed(1441)
+        optimizer = make_async_optimizer()
+        num_initial_simplices = len(optimizer._heap)
+
+        async def fail(point):
+            raise RuntimeError
+
+        optimizer.objective_function = fail
+        with self.assertRaises(RuntimeError):
+            asyncio.run(optimizer.optimize_async(ftol=0, max_in_flight=1))
+        self.assertEqual(len(optimizer._heap), num_initial_simplices)
+
+    def test_optimize_async_does_not_pop_simplices_in_flight(self):
+        np.random.seed(1443)
+        optimizer = make_async_optimizer(2)
+        function = optimizer.objective_function
+        asyncio.run(optimizer.optimize_async(
+            ftol=0, max_function_evaluations=10, max_in_flight=1))
+        hooks = optimizer.hooks = HookRecorder()
+        calls = []
+
+        async def rebound_while_in_flight(point):
+            calls.append(point)
+            for vertex in range(optimizer._store.num_points):
+                optimizer.rebound_around_vertex(vertex)
+            # Keep the first candidate in flight while others are popped.
+            while len(calls) == 1 or len(calls) < 20 and calls[0] is point:
+                await asyncio.sleep(0)
+            return await function(point)
+
+        optimizer.objective_function = rebound_while_in_flight
+        asyncio.run(optimizer.optimize_async(
+            ftol=0, max_function_evaluations=30, max_in_flight=4))
+        popped = [index for indices, _ in hooks.events['pop']
+                  for index in indices]
+        self.assertEqual(len(popped), len(set(popped)))
+
+    def test_refine_around_vertex_skips_simplices_in_flight(self):
+        np.random.seed(1447)
+        optimizer = make_async_optimizer(2)
+        function = optimizer.objective_function
+        asyncio.run(optimizer.optimize_async(
+            ftol=0, max_function_evaluations=10, max_in_flight=1))
+        hooks = optimizer.hooks = HookRecorder()
+        calls = []
+
+        async def refine_while_in_flight(point):
+            calls.append(point)
+            if len(calls) == 3:
+                # Refine with a synchronous objective, around a vertex
+                # of a simplex which is still being evaluated.
+                in_flight = list(optimizer._in_flight.values())[0]
+                vertex = optimizer._store.simplices[in_flight.object][0]
+                optimizer.objective_function = function.function
+                refined = optimizer.refine_around_vertex(vertex)
+                optimizer.objective_function = refine_while_in_flight
+                self.assertGreater(refined, 0)
+            # Keep the first candidate in flight while others are popped.
+            while len(calls) == 1 or len(calls) < 20 and calls[0] is point:
+                await asyncio.sleep(0)
+            return await function(point)
+
+        optimizer.objective_function = refine_while_in_flight
+        asyncio.run(optimizer.optimize_async(
+            ftol=0, max_function_evaluations=30, max_in_flight=4))
+        branched = [event[0] for event in hooks.events['branch']]
+        self.assertEqual(len(branched), len(set(branched)))
+
+
+class AsyncFunctionCallCounter(object):
+    def __init__(self, function):
+        self.function = function
+        self.counter = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def __call__(self, *args, **kwargs):
+        self.counter += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0)
+        self.in_flight -= 1
+        return self.function(*args, **kwargs)
+
+
+def make_async_optimizer(dimension=7):
+    points_uncentered = np.random.randn(dimension + 1, dimension)
+    points = points_uncentered - points_uncentered.mean(axis=0)
+    function_points = [
+        FunctionPoint(p, square_distance_from_center(p)) for p in points]
+    optimizer = AsyncBranchBoundOptimizer(
+        AsyncFunctionCallCounter(square_distance_from_center),
+        [Simplex(function_points)],
+        MaxPointSimplexBoundCalculator(
+            OrdinaryPointBoundCalculator(np.inf, 2)))
+    return optimizer
 
 
 class FunctionCallCounter(object):
@@ -282,6 +1440,31 @@ def make_realistic_optimizer_with_function_call_counter(dimension=7):
     return optimizer
 
 
+def make_hyperrectangle_optimizer(
+        dimension=3, lazy=False, objective_function=None):
+    if objective_function is None:
+        objective_function = square_distance_from_center
+    objective_function = FunctionCallCounter(objective_function)
+    bounds = [[-1.0, 1.5]] * dimension
+    optimizer = BranchBoundOptimizer.from_hyperrectangle(
+        objective_function,
+        bounds,
+        make_simplex_bound_calculator(np.inf, 2),
+        lazy=lazy)
+    objective_function.counter *= 0
+    return optimizer
+
+
+def make_adaptive_optimizer(dimension=2, lazy=False):
+    estimator = AdaptiveLipschitzPointBoundCalculator()
+    return BranchBoundOptimizer.from_hyperrectangle(
+        FunctionCallCounter(square_distance_from_center),
+        [[-1.0, 1.5]] * dimension,
+        MaxPointSimplexBoundCalculator(estimator),
+        lazy=lazy,
+        lipschitz_estimator=estimator)
+
+
 def make_branch_bound_optimizer(dimension=3):
     initial_simplices = [make_simplex(dimension=dimension) for _ in range(10)]
     simplex_bound_calculator = make_simplex_bound_calculator()
@@ -306,5 +1489,13 @@ def square_distance_from_center(p):
     return np.linalg.norm(p)**2
 
 
+def shifted_square_norm(p):
+    return 1.0 + np.sum((p - 0.3)**2)
+
+
+def weighted_square_norm(p):
+    return np.sum(np.arange(1, p.size + 1) * p**2)
+
+
 if __name__ == '__main__':
     unittest.main()
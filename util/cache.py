@@ -0,0 +1,161 @@
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+class EvaluationCache(object):
+    """
+    Memoizes a function on the coordinates of the point it is called on.
+
+    Wrap the objective function once, and pass the same cache to both
+    triangulate_function_on_hyperrectangle and BranchBoundOptimizer, so
+    that every point is only evaluated once: e.g. when the longest-edge
+    bisections of two simplices which share an edge produce the same
+    midpoint.
+
+    Attributes
+    ----------
+    function : callable
+    hits : int
+    misses : int
+    maxsize : int or None
+    decimals : int or None
+    path : str or None
+    vectorized : bool
+
+    Methods
+    -------
+    save
+        Write the cached points and values to `path`.
+    load
+        Read cached points and values from `path`.
+    clear
+        Empty the cache and reset the counters.
+
+    Notes
+    -----
+    The cache is safe to use from a thread pool. Each process of a
+    process pool gets its own copy of the cache.
+    """
+
+    def __init__(self, function, maxsize=None, decimals=None, path=None,
+                 vectorized=False):
+        """
+        Parameters
+        ----------
+        function : callable
+            f(point) -> float, or f(points) -> array if `vectorized`.
+        maxsize : int or None, optional
+            The maximum number of values to keep. The least recently
+            used values are evicted first. Default is unbounded.
+        decimals : int or None, optional
+            If not None, points are rounded to this many decimals
+            before lookup, so that points which differ by round-off
+            share a value. Default is to match coordinates exactly.
+        path : str or None, optional
+            A .npz file to persist the cache to. If it exists, the
+            cache is loaded from it on creation.
+        vectorized : bool, optional
+            Whether `function` evaluates a (n, d) array of points in
+            one call. If so, the cache is called the same way, and
+            only the points not in the cache are passed to `function`.
+        """
+        self.function = function
+        self.maxsize = maxsize
+        self.decimals = decimals
+        self.path = path
+        self.vectorized = vectorized
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        if path is not None and os.path.exists(path):
+            self.load()
+
+    def __call__(self, point):
+        if self.vectorized:
+            return self._call_vectorized(point)
+        key = self._key(point)
+        value = self._lookup(key)
+        if value is None:
+            value = self.function(point)
+            self._insert(key, value)
+        return value
+
+    def __len__(self):
+        return len(self._cache)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def save(self, path=None):
+        path = self.path if path is None else path
+        with self._lock:
+            keys = list(self._cache.keys())
+            values = np.array(list(self._cache.values()), dtype='float')
+        points = np.array([np.frombuffer(key) for key in keys])
+        np.savez(path, points=points, values=values)
+
+    def load(self, path=None):
+        path = self.path if path is None else path
+        with np.load(path) as data:
+            points = data['points']
+            values = data['values']
+        for point, value in zip(points, values):
+            self._insert(self._key(point), value)
+
+    def _call_vectorized(self, points):
+        points = np.asarray(points, dtype='float')
+        keys = [self._key(point) for point in points]
+        cached = [self._lookup(key) for key in keys]
+        # A hit can be NaN, if the function returned NaN, so the misses
+        # are the lookups which returned None.
+        missing = np.array([value is None for value in cached], dtype='bool')
+        values = np.array(
+            [np.nan if value is None else value for value in cached],
+            dtype='float')
+        if np.any(missing):
+            new_values = np.reshape(self.function(points[missing]), -1)
+            values[missing] = new_values
+            missing_keys = [k for k, m in zip(keys, missing) if m]
+            for key, value in zip(missing_keys, new_values):
+                self._insert(key, value)
+        return values
+
+    def _key(self, point):
+        point = np.asarray(point, dtype='float').reshape(-1)
+        if self.decimals is not None:
+            point = np.round(point, self.decimals)
+        # adding 0.0 maps -0.0 to 0.0, which otherwise has other bytes
+        return (point + 0.0).tobytes()
+
+    def _lookup(self, key):
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return self._cache[key]
+            self.misses += 1
+            return None
+
+    def _insert(self, key, value):
+        with self._lock:
+            self._cache[key] = value
+            self._cache.move_to_end(key)
+            if self.maxsize is not None:
+                while len(self._cache) > self.maxsize:
+                    self._cache.popitem(last=False)
@@ -0,0 +1,61 @@
+import numpy as np
+
+
+def evaluate_points(function, points, executor=None, vectorized=False,
+                    chunk_size=None, progress=None):
+    """
+    Evaluate a function at each of several points.
+
+    Parameters
+    ----------
+    function : callable
+        Either f(point) -> float, or, if `vectorized`, f(points) -> array
+        which evaluates all the rows of a (n, d) array at once.
+    points : (n, d) numpy.ndarray
+    executor : object with a `map` method, optional
+        E.g. a concurrent.futures.ThreadPoolExecutor, ProcessPoolExecutor
+        or multiprocessing.Pool, used to evaluate the points in parallel.
+        A process pool requires `function` to be picklable. Ignored if
+        `vectorized` is True. Default is to evaluate serially.
+    vectorized : bool, optional
+        Whether `function` takes the full (n, d) array of points.
+    chunk_size : int or None, optional
+        If given, evaluate the points `chunk_size` rows at a time, e.g.
+        to limit the memory of a vectorized function, or to report
+        progress. Default is all the points at once.
+    progress : callable or None, optional
+        progress(num_evaluated, num_points), called after each chunk.
+
+    Returns
+    -------
+    (n,) numpy.ndarray of floats
+    """
+    points = np.asarray(points, dtype='float')
+    num_points = points.shape[0]
+    if chunk_size is None:
+        chunk_size = max(num_points, 1)
+    elif chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    chunks = []
+    for start in range(0, num_points, chunk_size):
+        chunk = points[start:start + chunk_size]
+        chunks.append(_evaluate_chunk(function, chunk, executor, vectorized))
+        if progress is not None:
+            progress(start + chunk.shape[0], num_points)
+    if len(chunks) == 0:
+        return np.zeros(0)
+    return np.concatenate(chunks)
+
+
+def _evaluate_chunk(function, points, executor, vectorized):
+    if vectorized:
+        values = function(points)
+    elif executor is None:
+        values = [function(point) for point in points]
+    else:
+        values = list(executor.map(function, points))
+    values = np.asarray(values, dtype='float').reshape(-1)
+    if values.size != points.shape[0]:
+        msg = "function must return one value per point"
+        raise ValueError(msg)
+    return values
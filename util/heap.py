@@ -1,3 +1,4 @@
+import heapq
 from collections import deque
 
 
@@ -5,21 +6,34 @@ class Heap(object):
     """
     A data structure which efficiently keeps the min value at the top.
 
+    The heap is stored as a flat, array-backed binary tree: the
+    children of the entry at position i are at 2i + 1 and 2i + 2.
     Both adding an object to the heap and popping the minimum object
-    from the heap take O(log(N)) operations.
+    from the heap take O(log(N)) operations, and creating a heap from
+    N objects takes O(N) operations.
 
     Methods
     -------
     create_from_iterable: iterable -> Heap
     add_to_heap
-        Add a`
+        Add a value to the heap.
+    push_many
+        Add every value of an iterable to the heap.
+    peek_min
+        Return the minimum element without removing it.
     pop_min:
         Remove and return the minimum element from the heap.
+    pop_many
+        Remove and return the k smallest elements, in order.
+    __iter__
+        Iterate over the elements, in no particular order.
+    iter_chunks
+        Iterate over lists of elements, without changing the heap.
 
     Raises
     ------
     EmptyHeapError
-        Raised when pop_min() is called on an empty heap.
+        Raised when pop_min() or peek_min() is called on an empty heap.
 
     See Also
     --------
@@ -36,20 +50,24 @@ class Heap(object):
             initialized empty. If not None, `value` must be comparable
             to the other objects in the heap with >, <, >=, <=, and ==.
         """
-        self.value = value
-        self.num_in_heap = 0 if value is None else 1
-        self.left_child = None
-        self.right_child = None
+        self._entries = [] if value is None else [value]
 
     @classmethod
     def create_from_iterable(cls, iterable):
-        as_iterable = iter(iterable)
-        first_value = next(as_iterable)
-        heap = cls(first_value)
-        for i in as_iterable:
-            heap.add_to_heap(i)
+        heap = cls()
+        heap._entries = list(iterable)
+        heapq.heapify(heap._entries)
         return heap
 
+    @property
+    def num_in_heap(self):
+        return len(self._entries)
+
+    @property
+    def value(self):
+        """The minimum value in the heap, or None if it is empty."""
+        return self._entries[0] if self._entries else None
+
     def add_to_heap(self, value):
         """
         Parameters
@@ -58,64 +76,70 @@ class Heap(object):
             `value` must be comparable to the other objects in the heap
             with >, <, >=, <=, and ==.
         """
-        if self.value is None:
-            self.value = value
-        elif value < self.value:
-            self._bubble_down(self.value)
-            self.value = value
+        heapq.heappush(self._entries, value)
+
+    def push_many(self, values):
+        """
+        Parameters
+        ----------
+        values : iterable of comparison-sortable objects
+
+        Pushing many values onto a small heap re-heapifies in O(N);
+        otherwise each value is added in O(log(N)).
+        """
+        values = list(values)
+        if len(values) > len(self._entries):
+            self._entries.extend(values)
+            heapq.heapify(self._entries)
         else:
-            self._bubble_down(value)
-        self.num_in_heap += 1
+            for value in values:
+                heapq.heappush(self._entries, value)
+
+    def peek_min(self):
+        if len(self._entries) == 0:
+            raise EmptyHeapError
+        return self._entries[0]
 
     def pop_min(self):
-        if self.num_in_heap == 0:
+        if len(self._entries) == 0:
             raise EmptyHeapError
-        return self._pop_min()
-
-    def _pop_min(self):
-        out = self.value
-        self.num_in_heap -= 1
-        self.value = self._bubble_up()
-        return out
-
-    def _bubble_down(self, value):  # needs a better name
-        if self.left_child is None:
-            self.left_child = self.__class__(value)
-        elif self.right_child is None:
-            self.right_child = self.__class__(value)
-        elif self.left_child.num_in_heap < self.right_child.num_in_heap:
-            self.left_child.add_to_heap(value)
-        else:
-            self.right_child.add_to_heap(value)
-
-    def _bubble_up(self):
-        # 5 options: both none, 1 none (x2), neither noen
-        if self.left_child is None and self.right_child is None:
-            out = None
-        elif self.left_child is None:
-            out = self._bubble_up_right()
-        elif self.right_child is None:
-            out = self._bubble_up_left()
-        elif self.left_child.value < self.right_child.value:
-            out = self._bubble_up_left()
-        else:
-            out = self._bubble_up_right()
-        return out
+        return heapq.heappop(self._entries)
 
-    def _bubble_up_left(self):
-        out = self.left_child.pop_min()
-        if len(self.left_child) == 0:
-            self.left_child = None
-        return out
+    def pop_many(self, k):
+        """
+        Remove and return the `k` smallest values, smallest first.
 
-    def _bubble_up_right(self):
-        out = self.right_child.pop_min()
-        if len(self.right_child) == 0:
-            self.right_child = None
-        return out
+        If the heap has fewer than `k` values, all of them are returned.
+        """
+        k = min(k, len(self._entries))
+        return [heapq.heappop(self._entries) for _ in range(k)]
 
     def __len__(self):
-        return self.num_in_heap
+        return len(self._entries)
+
+    def __iter__(self):
+        """Iterate over the values in the heap, in no particular order."""
+        return iter(self._entries)
+
+    def iter_chunks(self, chunk_size):
+        """
+        Iterate over lists of up to `chunk_size` values in the heap, in
+        no particular order, without changing the heap or copying more
+        than one chunk at a time.
+
+        Each chunk is a slice of the array, taken in one step, so the
+        heap may be changed between chunks, e.g. by another thread,
+        though values may then be missed or repeated.
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        start = 0
+        while True:
+            chunk = self._entries[start:start + chunk_size]
+            if len(chunk) == 0:
+                return
+            yield chunk
+            start += chunk_size
 
 
 class EmptyHeapError(Exception):
@@ -123,13 +147,9 @@ class EmptyHeapError(Exception):
 
 
 def heapsort(x):
-    iterable = iter(x)
-    heap = Heap(next(iterable))
-    for i in iterable:
-        heap.add_to_heap(i)
+    heap = Heap.create_from_iterable(x)
 
     out = deque()
     while len(heap) > 0:
         out.append(heap.pop_min())
     return list(out)
-
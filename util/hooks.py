@@ -0,0 +1,180 @@
+import os
+import time
+import glob
+
+import numpy as np
+
+
+class OptimizerHooks(object):
+    """
+    Called by BranchBoundOptimizer as it runs; subclass and override the
+    events of interest. The optimizer only checks whether it has hooks,
+    so leaving `hooks=None` costs nothing.
+
+    The arguments are the optimizer's own lists and arrays, which hooks
+    should copy rather than keep.
+    """
+
+    def on_pop(self, simplex_indices, bounds):
+        """Candidates, by store index, popped from the heap."""
+
+    def on_evaluate(self, points, values):
+        """Points evaluated, by branching or by a local search."""
+
+    def on_branch(self, simplex_index, bound, child_indices, child_bounds):
+        """A simplex was replaced by its children in the heap."""
+
+    def on_incumbent_improved(self, function_point):
+        """The current minimum improved, to `function_point`."""
+
+    def on_terminate(self, result):
+        """`optimize` finished, with the OptimizeResult `result`."""
+
+
+EVENT_CODES = {
+    'pop': 0,
+    'evaluate': 1,
+    'branch': 2,
+    'incumbent': 3,
+    'terminate': 4,
+    }
+
+_COLUMNS = [
+    ('event', 'int8'),
+    ('time', 'float64'),
+    ('index', 'int64'),
+    ('parent', 'int64'),
+    ('value', 'float64'),
+    ]
+
+_FORMATS = ('npz', 'csv')
+
+
+class EventLog(OptimizerHooks):
+    """
+    Records every event as rows of a columnar log, written to `path` in
+    chunks of `chunk_size` rows, so memory stays bounded on long runs.
+
+    Each row has the columns
+        event : int8
+            The code of the event in EVENT_CODES.
+        time : float64
+            Seconds since the log was made.
+        index : int64
+            The store index of the popped simplex, or the new child,
+            for 'pop' and 'branch'; the status for 'terminate'; else -1.
+        parent : int64
+            The store index of the parent for 'branch', else -1.
+        value : float64
+            The bound of the simplex for 'pop' and 'branch'; the value
+            of the point for 'evaluate', 'incumbent' and 'terminate'.
+
+    Examples
+    --------
+    >>> log = EventLog(directory)  # doctest: +SKIP
+    >>> optimizer = BranchBoundOptimizer(..., hooks=log)  # doctest: +SKIP
+    >>> result = optimizer.optimize()  # doctest: +SKIP
+    >>> events = EventLog.load(directory)  # doctest: +SKIP
+    """
+
+    def __init__(self, path, file_format='npz', chunk_size=65536):
+        """
+        Parameters
+        ----------
+        path : str
+            A directory, which is made if needed, for the chunks, which
+            are named events_00000.npz, events_00001.npz, etc.
+        file_format : {'npz', 'csv'}, optional
+        chunk_size : int, optional
+            The number of rows per chunk.
+        """
+        if file_format not in _FORMATS:
+            raise ValueError("file_format must be one of {}".format(_FORMATS))
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.file_format = file_format
+        self.chunk_size = chunk_size
+        self.num_chunks = 0
+        self._started = time.perf_counter()
+        self._rows = {name: [] for name, _ in _COLUMNS}
+
+    @classmethod
+    def load(cls, path):
+        """
+        Returns
+        -------
+        dict
+            Each column of the log in `path`, concatenated over chunks.
+        """
+        names = sorted(glob.glob(os.path.join(path, 'events_*.*')))
+        chunks = [_read_chunk(name) for name in names]
+        return {
+            name: np.concatenate(
+                [chunk[name] for chunk in chunks] +
+                [np.zeros(0, dtype=dtype)]).astype(dtype)
+            for name, dtype in _COLUMNS}
+
+    def on_pop(self, simplex_indices, bounds):
+        self._add('pop', simplex_indices, -1, bounds)
+
+    def on_evaluate(self, points, values):
+        self._add('evaluate', -1, -1, values)
+
+    def on_branch(self, simplex_index, bound, child_indices, child_bounds):
+        self._add('branch', child_indices, simplex_index, child_bounds)
+
+    def on_incumbent_improved(self, function_point):
+        self._add('incumbent', -1, -1, [function_point.value])
+
+    def on_terminate(self, result):
+        self._add('terminate', result.status, -1, [result.fun])
+        self.flush()
+
+    def flush(self):
+        """Write any rows not yet written as a last, short chunk."""
+        while len(self._rows['event']) > 0:
+            self._write_chunk()
+
+    def _add(self, event, index, parent, values):
+        number = len(values)
+        rows = self._rows
+        rows['event'].extend([EVENT_CODES[event]] * number)
+        rows['time'].extend([time.perf_counter() - self._started] * number)
+        rows['index'].extend(
+            index if np.ndim(index) > 0 else [index] * number)
+        rows['parent'].extend([parent] * number)
+        rows['value'].extend(values)
+        if len(rows['event']) >= self.chunk_size:
+            self._write_chunk()
+
+    def _write_chunk(self):
+        size = self.chunk_size
+        chunk = {
+            name: np.array(self._rows[name][:size], dtype=dtype)
+            for name, dtype in _COLUMNS}
+        for name in self._rows:
+            del self._rows[name][:size]
+        filename = os.path.join(
+            self.path, 'events_{:05d}.{}'.format(
+                self.num_chunks, self.file_format))
+        if self.file_format == 'npz':
+            np.savez(filename, **chunk)
+        else:
+            names = [name for name, _ in _COLUMNS]
+            np.savetxt(
+                filename,
+                np.stack([chunk[name] for name in names], axis=1),
+                delimiter=',', header=','.join(names), comments='',
+                fmt=['%d', '%.9g', '%d', '%d', '%.17g'])
+        self.num_chunks += 1
+
+
+def _read_chunk(filename):
+    if filename.endswith('.npz'):
+        with np.load(filename) as data:
+            return {name: data[name] for name, _ in _COLUMNS}
+    table = np.loadtxt(filename, delimiter=',', skiprows=1, ndmin=2)
+    return {
+        name: table[:, column] for column, (name, _) in enumerate(_COLUMNS)}
@@ -0,0 +1,123 @@
+import os
+import pickle
+import tempfile
+import unittest
+
+import numpy as np
+
+from globaloptimize.util.cache import EvaluationCache
+
+
+class TestEvaluationCache(unittest.TestCase):
+    def test_returns_function_value(self):
+        np.random.seed(1330)
+        cache = EvaluationCache(square_norm)
+        point = np.random.randn(3)
+        self.assertEqual(cache(point), square_norm(point))
+
+    def test_evaluates_same_point_once(self):
+        counter = FunctionCallCounter(square_norm)
+        cache = EvaluationCache(counter)
+        for _ in range(3):
+            cache(np.array([1.0, 2.0]))
+        self.assertEqual(counter.counter, 1)
+        self.assertEqual(cache.hits, 2)
+        self.assertEqual(cache.misses, 1)
+
+    def test_negative_zero_matches_zero(self):
+        counter = FunctionCallCounter(square_norm)
+        cache = EvaluationCache(counter)
+        cache(np.array([0.0, 1.0]))
+        cache(np.array([-0.0, 1.0]))
+        self.assertEqual(counter.counter, 1)
+
+    def test_decimals_quantizes_points(self):
+        counter = FunctionCallCounter(square_norm)
+        cache = EvaluationCache(counter, decimals=6)
+        cache(np.array([0.1, 0.2]))
+        cache(np.array([0.1 + 1e-12, 0.2]))
+        self.assertEqual(counter.counter, 1)
+
+    def test_evicts_least_recently_used(self):
+        counter = FunctionCallCounter(square_norm)
+        cache = EvaluationCache(counter, maxsize=2)
+        a, b, c = [np.array([float(i)]) for i in range(3)]
+        cache(a)
+        cache(b)
+        cache(a)  # now b is the least recently used
+        cache(c)
+        self.assertEqual(len(cache), 2)
+        cache(a)
+        self.assertEqual(counter.counter, 3)
+        cache(b)
+        self.assertEqual(counter.counter, 4)
+
+    def test_vectorized_only_evaluates_missing_points(self):
+        np.random.seed(1341)
+        evaluated = []
+
+        def vectorized_function(x):
+            evaluated.append(len(x))
+            return (x**2).sum(axis=1)
+
+        cache = EvaluationCache(vectorized_function, vectorized=True)
+        points = np.random.randn(6, 2)
+        cache(points[:4])
+        values = cache(points)
+        self.assertEqual(evaluated, [4, 2])
+        self.assertTrue(np.allclose(values, (points**2).sum(axis=1)))
+
+    def test_vectorized_caches_nan_values(self):
+        evaluated = []
+
+        def vectorized_function(x):
+            evaluated.append(len(x))
+            return np.full(len(x), np.nan)
+
+        cache = EvaluationCache(vectorized_function, vectorized=True)
+        points = np.arange(6.0).reshape(3, 2)
+        cache(points)
+        values = cache(points)
+        self.assertEqual(evaluated, [3])
+        self.assertTrue(np.all(np.isnan(values)))
+        self.assertEqual(cache.hits, 3)
+
+    def test_save_and_load_round_trip(self):
+        np.random.seed(1346)
+        points = np.random.randn(5, 3)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'cache.npz')
+            cache = EvaluationCache(square_norm, path=path)
+            for point in points:
+                cache(point)
+            cache.save()
+
+            counter = FunctionCallCounter(square_norm)
+            loaded = EvaluationCache(counter, path=path)
+            for point in points:
+                self.assertEqual(loaded(point), square_norm(point))
+        self.assertEqual(counter.counter, 0)
+
+    def test_is_picklable(self):
+        cache = EvaluationCache(square_norm)
+        cache(np.ones(2))
+        unpickled = pickle.loads(pickle.dumps(cache))
+        self.assertEqual(len(unpickled), 1)
+
+
+class FunctionCallCounter(object):
+    def __init__(self, function):
+        self.function = function
+        self.counter = 0
+
+    def __call__(self, *args, **kwargs):
+        self.counter += 1
+        return self.function(*args, **kwargs)
+
+
+def square_norm(x):
+    return np.sum(np.asarray(x)**2)
+
+
+if __name__ == '__main__':
+    unittest.main()
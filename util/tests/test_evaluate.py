@@ -0,0 +1,78 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from globaloptimize.util.evaluate import evaluate_points
+
+
+class TestEvaluatePoints(unittest.TestCase):
+    def test_evaluates_serially(self):
+        np.random.seed(1120)
+        points = np.random.randn(10, 3)
+        values = evaluate_points(square_norm, points)
+        correct = [square_norm(p) for p in points]
+        self.assertTrue(np.all(values == correct))
+
+    def test_evaluates_with_executor(self):
+        np.random.seed(1121)
+        points = np.random.randn(10, 3)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            values = evaluate_points(square_norm, points, executor=executor)
+        correct = [square_norm(p) for p in points]
+        self.assertTrue(np.all(values == correct))
+
+    def test_evaluates_vectorized_in_one_call(self):
+        np.random.seed(1122)
+        points = np.random.randn(10, 3)
+        calls = []
+
+        def vectorized_function(x):
+            calls.append(x.shape)
+            return (x**2).sum(axis=1)
+
+        values = evaluate_points(vectorized_function, points, vectorized=True)
+        self.assertEqual(calls, [points.shape])
+        self.assertTrue(np.allclose(values, [square_norm(p) for p in points]))
+
+    def test_evaluates_in_chunks(self):
+        np.random.seed(1123)
+        points = np.random.randn(10, 3)
+        calls = []
+
+        def vectorized_function(x):
+            calls.append(x.shape[0])
+            return (x**2).sum(axis=1)
+
+        values = evaluate_points(
+            vectorized_function, points, vectorized=True, chunk_size=4)
+        self.assertEqual(calls, [4, 4, 2])
+        self.assertTrue(np.allclose(values, [square_norm(p) for p in points]))
+
+    def test_reports_progress_after_each_chunk(self):
+        points = np.zeros((5, 2))
+        progress = []
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            evaluate_points(
+                square_norm, points, executor=executor, chunk_size=2,
+                progress=lambda *args: progress.append(args))
+        self.assertEqual(progress, [(2, 5), (4, 5), (5, 5)])
+
+    def test_raises_error_if_chunk_size_not_positive(self):
+        self.assertRaises(
+            ValueError,
+            evaluate_points, square_norm, np.zeros((4, 2)), chunk_size=0)
+
+    def test_raises_error_if_wrong_number_of_values(self):
+        points = np.zeros((4, 2))
+        self.assertRaises(
+            ValueError,
+            evaluate_points, lambda x: x.sum(), points, vectorized=True)
+
+
+def square_norm(x):
+    return np.sum(x**2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -13,29 +13,11 @@ class TestHeap(unittest.TestCase):
         heap = Heap(2)
         self.assertEqual(heap.num_in_heap, 1)
 
-    def test_initializes_child_heaps_to_none(self):
-        heap = Heap(None)
-        self.assertIs(heap.left_child, None)
-        self.assertIs(heap.right_child, None)
-
     def test_stores_value(self):
         value = 1755
         heap = Heap(value)
         self.assertIs(heap.value, value)
 
-    def test__bubble_down_creates_new_heap(self):
-        initial = 1755
-        heap = Heap(initial)
-
-        values_to_add = [1766, 1777]
-        for value_to_add in values_to_add:
-            heap._bubble_down(value_to_add)
-
-        children = [heap.left_child, heap.right_child]
-        for child, value in zip(children, values_to_add):
-            self.assertIsInstance(child, Heap)
-            self.assertIs(child.value, value)
-
     def test_add_to_heap_keeps_ordered_when_added_low_to_high(self):
         low = 0
         high = 1
@@ -58,17 +40,6 @@ class TestHeap(unittest.TestCase):
 
         self.assertEqual(heap.num_in_heap, number_total)
 
-    def test_add_to_heap_keeps_balanced(self):
-        heap = Heap(0)
-        number_total = 25  # needs to be odd
-        for i in range(1, number_total):
-            heap.add_to_heap(number_total)
-
-        number_per_child = (number_total - 1) / 2
-        # 1 in main heap, (n - 1) / 2 in sub-heaps, for n total
-        self.assertEqual(heap.left_child.num_in_heap, number_per_child)
-        self.assertEqual(heap.right_child.num_in_heap, number_per_child)
-
     def test_create_from_iterable_returns_correct_length(self):
         values = [i for i in range(18)]
         heap = Heap.create_from_iterable(values)
@@ -113,6 +84,79 @@ class TestHeap(unittest.TestCase):
         heap.add_to_heap(2)
         self.assertEqual(len(heap), 1)
 
+    def test_create_from_iterable_keeps_heap_property(self):
+        random.seed(1301)
+        values = [random.random() for _ in range(101)]
+        heap = Heap.create_from_iterable(values)
+        entries = heap._entries
+        for i in range(1, len(entries)):
+            self.assertLessEqual(entries[(i - 1) // 2], entries[i])
+
+    def test_create_from_empty_iterable(self):
+        heap = Heap.create_from_iterable([])
+        self.assertEqual(len(heap), 0)
+
+    def test_peek_min_returns_min_without_removing(self):
+        values = [2, 5, 9, 2, 5, 3, 0, 1, 2]
+        heap = Heap.create_from_iterable(values)
+        self.assertEqual(heap.peek_min(), min(values))
+        self.assertEqual(len(heap), len(values))
+
+    def test_peek_min_on_empty_heap_raises_error(self):
+        heap = Heap()
+        self.assertRaises(EmptyHeapError, heap.peek_min)
+
+    def test_push_many_adds_all(self):
+        random.seed(1306)
+        heap = Heap.create_from_iterable([random.random() for _ in range(5)])
+        for number in [3, 50]:
+            values = [random.random() for _ in range(number)]
+            size_before = len(heap)
+            heap.push_many(values)
+            self.assertEqual(len(heap), size_before + number)
+        popped = [heap.pop_min() for _ in range(len(heap))]
+        self.assertEqual(popped, sorted(popped))
+
+    def test_pop_many_returns_k_smallest_in_order(self):
+        random.seed(1311)
+        values = [random.random() for _ in range(40)]
+        heap = Heap.create_from_iterable(values)
+        popped = heap.pop_many(7)
+        self.assertEqual(popped, sorted(values)[:7])
+        self.assertEqual(len(heap), 33)
+
+    def test_iter_yields_all_values_without_removing(self):
+        values = [4, 1, 3, 1, 5]
+        heap = Heap.create_from_iterable(values)
+        self.assertEqual(sorted(heap), sorted(values))
+        self.assertEqual(len(heap), len(values))
+
+    def test_iter_chunks_yields_all_values_without_removing(self):
+        values = list(range(10))
+        random.seed(1317)
+        random.shuffle(values)
+        heap = Heap.create_from_iterable(values)
+        chunks = list(heap.iter_chunks(4))
+        self.assertEqual([len(chunk) for chunk in chunks], [4, 4, 2])
+        self.assertEqual(sorted(sum(chunks, [])), list(range(10)))
+        self.assertEqual(heap.pop_many(10), list(range(10)))
+
+    def test_iter_chunks_sees_changes_between_chunks(self):
+        heap = Heap.create_from_iterable([1, 2, 3])
+        chunks = heap.iter_chunks(2)
+        next(chunks)
+        heap.add_to_heap(4)
+        self.assertEqual(len(next(chunks)), 2)
+
+    def test_iter_chunks_raises_error_on_bad_chunk_size(self):
+        heap = Heap.create_from_iterable([1, 2, 3])
+        self.assertRaises(ValueError, list, heap.iter_chunks(0))
+
+    def test_pop_many_returns_all_when_k_is_large(self):
+        heap = Heap.create_from_iterable([3, 1, 2])
+        self.assertEqual(heap.pop_many(10), [1, 2, 3])
+        self.assertEqual(len(heap), 0)
+
 
 class TestHeapsort(unittest.TestCase):
     def test_heapsort(self):
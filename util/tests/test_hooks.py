@@ -0,0 +1,69 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+from scipy.optimize import OptimizeResult
+
+from globaloptimize.util.hooks import EventLog, EVENT_CODES
+from globaloptimize.geometry.simplex import FunctionPoint
+
+
+class TestEventLog(unittest.TestCase):
+    def test_records_events_as_columns(self):
+        for file_format in ['npz', 'csv']:
+            with tempfile.TemporaryDirectory() as directory:
+                log = EventLog(directory, file_format=file_format)
+                record_some_events(log)
+                events = EventLog.load(directory)
+            codes = [EVENT_CODES[name] for name in
+                     ['pop', 'pop', 'evaluate', 'branch', 'branch',
+                      'incumbent', 'terminate']]
+            self.assertEqual(events['event'].tolist(), codes)
+            self.assertEqual(
+                events['index'].tolist(), [3, 4, -1, 5, 6, -1, 1])
+            self.assertEqual(
+                events['parent'].tolist(), [-1, -1, -1, 3, 3, -1, -1])
+            self.assertTrue(np.allclose(
+                events['value'], [0.5, 0.75, 2.0, 1.0, 1.5, 2.0, 2.0]))
+            self.assertTrue(np.all(np.diff(events['time']) >= 0))
+
+    def test_writes_chunks(self):
+        with tempfile.TemporaryDirectory() as directory:
+            log = EventLog(directory, chunk_size=3)
+            record_some_events(log)
+            self.assertEqual(
+                sorted(os.listdir(directory)),
+                ['events_00000.npz', 'events_00001.npz', 'events_00002.npz'])
+            self.assertEqual(len(EventLog.load(directory)['event']), 7)
+
+    def test_keeps_rows_until_chunk_is_full(self):
+        with tempfile.TemporaryDirectory() as directory:
+            log = EventLog(directory, chunk_size=10)
+            log.on_pop([1, 2], [0.0, 1.0])
+            self.assertEqual(os.listdir(directory), [])
+            log.flush()
+            self.assertEqual(len(EventLog.load(directory)['event']), 2)
+
+    def test_loads_empty_log(self):
+        with tempfile.TemporaryDirectory() as directory:
+            events = EventLog.load(directory)
+        self.assertEqual(events['event'].shape, (0,))
+
+    def test_raises_error_on_bad_arguments(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self.assertRaises(
+                ValueError, EventLog, directory, file_format='json')
+            self.assertRaises(ValueError, EventLog, directory, chunk_size=0)
+
+
+def record_some_events(log):
+    log.on_pop([3, 4], [0.5, 0.75])
+    log.on_evaluate(np.zeros((1, 2)), [2.0])
+    log.on_branch(3, 0.5, [5, 6], np.array([1.0, 1.5]))
+    log.on_incumbent_improved(FunctionPoint(np.zeros(2), 2.0))
+    log.on_terminate(OptimizeResult(status=1, fun=2.0))
+
+
+if __name__ == '__main__':
+    unittest.main()
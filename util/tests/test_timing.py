@@ -0,0 +1,52 @@
+import time
+import unittest
+
+from globaloptimize.util.timing import PhaseTimer
+
+
+class TestPhaseTimer(unittest.TestCase):
+    def test_times_phase(self):
+        timer = PhaseTimer()
+        with timer.phase('sleep'):
+            time.sleep(0.01)
+        self.assertGreaterEqual(timer.seconds['sleep'], 0.01)
+
+    def test_accumulates_repeated_phases(self):
+        timer = PhaseTimer()
+        for _ in range(3):
+            with timer.phase('sleep'):
+                time.sleep(0.005)
+        self.assertGreaterEqual(timer.seconds['sleep'], 0.015)
+
+    def test_charges_nested_time_to_inner_phase_only(self):
+        timer = PhaseTimer()
+        with timer.phase('outer'):
+            with timer.phase('inner'):
+                time.sleep(0.02)
+        self.assertGreaterEqual(timer.seconds['inner'], 0.02)
+        self.assertLess(timer.seconds['outer'], 0.01)
+
+    def test_summary_adds_up_to_total(self):
+        timer = PhaseTimer()
+        with timer.phase('a'):
+            time.sleep(0.002)
+        time.sleep(0.002)
+        summary = timer.summary()
+        self.assertGreater(summary['other'], 0)
+        self.assertAlmostEqual(
+            summary['a'] + summary['other'], summary['total'], places=3)
+
+    def test_stops_phase_on_error(self):
+        timer = PhaseTimer()
+        try:
+            with timer.phase('a'):
+                raise RuntimeError
+        except RuntimeError:
+            pass
+        with timer.phase('b'):
+            pass
+        self.assertEqual(sorted(timer.seconds), ['a', 'b'])
+
+
+if __name__ == '__main__':
+    unittest.main()
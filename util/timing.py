@@ -0,0 +1,65 @@
+import time
+from contextlib import contextmanager
+
+
+class PhaseTimer(object):
+    """
+    Wall-clock time spent in each of several named phases of a
+    computation.
+
+    Phases nest, and time is charged only to the innermost phase, so
+    the phases never double count: e.g. time spent evaluating the
+    objective during a local search counts as evaluation, not as the
+    local search.
+
+    Examples
+    --------
+    >>> timer = PhaseTimer()
+    >>> with timer.phase('bounding'):
+    ...     pass
+    >>> sorted(timer.summary())
+    ['bounding', 'other', 'total']
+    """
+
+    def __init__(self):
+        self.seconds = dict()
+        self._stack = []
+        self._since = None
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name):
+        self._switch_to(name)
+        try:
+            yield
+        finally:
+            self._switch_from()
+
+    def summary(self):
+        """
+        Returns
+        -------
+        dict
+            The seconds in each phase, together with 'total', the time
+            since the timer was made, and 'other', the time in no phase.
+        """
+        out = dict(self.seconds)
+        total = time.perf_counter() - self._started
+        out['other'] = max(total - sum(self.seconds.values()), 0.0)
+        out['total'] = total
+        return out
+
+    def _switch_to(self, name):
+        now = time.perf_counter()
+        if self._stack:
+            self._charge(self._stack[-1], now)
+        self._stack.append(name)
+        self._since = now
+
+    def _switch_from(self):
+        now = time.perf_counter()
+        self._charge(self._stack.pop(), now)
+        self._since = now
+
+    def _charge(self, name, now):
+        self.seconds[name] = self.seconds.get(name, 0.0) + now - self._since
@@ -4,6 +4,8 @@ class ObjectValuePair(object):
     """A namedtuple-like object-value pair, with comparison operators
     implemented on the value."""
 
+    __slots__ = ('object', 'value')
+
     def __init__(self, the_object, value):
         """
         Parameters